@@ -17,6 +17,7 @@ setup(
     tests_require=[
         'aiohttp>=2.0.1',
         'ujson',
+        'msgpack',
         'nose'
     ],
     install_requires=[
@@ -39,5 +40,9 @@ setup(
         'docs': ['sphinx'],
         'aiohttp': ['aiohttp>=1.2.0', 'ujson'],
         'grpc': ['grpcio'],
+        'msgpack': ['msgpack'],
+        'orjson': ['orjson'],
+        'rapidjson': ['python-rapidjson'],
+        'numpy': ['numpy'],
     }
 )
@@ -0,0 +1,15 @@
+from unittest import TestCase
+
+from venom.common import FieldMask
+
+
+class FieldMaskTestCase(TestCase):
+    def test_match_path(self):
+        mask = FieldMask(['name', 'owner.name'])
+        self.assertTrue(mask.match_path('name'))
+        self.assertTrue(mask.match_path('owner'))
+        self.assertTrue(mask.match_path('owner', 'name'))
+        self.assertTrue(mask.match_path('name', 'first'))
+        self.assertFalse(mask.match_path('owner', 'email'))
+        self.assertFalse(mask.match_path('nickname'))
+        self.assertFalse(mask.match_path('own'))
@@ -0,0 +1,117 @@
+import json
+from unittest import TestCase
+
+from venom import Message
+from venom.exceptions import ValidationError
+from venom.fields import String, Int, Number, Bytes, Field, Repeat
+from venom.protocol import JSON, ColumnarJSON, Columns
+
+
+class Owner(Message):
+    name = String()
+
+
+class Pet(Message):
+    name = String()
+    sound = String()
+    age = Int()
+    weight = Number()
+    code = Bytes()
+    owner = Field(Owner)
+
+
+class PetList(Message):
+    pets = Repeat(Field(Pet))
+    next_page = String()
+
+
+class ColumnarJSONProtocolTestCase(TestCase):
+    def test_encode(self):
+        protocol = ColumnarJSON(PetList)
+        pets = PetList([Pet('Snek', 'hiss', 3), Pet('Sid', 'hiss', weight=1.5), Pet(sound='hiss', code=b'\x00')],
+                       'abc')
+
+        self.assertEqual(protocol.encode(pets), {
+            'pets': {
+                'length': 3,
+                'columns': {
+                    'name': ['Snek', 'Sid', None],
+                    'sound': {'dictionary': ['hiss'], 'indices': [0, 0, 0]},
+                    'age': [3, None, None],
+                    'weight': [None, 1.5, None],
+                    'code': [None, None, 'AA==']
+                }
+            },
+            'next_page': 'abc'
+        })
+        self.assertEqual(protocol.unpack(protocol.pack(pets)), pets)
+        self.assertLess(len(protocol.pack(PetList([Pet('Snek', 'hiss', 3)] * 100))),
+                        len(JSON(PetList).pack(PetList([Pet('Snek', 'hiss', 3)] * 100))) / 3)
+
+    def test_nested(self):
+        class Zoo(Message):
+            name = String()
+            pet_lists = Repeat(Field(PetList))
+
+        protocol = ColumnarJSON(Zoo)
+        zoo = Zoo('Zoo', [PetList([Pet('Snek', owner=Owner('Ann'))]), PetList()])
+        self.assertEqual(protocol.unpack(protocol.pack(zoo)), zoo)
+        self.assertEqual(json.loads(protocol.pack(zoo).decode('utf-8'))['pet_lists']['columns']['pets'][0], {
+            'length': 1,
+            'columns': {'name': ['Snek'], 'owner': [{'name': 'Ann'}]}
+        })
+
+    def test_pack_include(self):
+        protocol = ColumnarJSON(PetList)
+        pets = PetList([Pet('Snek', 'hiss', 3), Pet('Sid', 'hiss')])
+        self.assertEqual(protocol.pack(pets, include=['pets.age']), b'{"pets":{"length":2,"columns":{"age":[3,null]}}}')
+
+    def test_decode_invalid(self):
+        protocol = ColumnarJSON(PetList)
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'pets': {'length': 2, 'columns': {'age': [1, 'two']}}})
+        self.assertEqual(e.exception.path, ['pets', '1', 'age'])
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'pets': {'length': 2, 'columns': {'age': [1]}}})
+        self.assertEqual(e.exception.path, ['pets', 'columns', 'age'])
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'pets': {'length': 1, 'columns': {'name': {'dictionary': ['a'], 'indices': [1]}}}})
+        self.assertEqual(e.exception.path, ['pets', 'columns', 'name', 'indices'])
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'pets': [{'name': 'Snek'}]})
+        self.assertEqual(e.exception.path, ['pets'])
+
+    def test_column_views(self):
+        protocol = ColumnarJSON(PetList)
+        pets = [Pet('Snek', 'hiss', 3), Pet('Sid', 'hiss', 'x'), Pet(code=b'\x00')]
+        buffer = protocol.pack(PetList(pets))
+
+        with self.assertRaises(ValidationError):
+            protocol.unpack(buffer)
+
+        view = protocol.unpack(buffer, lazy=True)['pets']
+        self.assertIsInstance(view, Columns)
+        self.assertEqual(len(view), 3)
+        self.assertEqual(view[0], pets[0])
+        self.assertEqual(view[-1], pets[2])
+        self.assertEqual(view.column('name'), ['Snek', 'Sid', None])
+        self.assertEqual(view.column('code'), [None, None, b'\x00'])
+        self.assertEqual(view.column('weight'), [None, None, None])
+
+        with self.assertRaises(ValidationError) as e:
+            view[1]
+        self.assertEqual(e.exception.path, ['1', 'age'])
+
+        with self.assertRaises(ValidationError) as e:
+            view.column('age')
+        self.assertEqual(e.exception.path, ['1', 'age'])
+
+        trusted = protocol.unpack(buffer, lazy=True, trusted=True)['pets']
+        self.assertEqual(list(trusted), pets)
+
+        # views can be encoded again
+        self.assertEqual(protocol.unpack(protocol.pack(PetList(trusted)), trusted=True), PetList(pets))
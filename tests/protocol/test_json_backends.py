@@ -0,0 +1,71 @@
+from unittest import TestCase
+
+from venom import Message
+from venom.fields import String, Bytes, Number, Repeat
+from venom.protocol import JSON
+from venom.protocol.json_backends import get_json_backend, set_default_json_backend, available_json_backends, \
+    register_json_backend, benchmark, JSONBackend, PREFERENCE
+
+
+class Pet(Message):
+    name = String()
+    code = Bytes()
+    sizes = Repeat(Number())
+
+
+class JSONBackendsTestCase(TestCase):
+    def setUp(self):
+        self.default = get_json_backend()
+
+    def tearDown(self):
+        set_default_json_backend(self.default.name)
+
+    def test_backends(self):
+        self.assertIn('json', available_json_backends())
+
+        for name in PREFERENCE:
+            if name not in available_json_backends():
+                continue
+            with self.subTest(backend=name):
+                backend = get_json_backend(name)
+                buffer = backend.dumps({'name': 'Snék', 'sizes': [0.1, 2.5], 'tame': True})
+                self.assertIsInstance(buffer, bytes)
+                self.assertEqual(backend.loads(buffer), {'name': 'Snék', 'sizes': [0.1, 2.5], 'tame': True})
+
+                with self.assertRaises(ValueError):
+                    backend.loads(b'{"name": ')
+
+        with self.assertRaises(RuntimeError):
+            get_json_backend('simplejson')
+
+    def test_default(self):
+        set_default_json_backend('json')
+        protocol = JSON(Pet)
+        self.assertEqual(protocol.pack(Pet('Snek')), b'{"name":"Snek"}')
+
+        log = []
+
+        def dumps(value):
+            log.append(value)
+            return b'{}'
+
+        register_json_backend(JSONBackend('test', dumps, get_json_backend('json').loads), default=True)
+        self.assertEqual(protocol.pack(Pet('Snek')), b'{}')
+        self.assertEqual(log, [{'name': 'Snek'}])
+
+    def test_subclass(self):
+        class StdlibJSON(JSON):
+            name = 'stdlib-json'
+            json_backend = 'json'
+
+        protocol = StdlibJSON(Pet)
+        pet = Pet('Snek', b'\x00\xff', [0.1, 1e300])
+        self.assertEqual(protocol.pack(Pet('Snek')), b'{"name":"Snek"}')
+        self.assertEqual(protocol.unpack(protocol.pack(pet)), pet)
+        self.assertEqual(protocol.unpack_many(protocol.pack_many([pet, Pet()])), [pet, Pet()])
+        self.assertIsNot(JSON(Pet), protocol)
+
+    def test_benchmark(self):
+        results = benchmark(number=10)
+        self.assertEqual({name for name, _ in results}, set(available_json_backends()))
+        self.assertEqual(results, sorted(results, key=lambda result: result[1]))
@@ -1,11 +1,15 @@
+import asyncio
+from array import array
+from io import BytesIO
 from unittest import SkipTest
 from unittest import TestCase
 
 from venom import Message
 from venom.common import StringValue, IntegerValue, BoolValue, NumberValue
 from venom.exceptions import ValidationError
-from venom.fields import String, Number, Field, Repeat
-from venom.protocol import JSON
+from venom.fields import String, Number, Field, Repeat, Bytes, LazyValue, Array, Int, Map
+from venom.protocol import JSON, URIString
+from venom.rpc.test_utils import AioTestCase
 
 
 class Foo(Message):
@@ -60,6 +64,153 @@ class JSONProtocolTestCase(TestCase):
         self.assertEqual(e.exception.description, "'meow, purr' is not of type 'list'")
         self.assertEqual(e.exception.path, ['sounds'])
 
+    def test_encode_nested_repeat_field(self):
+        class Pet(Message):
+            sound = String()
+
+        class Zoo(Message):
+            pets = Repeat(Field(Pet))
+            weights = Repeat(Number())
+            codes = Repeat(Bytes())
+
+        protocol = JSON(Zoo)
+        zoo = Zoo([Pet('hiss!'), Pet()], [1, 2.5], [b'abc'])
+        self.assertEqual(protocol.encode(zoo), {'pets': [{'sound': 'hiss!'}, {}],
+                                                'weights': [1, 2.5],
+                                                'codes': ['YWJj']})
+        self.assertEqual(protocol.decode(protocol.encode(zoo)), zoo)
+        self.assertIsInstance(protocol.decode({'weights': [1]}).weights[0], float)
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'pets': [{'sound': 42}]})
+
+        self.assertEqual(e.exception.description, "42 is not of type 'str'")
+        self.assertEqual(e.exception.path, ['pets', 'sound'])
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'weights': [1, 'two']})
+
+        self.assertEqual(e.exception.description, "two is not a number")
+        self.assertEqual(e.exception.path, ['weights'])
+
+    def test_decode_lazy(self):
+        class Pet(Message):
+            sound = String()
+
+        class Zoo(Message):
+            name = String()
+            pets = Repeat(Field(Pet))
+            mascot = Field(Pet)
+
+        protocol = JSON(Zoo)
+        zoo = protocol.unpack(b'{"name": "Zoo", "pets": [{"sound": "hiss"}], "mascot": {"sound": 42}}', lazy=True)
+
+        self.assertIsInstance(zoo._f_pets, LazyValue)
+        self.assertIn('pets', zoo)
+        self.assertEqual(zoo.name, 'Zoo')
+        self.assertEqual(zoo.pets[0], Pet('hiss'))
+        self.assertEqual(zoo._f_pets, [Pet('hiss')])
+
+        with self.assertRaises(ValidationError) as e:
+            zoo.mascot
+
+        self.assertEqual(e.exception.description, "42 is not of type 'str'")
+        self.assertEqual(e.exception.path, ['mascot', 'sound'])
+
+        zoo.mascot = Pet('purr')
+        self.assertEqual(protocol.encode(zoo), {'name': 'Zoo', 'pets': [{'sound': 'hiss'}], 'mascot': {'sound': 'purr'}})
+
+        lazy_zoo = protocol.decode_lazy({'pets': [{'sound': 'meow'}]})
+        self.assertEqual(protocol.encode(lazy_zoo), {'pets': [{'sound': 'meow'}]})
+        self.assertEqual(lazy_zoo, Zoo(pets=[Pet('meow')]))
+
+    def test_array_field(self):
+        class Vector(Message):
+            values = Array(Number())
+            counts = Array(Int())
+
+        protocol = JSON(Vector)
+        vector = protocol.decode({'values': [1, 2.5], 'counts': [1, 2]})
+        self.assertEqual(vector['values'], array('d', [1.0, 2.5]))
+        self.assertEqual(vector['counts'], array('q', [1, 2]))
+        self.assertEqual(protocol.encode(vector), {'values': [1.0, 2.5], 'counts': [1, 2]})
+        self.assertEqual(protocol.encode(Vector([0.5])), {'values': [0.5]})
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'values': [1, 'two']})
+
+        self.assertEqual(e.exception.description, "two is not a number")
+        self.assertEqual(e.exception.path, ['values'])
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'counts': [1, 2.5]})
+
+        self.assertEqual(e.exception.description, "2.5 is not of type 'int'")
+
+    def test_map_field(self):
+        class Pet(Message):
+            sound = String()
+
+        class Zoo(Message):
+            sizes = Map(Int())
+            pets = Map(Field(Pet))
+
+        protocol = JSON(Zoo)
+        zoo = Zoo({'lion': 3}, {'cat': Pet('meow'), 'snake': Pet()})
+        self.assertEqual(protocol.encode(zoo), {'sizes': {'lion': 3}, 'pets': {'cat': {'sound': 'meow'}, 'snake': {}}})
+        self.assertEqual(protocol.decode(protocol.encode(zoo)), zoo)
+        self.assertEqual(protocol.encode(Zoo()), {})
+        self.assertNotIn('sizes', protocol.decode({}))
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'pets': {'cat': {'sound': 42}}})
+
+        self.assertEqual(e.exception.description, "42 is not of type 'str'")
+        self.assertEqual(e.exception.path, ['pets', 'cat', 'sound'])
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'sizes': {'lion': 'big'}})
+
+        self.assertEqual(e.exception.path, ['sizes', 'lion'])
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'sizes': [1]})
+
+        self.assertEqual(e.exception.description, "[1] is not of type 'object'")
+        self.assertEqual(e.exception.path, ['sizes'])
+
+        with self.assertRaises(NotImplementedError):
+            URIString(Zoo, {'sizes'})
+
+    def test_decode_trusted(self):
+        class Pet(Message):
+            code = Bytes()
+            sizes = Array(Number())
+            toys = Map(Int())
+            parent = Field(Foo)
+            children = Repeat(Field(Foo))
+
+        protocol = JSON(Pet)
+        pet = Pet(b'\x00\xff', array('d', [1.0, 2.5]), {'ball': 2}, Foo('a', Foo('b')), [Foo('c'), Foo()])
+        self.assertEqual(protocol.decode_trusted(protocol.encode(pet)), pet)
+        self.assertEqual(protocol.decode_trusted({}), Pet())
+        self.assertEqual(protocol.unpack(protocol.pack(pet), lazy=True, trusted=True), pet)
+
+        # values are not checked
+        self.assertEqual(protocol.decode_trusted({'toys': {'ball': 'two'}}), Pet(toys={'ball': 'two'}))
+
+    def test_decode_invalid_bytes(self):
+        class Pet(Message):
+            code = Bytes()
+
+        protocol = JSON(Pet)
+        self.assertEqual(protocol.decode({'code': 'YWJj'}), Pet(b'abc'))
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'code': 42})
+
+        self.assertEqual(e.exception.path, ['code'])
+
     def test_validation_field_string(self):
         class Foo(Message):
             string = String()
@@ -116,6 +267,52 @@ class JSONProtocolTestCase(TestCase):
         self.assertEqual(protocol.pack(Pet()), b'{}')
         self.assertEqual(protocol.pack(Pet('hiss!')), b'{"sound":"hiss!"}')
 
+    def test_pack_include(self):
+        class Owner(Message):
+            name = String()
+            email = String()
+
+        class Pet(Message):
+            name = String()
+            sound = String()
+            owner = Field(Owner)
+            friends = Repeat(Field(Owner))
+            keepers = Map(Field(Owner))
+
+        owner = Owner('Ann', 'ann@example.com')
+        pet = Pet('Snek', 'hiss', owner, [owner], {'a': owner})
+        protocol = JSON(Pet)
+        self.assertEqual(protocol.pack(pet, include=['name']), b'{"name":"Snek"}')
+        self.assertEqual(protocol.pack(pet, include=['sound', 'owner']),
+                         b'{"sound":"hiss","owner":{"name":"Ann","email":"ann@example.com"}}')
+        self.assertEqual(protocol.pack(pet, include=['owner.name', 'friends.email', 'keepers.name']),
+                         b'{"owner":{"name":"Ann"},"friends":[{"email":"ann@example.com"}],"keepers":{"a":{"name":"Ann"}}}')
+        self.assertEqual(protocol.pack(pet, include=['owner.name', 'owner']),
+                         b'{"owner":{"name":"Ann","email":"ann@example.com"}}')
+        self.assertEqual(protocol.pack(pet, include=[]), b'{}')
+
+    def test_pack_many(self):
+        class Pet(Message):
+            sound = String()
+
+        protocol = JSON(Pet)
+        buffer = protocol.pack_many([Pet('hiss!'), Pet()])
+        self.assertEqual(buffer, b'{"sound":"hiss!"}\n{}\n')
+        self.assertEqual(protocol.unpack_many(buffer), [Pet('hiss!'), Pet()])
+        self.assertEqual(protocol.unpack_many(b'{"sound": "meow"}\n\n{}'), [Pet('meow'), Pet()])
+        self.assertEqual(list(protocol.iter_unpack(BytesIO(buffer))), [Pet('hiss!'), Pet()])
+        self.assertEqual(protocol.pack_many([]), b'')
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.unpack_many(b'{}\n{"sound": 42}\n')
+
+        self.assertEqual(e.exception.path, ['1', 'sound'])
+
+        with self.assertRaises(ValidationError) as e:
+            list(protocol.iter_unpack(BytesIO(b'{}\n{"sound"\n')))
+
+        self.assertEqual(e.exception.path, ['1'])
+
     def test_string_value(self):
         protocol = JSON(StringValue)
 
@@ -155,3 +352,118 @@ class JSONProtocolTestCase(TestCase):
 
         with self.assertRaises(ValidationError):
             protocol.decode('hiss!')
+
+
+class ChunkedStream(object):
+    def __init__(self, buffer: bytes, size: int = 3):
+        self._buffer = buffer
+        self._size = size
+        self.reads = 0
+
+    async def read(self, n: int = -1) -> bytes:
+        if n < 0:
+            chunk, self._buffer = self._buffer, b''
+        else:
+            chunk, self._buffer = self._buffer[:min(n, self._size)], self._buffer[min(n, self._size):]
+        self.reads += 1
+        return chunk
+
+
+class JSONStreamTestCase(AioTestCase):
+    async def test_unpack_stream(self):
+        class Pet(Message):
+            name = String()
+            sounds = Repeat(String())
+            weights = Array(Int())
+            size = Number()
+            parent = Field(Foo)
+            owners = Map(String())
+
+        protocol = JSON(Pet)
+        buffer = ' {"name": "Sn\u00e9k", "unknown": [1, {"a": 2}], "sounds": ["hiss", "ssss"],' \
+                 '"weights": [12, 345], "size": 1234.5, "parent": {"string": "a"}, "owners": {"a": "b"}} ' \
+                 .encode('utf-8')
+
+        pet = Pet('Snék', ['hiss', 'ssss'], array('q', [12, 345]), 1234.5, Foo('a'), {'a': 'b'})
+        self.assertEqual(await protocol.unpack_stream(ChunkedStream(buffer)), pet)
+        self.assertEqual(await protocol.unpack_stream(ChunkedStream(buffer), chunk_size=1), pet)
+        self.assertEqual(await protocol.unpack_stream(ChunkedStream(b'{}')), Pet())
+        self.assertEqual(await protocol.unpack_stream(ChunkedStream(b'{"sounds": []}')), Pet(sounds=[]))
+
+        reader = asyncio.StreamReader()
+        reader.feed_data(buffer)
+        reader.feed_eof()
+        self.assertEqual(await protocol.unpack_stream(reader), pet)
+
+        class Empty(Message):
+            pass
+
+        self.assertEqual(await JSON(Empty).unpack_stream(ChunkedStream(b'')), Empty())
+
+    async def test_unpack_stream_invalid(self):
+        class Pet(Message):
+            sounds = Repeat(String())
+
+        protocol = JSON(Pet)
+
+        for buffer in (b'', b'{', b'{"sounds": ["hiss",]}', b'{"sounds": []} []', b'[]', b'{"sounds": ["\xff"]}'):
+            with self.assertRaises(ValidationError):
+                await protocol.unpack_stream(ChunkedStream(buffer))
+
+        with self.assertRaises(ValidationError) as e:
+            await protocol.unpack_stream(ChunkedStream(b'{"sounds": ["hiss", 42]}'))
+
+        self.assertEqual(e.exception.path, ['sounds', '1'])
+
+        with self.assertRaises(ValidationError) as e:
+            await protocol.unpack_stream(ChunkedStream(b'{"sounds": "hiss"}'))
+
+        self.assertEqual(e.exception.description, "'hiss' is not of type 'list'")
+        self.assertEqual(e.exception.path, ['sounds'])
+
+    async def test_iter_unpack_stream(self):
+        class Pet(Message):
+            name = String()
+
+        class PetList(Message):
+            pets = Repeat(Pet)
+            total = Int()
+
+        protocol = JSON(PetList)
+        stream = ChunkedStream(b'{"pets": [' + b', '.join([b'{"name": "a"}'] * 10) + b'], "total": 10}')
+        message = PetList()
+        pets = []
+        async for pet in protocol.iter_unpack_stream(stream, 'pets', message):
+            pets.append((pet, stream.reads))
+
+        self.assertEqual([pet for pet, _ in pets], [Pet('a')] * 10)
+        self.assertLess(pets[0][1], pets[-1][1])
+        self.assertEqual(message, PetList(total=10))
+
+        with self.assertRaises(ValueError):
+            protocol.iter_unpack_stream(stream, 'total')
+
+    async def test_unpack_stream_constraints(self):
+        class Pet(Message):
+            name = String(required=True)
+            sounds = Repeat(String(min_length=2), max_length=1)
+
+        protocol = JSON(Pet)
+        with self.assertRaises(ValidationError) as e:
+            await protocol.unpack_stream(ChunkedStream(b'{"sounds": ["ab", "cd"]}'))
+
+        self.assertEqual(e.exception.description, 'Expected at most 1 items, got 2')
+        self.assertEqual(e.exception.path, ['sounds'])
+
+        with self.assertRaises(ValidationError) as e:
+            await protocol.unpack_stream(ChunkedStream(b'{"sounds": ["a"]}'))
+
+        self.assertEqual(e.exception.path, ['sounds', '0'])
+
+        with self.assertRaises(ValidationError) as e:
+            await protocol.unpack_stream(ChunkedStream(b'{}'))
+
+        self.assertEqual(e.exception.path, ['name'])
+
+    async def test_unpack_stream_custom_decode(self):
+        self.assertEqual(await JSON(StringValue).unpack_stream(ChunkedStream(b'"hiss"')), StringValue('hiss'))
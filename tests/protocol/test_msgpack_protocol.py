@@ -0,0 +1,93 @@
+import asyncio
+from io import BytesIO
+from unittest import TestCase
+
+import msgpack
+
+from venom import Message, Empty
+from venom.exceptions import ValidationError
+from venom.fields import String, Bytes, Int64, Float64, Field, Repeat
+from venom.protocol import MsgPack
+
+
+class Pet(Message):
+    name = String()
+    code = Bytes()
+    age = Int64()
+    size = Float64()
+    sounds = Repeat(String())
+
+
+class MsgPackProtocolTestCase(TestCase):
+    def test_pack(self):
+        protocol = MsgPack(Pet)
+        pet = Pet('Snek', b'\x00\xff', 3, 2.5, ['hiss'])
+
+        self.assertEqual(msgpack.unpackb(protocol.pack(pet), raw=False),
+                         {'name': 'Snek', 'code': b'\x00\xff', 'age': 3, 'size': 2.5, 'sounds': ['hiss']})
+        self.assertEqual(protocol.unpack(protocol.pack(pet)), pet)
+        self.assertEqual(protocol.unpack(protocol.pack(Pet())), Pet())
+        self.assertEqual(MsgPack(Empty).pack(Empty()), b'')
+        self.assertEqual(MsgPack(Empty).unpack(b''), Empty())
+
+    def test_nested(self):
+        class Owner(Message):
+            pet = Field(Pet)
+
+        protocol = MsgPack(Owner)
+        owner = Owner(Pet(code=b'abc', size=1))
+        self.assertEqual(protocol.unpack(protocol.pack(owner)), owner)
+        self.assertIsInstance(protocol.unpack(protocol.pack(owner)).pet.size, float)
+
+    def test_validation(self):
+        protocol = MsgPack(Pet)
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.unpack(msgpack.packb({'code': 'abc'}, use_bin_type=True))
+
+        self.assertEqual(e.exception.description, "'abc' is not of type 'bytes'")
+        self.assertEqual(e.exception.path, ['code'])
+
+        with self.assertRaises(ValidationError):
+            protocol.unpack(b'\xc1')
+
+    def test_pack_many(self):
+        protocol = MsgPack(Pet)
+        pets = [Pet('Snek', b'\x00'), Pet(), Pet(sounds=['hiss'])]
+        buffer = protocol.pack_many(pets)
+        self.assertEqual(protocol.unpack_many(buffer), pets)
+        self.assertEqual(list(protocol.iter_unpack(BytesIO(buffer))), pets)
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.unpack_many(buffer + msgpack.packb({'age': 'old'}))
+
+        self.assertEqual(e.exception.path, ['3', 'age'])
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.unpack_many(buffer[:-2])
+        self.assertEqual(e.exception.path, ['2'])
+
+        with self.assertRaises(ValidationError):
+            list(protocol.iter_unpack(BytesIO(buffer[:-2]), chunk_size=3))
+
+    def test_unpack_stream(self):
+        protocol = MsgPack(Pet)
+
+        def stream(pet):
+            reader = asyncio.StreamReader()
+            reader.feed_data(protocol.pack(pet))
+            reader.feed_eof()
+            return reader
+
+        async def iter_sounds(pet, message):
+            return [sound async for sound in protocol.iter_unpack_stream(stream(pet), 'sounds', message)]
+
+        run = asyncio.get_event_loop().run_until_complete
+        self.assertEqual(run(protocol.unpack_stream(stream(Pet('Snek', age=3)))), Pet('Snek', age=3))
+
+        message = Pet()
+        self.assertEqual(run(iter_sounds(Pet('Snek', sounds=['hiss', 'rattle']), message)), ['hiss', 'rattle'])
+        self.assertEqual(message, Pet('Snek'))
+
+        with self.assertRaises(ValueError):
+            protocol.iter_unpack_stream(stream(Pet()), 'name')
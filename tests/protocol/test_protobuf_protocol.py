@@ -0,0 +1,135 @@
+from array import array
+from io import BytesIO
+from unittest import TestCase
+
+from venom import Message
+from venom.common import Timestamp, StringValue
+from venom.exceptions import ValidationError
+from venom.fields import String, Int32, Int64, Float32, Float64, Bool, Bytes, Field, Repeat, Map, Array
+from venom.protocol import Protobuf
+
+
+class Test1(Message):
+    a = Int32()
+
+
+class Test2(Message):
+    b = String(number=2)
+
+
+class Test4(Message):
+    d = Repeat(Int32(), number=4)
+
+
+class ProtobufProtocolTestCase(TestCase):
+    def test_encode_reference_examples(self):
+        self.assertEqual(Protobuf(Test1).pack(Test1(150)), b'\x08\x96\x01')
+        self.assertEqual(Protobuf(Test2).pack(Test2('testing')), b'\x12\x07testing')
+        self.assertEqual(Protobuf(Test4).pack(Test4([3, 270, 86942])), b'\x22\x06\x03\x8e\x02\x9e\xa7\x05')
+
+        self.assertEqual(Protobuf(Test1).unpack(b'\x08\x96\x01'), Test1(150))
+        self.assertEqual(Protobuf(Test2).unpack(b'\x12\x07testing'), Test2('testing'))
+        self.assertEqual(Protobuf(Test4).unpack(b'\x22\x06\x03\x8e\x02\x9e\xa7\x05'), Test4([3, 270, 86942]))
+
+    def test_cache(self):
+        protocol = Protobuf(Timestamp)
+        self.assertIs(Timestamp.__meta__.protocols['protobuf'], protocol)
+        self.assertIs(Protobuf(Timestamp), protocol)
+
+    def test_scalars(self):
+        class Pet(Message):
+            name = String()
+            code = Bytes()
+            age = Int32()
+            legs = Int64()
+            offset = Int64(zigzag=True)
+            weight = Float32()
+            size = Float64()
+            tame = Bool()
+
+        protocol = Protobuf(Pet)
+        pet = Pet('snek', b'\x00\xff', -1, 2 ** 40, -3, 0.5, 2.25, True)
+        self.assertEqual(protocol.unpack(protocol.pack(pet)), pet)
+        self.assertEqual(protocol.pack(Pet()), b'')
+        self.assertEqual(protocol.unpack(b''), Pet())
+
+        self.assertEqual(len(protocol.pack(Pet(age=-1))), 11)
+        self.assertEqual(protocol.pack(Pet(offset=-3)), b'\x28\x05')
+
+    def test_nested_and_repeated(self):
+        class Pet(Message):
+            sounds = Repeat(String())
+            sizes = Repeat(Float64())
+            born = Field(Timestamp)
+            parents = Repeat(Field('tests.protocol.test_protobuf_protocol.Test2'))
+            nickname = Field(StringValue)
+
+        protocol = Protobuf(Pet)
+        pet = Pet(['hiss', 'slither'], [1.0, 2.5], Timestamp(42, 7), [Test2('a'), Test2()], StringValue('Sid'))
+        self.assertEqual(protocol.unpack(protocol.pack(pet)), pet)
+
+    def test_unpacked_repeated_scalars(self):
+        self.assertEqual(Protobuf(Test4).unpack(b'\x20\x03\x20\x8e\x02'), Test4([3, 270]))
+
+    def test_array(self):
+        class Vector(Message):
+            values = Array(Float64())
+            weights = Array(Float32())
+            counts = Array(Int32(), number=4)
+
+        protocol = Protobuf(Vector)
+        vector = Vector([1.0, 2.5], [0.5], [3, 270, 86942])
+        self.assertEqual(protocol.unpack(protocol.pack(vector)),
+                         Vector(array('d', [1.0, 2.5]), array('f', [0.5]), array('i', [3, 270, 86942])))
+        self.assertEqual(protocol.pack(Vector(counts=array('i', [3, 270, 86942]))),
+                         Protobuf(Test4).pack(Test4([3, 270, 86942])))
+        self.assertEqual(protocol.unpack(b'\x20\x03\x20\x8e\x02'), Vector(counts=array('i', [3, 270])))
+
+    def test_map(self):
+        class Pet(Message):
+            toys = Map(Int32())
+            friends = Map(Field(Test1))
+
+        protocol = Protobuf(Pet)
+        pet = Pet({'ball': 2, 'stick': 0}, {'cat': Test1(1)})
+        self.assertEqual(protocol.unpack(protocol.pack(pet)), pet)
+
+    def test_skip_unknown_fields(self):
+        self.assertEqual(Protobuf(Test1).unpack(b'\x12\x07testing\x08\x96\x01\x1d\x00\x00\x00\x00'), Test1(150))
+
+    def test_invalid(self):
+        protocol = Protobuf(Test2)
+
+        with self.assertRaises(ValidationError):
+            protocol.unpack(b'\x12\x07test')
+
+        with self.assertRaises(ValidationError):
+            protocol.unpack(b'\x12')
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.unpack(b'\x10\x01')
+
+        self.assertEqual(e.exception.path, ['b'])
+
+    def test_pack_many(self):
+        protocol = Protobuf(Test1)
+        buffer = protocol.pack_many([Test1(150), Test1(), Test1(1)])
+        self.assertEqual(buffer, b'\x03\x08\x96\x01\x00\x02\x08\x01')
+        self.assertEqual(protocol.unpack_many(buffer), [Test1(150), Test1(), Test1(1)])
+        self.assertEqual(list(protocol.iter_unpack(BytesIO(buffer))), [Test1(150), Test1(), Test1(1)])
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.unpack_many(buffer[:-1])
+
+        self.assertEqual(e.exception.path, ['2'])
+
+        with self.assertRaises(ValidationError):
+            list(protocol.iter_unpack(BytesIO(buffer[:-1])))
+
+    def test_duplicate_field_numbers(self):
+        class Pet(Message):
+            name = String(number=2)
+            sound = String()
+
+        with self.assertRaises(RuntimeError):
+            Protobuf(Pet)
@@ -1,8 +1,10 @@
+from io import BytesIO
 from unittest import TestCase
 
 from venom import Message
+from venom.exceptions import ValidationError
 from venom.fields import String
-from venom.protocol import Protocol
+from venom.protocol import Protocol, JSON, URIString
 
 
 class ProtocolTestCase(TestCase):
@@ -22,5 +24,54 @@ class ProtocolTestCase(TestCase):
 
         protocol = FooProtocol(Pet)
         self.assertIs(Pet.__meta__.protocols['foo'], protocol)
+        self.assertIs(FooProtocol(Pet), protocol)
 
+    def test_subset_cache(self):
+        class Pet(Message):
+            sound = String()
+            name = String()
+
+        protocol = JSON(Pet)
+        subset = protocol.subset(['sound'])
+        self.assertIsNot(subset, protocol)
+        self.assertIs(JSON(Pet, {'sound'}), subset)
+        self.assertIs(JSON(Pet), protocol)
+        self.assertEqual(subset.encode(Pet('hiss', 'Snek')), {'sound': 'hiss'})
+
+        # initialization is not repeated for cached protocols
+        encode = subset._encode
+        self.assertIs(JSON(Pet, {'sound'})._encode, encode)
+
+        self.assertIsNot(URIString(Pet, {'sound'}), subset)
+
+        for i in range(JSON.max_cached_subsets):
+            JSON(Pet, {'sound', str(i)})
+
+        self.assertIsNot(JSON(Pet, {'sound'}), subset)
+        self.assertEqual(len(Pet.__meta__.protocol_subsets), JSON.max_cached_subsets)
+
+    def test_pack_many(self):
+        class Pet(Message):
+            sound = String()
+
+        class SoundProtocol(Protocol):
+            name = 'sound'
+
+            def pack(self, message: Message):
+                return message.sound.encode('utf-8')
+
+            def unpack(self, buffer: bytes) -> Message:
+                return self._format(buffer.decode('utf-8'))
+
+        protocol = SoundProtocol(Pet)
+        buffer = protocol.pack_many([Pet('hiss'), Pet('')])
+        self.assertEqual(buffer, b'\x00\x00\x00\x04hiss\x00\x00\x00\x00')
+        self.assertEqual(protocol.unpack_many(buffer), [Pet('hiss'), Pet('')])
+        self.assertEqual(list(protocol.iter_unpack(BytesIO(buffer))), [Pet('hiss'), Pet('')])
+        self.assertEqual(protocol.unpack_many(b''), [])
+
+        with self.assertRaises(ValidationError):
+            protocol.unpack_many(buffer[:-6])
 
+        with self.assertRaises(ValidationError):
+            list(protocol.iter_unpack(BytesIO(buffer[:6])))
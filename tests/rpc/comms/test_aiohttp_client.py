@@ -1,8 +1,12 @@
+import time
+
 from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
 
 from venom import Empty
 from venom import Message
-from venom.exceptions import NotImplemented_
+from venom.common import FieldMask
+from venom.exceptions import NotImplemented_, DeadlineExceeded
+from venom.protocol import JSON, MsgPack
 from venom.fields import String
 from venom.rpc import RPC
 from venom.rpc import RequestContext
@@ -36,7 +40,7 @@ class AioHTTPEndToEndTestCase(AioHTTPTestCase):
 
         venom = Venom()
         venom.add(GreetingService)
-        return create_app(venom)
+        return create_app(venom, protocol_factory=JSON, additional_protocol_factories=[MsgPack])
 
     @unittest_run_loop
     async def test_client_success(self):
@@ -48,6 +52,62 @@ class AioHTTPEndToEndTestCase(AioHTTPTestCase):
                              .get_instance(GreetingStub)
                              .greet(HelloRequest('Alice')))
 
+    @unittest_run_loop
+    async def test_client_field_mask(self):
+        venom = Venom()
+        venom.add(GreetingStub, HTTPClient, 'http://127.0.0.1:{}'.format(self.client.port), session=self.client.session)
+
+        with venom.get_request_context():
+            self.assertEqual(HelloResponse(), await venom
+                             .get_instance(GreetingStub)
+                             .greet(HelloRequest('Alice'), field_mask=FieldMask([])))
+
+            self.assertEqual(HelloResponse('Hello, Alice!'), await venom
+                             .get_instance(GreetingStub)
+                             .greet(HelloRequest('Alice'), field_mask=FieldMask(['message'])))
+
+    @unittest_run_loop
+    async def test_client_msgpack(self):
+        venom = Venom()
+        venom.add(GreetingStub, HTTPClient, 'http://127.0.0.1:{}'.format(self.client.port),
+                  session=self.client.session,
+                  protocol_factory=MsgPack)
+
+        with venom.get_request_context():
+            self.assertEqual(HelloResponse('Hello, Alice!'), await venom
+                             .get_instance(GreetingStub)
+                             .greet(HelloRequest('Alice')))
+
+            with self.assertRaises(NotImplemented_):
+                await venom.get_instance(GreetingStub).goodbye(Empty())
+
+    @unittest_run_loop
+    async def test_client_trusted(self):
+        venom = Venom()
+        venom.add(GreetingStub, HTTPClient, 'http://127.0.0.1:{}'.format(self.client.port),
+                  session=self.client.session,
+                  trusted=True)
+
+        with venom.get_request_context():
+            self.assertEqual(HelloResponse('Hello, Alice!'), await venom
+                             .get_instance(GreetingStub)
+                             .greet(HelloRequest('Alice')))
+
+    @unittest_run_loop
+    async def test_client_deadline(self):
+        venom = Venom()
+        venom.add(GreetingStub, HTTPClient, 'http://127.0.0.1:{}'.format(self.client.port), session=self.client.session)
+
+        with venom.get_request_context() as context:
+            context.deadline = time.monotonic() + 5
+            self.assertEqual(HelloResponse('Hello, Alice!'), await venom
+                             .get_instance(GreetingStub)
+                             .greet(HelloRequest('Alice')))
+
+            context.deadline = time.monotonic()
+            with self.assertRaises(DeadlineExceeded):
+                await venom.get_instance(GreetingStub).greet(HelloRequest('Alice'))
+
     @unittest_run_loop
     async def test_client_exception(self):
         venom = Venom()
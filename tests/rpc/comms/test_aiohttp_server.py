@@ -1,11 +1,14 @@
 
+import asyncio
 import json
 from unittest import SkipTest
 
+import msgpack
 from aiohttp.test_utils import AioHTTPTestCase, unittest_run_loop
 
 from venom import Message
 from venom.fields import Int64, String, Int32
+from venom.protocol import JSON, MsgPack
 from venom.rpc import Service, http
 from venom.rpc import rpc
 from venom.rpc.comms.aiohttp import create_app
@@ -38,6 +41,12 @@ class AioHTTPSimpleServerTestCase(AioHTTPTestCase):
             def read(self, id: int) -> Snake:
                 return Snake(id, 'Snek #{}'.format(id))
 
+            @http.GET('./{id:\d+}/measure', request=Snake)
+            def measure(self, id: int) -> Snake:
+                if self.context.field_mask is None or self.context.field_mask.match_path('size'):
+                    return Snake(id, 'Snek #{}'.format(id), 42)
+                return Snake(id, 'Snek #{}'.format(id))
+
             # TODO support Repeat!
             # @http.GET('/')
             # def snakes(self) -> :
@@ -88,6 +97,21 @@ class AioHTTPSimpleServerTestCase(AioHTTPTestCase):
         # self.assertEqual(200, response.status)
         # self.assertEqual([{}, ...], await response.json())
 
+    @unittest_run_loop
+    async def test_route_GET_fields(self):
+        response = await self.client.get("/snake/3", params={'fields': 'name'})
+        self.assertEqual(200, response.status)
+        self.assertEqual({'name': 'Snek #3'}, await response.json())
+
+        response = await self.client.get("/snake/3/measure", params={'fields': 'id,size'})
+        self.assertEqual({'id': 3, 'size': 42}, await response.json())
+
+        response = await self.client.get("/snake/3/measure", params={'fields': 'id'})
+        self.assertEqual({'id': 3}, await response.json())
+
+        response = await self.client.get("/snake/3/measure")
+        self.assertEqual({'id': 3, 'name': 'Snek #3', 'size': 42}, await response.json())
+
     @unittest_run_loop
     async def test_route_404_error(self):
         response = await self.client.get("/snake/bite")
@@ -115,3 +139,135 @@ class AioHTTPSimpleServerTestCase(AioHTTPTestCase):
         response = await self.client.get("/snake/status/501")
         # self.assertEqual(500, response.status)
         self.assertEqual({'status': 501, 'description': 'Not Implemented'}, await response.json())
+
+
+class AioHTTPNegotiationTestCase(AioHTTPTestCase):
+    def get_app(self):
+        class Snake(Message):
+            id = Int64()
+            name = String()
+
+        class SnakeService(Service):
+            @http.POST('.', request=Snake)
+            def create(self, name: str) -> Snake:
+                return Snake(1, name)
+
+        venom = mock_venom(SnakeService)
+        return create_app(venom, protocol_factory=JSON, additional_protocol_factories=[MsgPack])
+
+    @unittest_run_loop
+    async def test_content_type(self):
+        response = await self.client.post("/snake",
+                                          data=msgpack.packb({'name': 'Snek'}),
+                                          headers={'content-type': MsgPack.mime})
+
+        self.assertEqual(200, response.status)
+        self.assertEqual(JSON.mime, response.content_type)
+        self.assertEqual({'id': 1, 'name': 'Snek'}, await response.json())
+
+    @unittest_run_loop
+    async def test_accept(self):
+        response = await self.client.post("/snake",
+                                          data=json.dumps({'name': 'Snek'}),
+                                          headers={'accept': 'application/json;q=0.5, {}'.format(MsgPack.mime)})
+
+        self.assertEqual(200, response.status)
+        self.assertEqual(MsgPack.mime, response.content_type)
+        self.assertEqual({'id': 1, 'name': 'Snek'}, msgpack.unpackb(await response.read(), raw=False))
+
+        response = await self.client.post("/snake",
+                                          data=json.dumps({'name': 42}),
+                                          headers={'accept': MsgPack.mime})
+
+        self.assertEqual(400, response.status)
+        self.assertEqual({'description': "42 is not of type 'str'", 'path': 'name', 'status': 400},
+                         msgpack.unpackb(await response.read(), raw=False))
+
+        response = await self.client.post("/snake", data=json.dumps({'name': 'Snek'}), headers={'accept': '*/*'})
+        self.assertEqual(JSON.mime, response.content_type)
+
+
+class AioHTTPTrustedServerTestCase(AioHTTPTestCase):
+    def get_app(self):
+        class Snake(Message):
+            id = Int64()
+            name = String(max_length=4)
+
+        class SnakeService(Service):
+            @http.POST('.', request=Snake)
+            def create(self, name: str) -> Snake:
+                return Snake(1, name)
+
+        venom = mock_venom(SnakeService)
+        return create_app(venom, trusted=True)
+
+    @unittest_run_loop
+    async def test_trusted(self):
+        response = await self.client.post("/snake", data=json.dumps({'name': 'Snek the snake'}))
+        self.assertEqual(200, response.status)
+        self.assertEqual({'id': 1, 'name': 'Snek the snake'}, await response.json())
+
+        response = await self.client.post("/snake", data='{"name": ')
+        self.assertEqual(400, response.status)
+
+
+class AioHTTPStreamingServerTestCase(AioHTTPTestCase):
+    def get_app(self):
+        class Snake(Message):
+            id = Int64()
+            name = String(max_length=4)
+
+        class SnakeService(Service):
+            @http.POST('.', request=Snake)
+            def create(self, name: str) -> Snake:
+                return Snake(1, name)
+
+        venom = mock_venom(SnakeService)
+        return create_app(venom, additional_protocol_factories=[MsgPack], stream_threshold=0)
+
+    @unittest_run_loop
+    async def test_stream(self):
+        response = await self.client.post("/snake", data=json.dumps({'name': 'Snek'}))
+        self.assertEqual(200, response.status)
+        self.assertEqual({'id': 1, 'name': 'Snek'}, await response.json())
+
+        response = await self.client.post("/snake", data=json.dumps({'name': 'Snek the snake'}))
+        self.assertEqual(400, response.status)
+
+        response = await self.client.post("/snake",
+                                          data=msgpack.packb({'name': 'Snek'}),
+                                          headers={'content-type': MsgPack.mime})
+        self.assertEqual(200, response.status)
+        self.assertEqual({'id': 1, 'name': 'Snek'}, await response.json())
+
+
+class AioHTTPDeadlineServerTestCase(AioHTTPTestCase):
+    def get_app(self):
+        class Snake(Message):
+            id = Int64()
+            name = String()
+
+        class SnakeService(Service):
+            @http.GET('./{id:\d+}', request=Snake)
+            async def read(self, id: int) -> Snake:
+                if id > 1:
+                    await asyncio.sleep(1)
+                return Snake(id, 'Snek' if self.context.deadline is not None else '')
+
+        venom = mock_venom(SnakeService)
+        return create_app(venom)
+
+    @unittest_run_loop
+    async def test_timeout_header(self):
+        response = await self.client.get("/snake/1", headers={'x-request-timeout': '5'})
+        self.assertEqual({'id': 1, 'name': 'Snek'}, await response.json())
+
+        response = await self.client.get("/snake/1")
+        self.assertEqual({'id': 1, 'name': ''}, await response.json())
+
+        response = await self.client.get("/snake/2", headers={'x-request-timeout': '0.01'})
+        self.assertEqual(504, response.status)
+        self.assertEqual({'status': 504, 'description': 'Deadline Exceeded'}, await response.json())
+
+        response = await self.client.get("/snake/1", headers={'x-request-timeout': 'soon'})
+        self.assertEqual(400, response.status)
@@ -0,0 +1,98 @@
+from unittest import TestCase
+
+from venom.common import StringValue, FieldMask
+from venom.exceptions import NotFound
+from venom.rpc import Venom, Service, rpc, TTL, LRUCache, Interceptor
+from venom.rpc.test_utils import AioTestCase
+
+
+class Clock(object):
+    def __init__(self):
+        self.time = 0
+
+    def __call__(self):
+        return self.time
+
+
+class LRUCacheTestCase(TestCase):
+    def test_eviction(self):
+        clock = Clock()
+        cache = LRUCache(max_size=2, clock=clock)
+        cache.set(b'a', 1, 10)
+        cache.set(b'b', 2, 10)
+        self.assertEqual(cache.get(b'a'), 1)
+
+        cache.set(b'c', 3, 10)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(b'b'), None)
+        self.assertEqual(cache.get(b'a'), 1)
+
+        clock.time = 10
+        self.assertEqual(cache.get(b'a'), None)
+        self.assertEqual(len(cache), 1)
+
+
+class ResponseCacheTestCase(AioTestCase):
+    async def test_cache(self):
+        calls = []
+        clock = Clock()
+
+        class SnakeService(Service):
+            @rpc(auto=True, cache=TTL(30, not_found=5))
+            def sound(self, name: str) -> str:
+                calls.append(name)
+                if name == 'unknown':
+                    raise NotFound()
+                return '{} hisses'.format(name)
+
+        venom = Venom(cache_backend=LRUCache(clock=clock))
+        venom.add(SnakeService)
+
+        request = SnakeService.sound.request
+        for _ in range(2):
+            self.assertEqual(await venom.invoke(SnakeService, SnakeService.sound, request('Snek')),
+                             StringValue('Snek hisses'))
+            with self.assertRaises(NotFound):
+                await venom.invoke(SnakeService, SnakeService.sound, request('unknown'))
+        self.assertEqual(calls, ['Snek', 'unknown'])
+
+        await venom.invoke(SnakeService, SnakeService.sound, request('Snek'), field_mask=FieldMask(['value']))
+        self.assertEqual(calls, ['Snek', 'unknown', 'Snek'])
+
+        clock.time = 5
+        await venom.invoke(SnakeService, SnakeService.sound, request('Snek'))
+        with self.assertRaises(NotFound):
+            await venom.invoke(SnakeService, SnakeService.sound, request('unknown'))
+        self.assertEqual(calls, ['Snek', 'unknown', 'Snek', 'unknown'])
+
+        clock.time = 30
+        await venom.invoke(SnakeService, SnakeService.sound, request('Snek'))
+        self.assertEqual(calls, ['Snek', 'unknown', 'Snek', 'unknown', 'Snek'])
+
+    async def test_interceptors(self):
+        intercepted = []
+
+        class CountingInterceptor(Interceptor):
+            async def intercept(self, instance, method, request, handler):
+                intercepted.append(request.name)
+                return await handler(instance, request)
+
+        class SnakeService(Service):
+            @rpc(auto=True, cache=TTL(30))
+            def sound(self, name: str) -> str:
+                return '{} hisses'.format(name)
+
+        venom = Venom(interceptors=[CountingInterceptor()])
+        venom.add(SnakeService)
+
+        request = SnakeService.sound.request
+        response = await venom.invoke(SnakeService, SnakeService.sound, request('Snek'))
+        response.value = 'Snek hums'
+
+        response = await venom.invoke(SnakeService, SnakeService.sound, request('Snek'))
+        self.assertEqual(response, StringValue('Snek hisses'))
+        response.value = 'Snek hums'
+
+        self.assertEqual(await venom.invoke(SnakeService, SnakeService.sound, request('Snek')),
+                         StringValue('Snek hisses'))
+        self.assertEqual(intercepted, ['Snek', 'Snek', 'Snek'])
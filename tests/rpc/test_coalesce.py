@@ -0,0 +1,94 @@
+import asyncio
+
+from venom.common import StringValue
+from venom.exceptions import NotFound
+from venom.rpc import Venom, Service, rpc, Interceptor
+from venom.rpc.test_utils import AioTestCase
+
+
+class CoalesceTestCase(AioTestCase):
+    async def test_coalesce(self):
+        calls = []
+
+        class SnakeService(Service):
+            @rpc(auto=True, coalesce=True)
+            async def sound(self, name: str) -> str:
+                calls.append(name)
+                await asyncio.sleep(0.01)
+                if name == 'unknown':
+                    raise NotFound()
+                return '{} hisses'.format(name)
+
+        venom = Venom()
+        venom.add(SnakeService)
+
+        def sound(name):
+            return venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request(name))
+
+        responses = await asyncio.gather(sound('Snek'), sound('Snek'), sound('Sid'), sound('unknown'), sound('unknown'),
+                                         return_exceptions=True)
+        self.assertEqual(responses[:3], [StringValue('Snek hisses'), StringValue('Snek hisses'),
+                                         StringValue('Sid hisses')])
+        self.assertIsNot(responses[0], responses[1])
+        self.assertIsInstance(responses[3], NotFound)
+        self.assertIsInstance(responses[4], NotFound)
+        self.assertEqual(sorted(calls), ['Sid', 'Snek', 'unknown'])
+
+        # requests that are no longer in flight are invoked again
+        await sound('Snek')
+        self.assertEqual(len(calls), 4)
+
+    async def test_interceptors(self):
+        intercepted = []
+
+        class CountingInterceptor(Interceptor):
+            async def intercept(self, instance, method, request, handler):
+                intercepted.append(method.name)
+                return await handler(instance, request)
+
+        class SnakeService(Service):
+            @rpc(coalesce=True)
+            async def sound(self) -> str:
+                await asyncio.sleep(0.01)
+                return 'hiss' if self.context is not None else ''
+
+        venom = Venom(interceptors=[CountingInterceptor()])
+        venom.add(SnakeService)
+
+        def sound():
+            return venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request())
+
+        self.assertEqual(await asyncio.gather(sound(), sound()), [StringValue('hiss'), StringValue('hiss')])
+        self.assertEqual(intercepted, ['sound', 'sound'])
+
+    async def test_cancel(self):
+        cancelled = []
+
+        class SnakeService(Service):
+            @rpc(coalesce=True)
+            async def sound(self) -> str:
+                try:
+                    await asyncio.sleep(0.05)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return 'hiss'
+
+        venom = Venom()
+        venom.add(SnakeService)
+
+        def sound():
+            return asyncio.ensure_future(venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request()))
+
+        first, second = sound(), sound()
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual(await second, StringValue('hiss'))
+        self.assertEqual(cancelled, [])
+
+        first, second = sound(), sound()
+        await asyncio.sleep(0)
+        first.cancel()
+        second.cancel()
+        await asyncio.sleep(0.01)
+        self.assertEqual(cancelled, [True])
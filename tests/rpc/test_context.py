@@ -0,0 +1,73 @@
+import asyncio
+
+from venom import Empty
+from venom.common import StringValue
+from venom.rpc import RequestContext, Venom, Service, Stub, RPC, rpc
+from venom.rpc.comms import BaseClient
+from venom.rpc.context import DictRequestContext
+from venom.rpc.test_utils import AioTestCase
+
+
+class RequestContextTestCase(AioTestCase):
+    async def test_nested(self):
+        self.assertIsNone(RequestContext.current())
+
+        with RequestContext() as outer:
+            self.assertIs(RequestContext.current(), outer)
+
+            with RequestContext() as inner:
+                self.assertIs(RequestContext.current(), inner)
+
+            self.assertIs(RequestContext.current(), outer)
+
+            with self.assertRaises(RuntimeError):
+                with inner:
+                    pass
+
+        self.assertIsNone(RequestContext.current())
+
+    async def test_invoke(self):
+        class SnakeService(Service):
+            @rpc
+            def sound(self) -> str:
+                self.context['task'] = asyncio.Task.current_task()
+                return self.context.get('sound', 'silence')
+
+        venom = Venom()
+        venom.add(SnakeService)
+
+        with venom.get_request_context() as context:
+            context['sound'] = 'hiss'
+            self.assertEqual(await venom.invoke(SnakeService, SnakeService.sound, Empty()), StringValue('silence'))
+            self.assertIs(RequestContext.current(), context)
+            self.assertNotIn('task', context)
+
+        @Venom.before_invoke.connect_via(venom, weak=True)
+        def capture_context(sender, **kwargs):
+            contexts.append(RequestContext.current())
+
+        contexts = []
+        await venom.invoke(SnakeService, SnakeService.sound, Empty())
+        self.assertIsInstance(contexts[0], DictRequestContext)
+        self.assertIs(contexts[0]['task'], asyncio.Task.current_task())
+        self.assertIsNone(RequestContext.current())
+
+    async def test_stub_inherits_context(self):
+        class GreeterStub(Stub):
+            greet = RPC(Empty, StringValue)
+
+        class RecordingClient(BaseClient):
+            async def invoke(self, stub, rpc, request, *, context=None, loop=None, field_mask=None):
+                return StringValue('context is current' if context is RequestContext.current() else 'wrong context')
+
+        class GreetingService(Service):
+            @rpc
+            async def greet(self) -> str:
+                return (await self.venom.get_instance(GreeterStub).greet(Empty())).value
+
+        venom = Venom()
+        venom.add(GreeterStub, RecordingClient)
+        venom.add(GreetingService)
+
+        self.assertEqual(await venom.invoke(GreetingService, GreetingService.greet, Empty()),
+                         StringValue('context is current'))
@@ -0,0 +1,68 @@
+import asyncio
+
+from venom.common import StringValue
+from venom.exceptions import DeadlineExceeded
+from venom.rpc import Venom, Service, rpc
+from venom.rpc.limits import ConcurrencyLimit
+from venom.rpc.test_utils import AioTestCase
+
+
+class DeadlineTestCase(AioTestCase):
+    async def test_deadline(self):
+        cancelled = []
+
+        class SnakeService(Service):
+            @rpc
+            async def sound(self) -> str:
+                try:
+                    await asyncio.sleep(0.05)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return 'hiss'
+
+            @rpc
+            async def deadline(self) -> str:
+                return str(self.context.deadline is not None)
+
+            @rpc
+            async def nested(self) -> str:
+                response = await self.venom.invoke(SnakeService, SnakeService.deadline, SnakeService.deadline.request())
+                return response.value
+
+        venom = Venom()
+        venom.add(SnakeService)
+
+        self.assertEqual(await venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request(),
+                                            timeout=1), StringValue('hiss'))
+        with self.assertRaises(DeadlineExceeded):
+            await venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request(), timeout=0.01)
+        self.assertEqual(cancelled, [True])
+
+        with self.assertRaises(DeadlineExceeded):
+            await venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request(), timeout=0)
+
+        self.assertEqual(await venom.invoke(SnakeService, SnakeService.nested, SnakeService.nested.request()),
+                         StringValue('False'))
+        self.assertEqual(await venom.invoke(SnakeService, SnakeService.nested, SnakeService.nested.request(),
+                                            timeout=1), StringValue('True'))
+
+    async def test_drop_queued(self):
+        calls = []
+
+        class SnakeService(Service):
+            @rpc(concurrency=ConcurrencyLimit(1, queue_size=10))
+            async def sound(self) -> str:
+                calls.append(True)
+                await asyncio.sleep(0.05)
+                return 'hiss'
+
+        venom = Venom()
+        venom.add(SnakeService)
+
+        first = asyncio.ensure_future(venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request()))
+        await asyncio.sleep(0)
+        with self.assertRaises(DeadlineExceeded):
+            await venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request(), timeout=0.01)
+        self.assertEqual(await first, StringValue('hiss'))
+        self.assertEqual(len(calls), 1)
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+from venom import Empty
+from venom.common import StringValue
+from venom.exceptions import ServiceUnavailable
+from venom.rpc import Venom, Service, rpc
+from venom.rpc.executor import ThreadPool
+from venom.rpc.test_utils import AioTestCase
+
+
+class ExecutorTestCase(AioTestCase):
+    async def test_thread(self):
+        class SnakeService(Service):
+            class Meta:
+                executor = 'thread'
+
+            @rpc
+            def thread(self) -> str:
+                return '{} {}'.format(threading.current_thread().name.startswith('venom'), self.context['sound'])
+
+            @rpc(executor=None)
+            def loop(self) -> str:
+                return str(threading.current_thread().name.startswith('venom'))
+
+        venom = Venom()
+        venom.add(SnakeService)
+
+        with venom.get_request_context() as context:
+            context['sound'] = 'hiss'
+            self.assertEqual(await venom.get_instance(SnakeService).thread(Empty()), StringValue('True hiss'))
+        self.assertEqual(await venom.invoke(SnakeService, SnakeService.loop, SnakeService.loop.request()),
+                         StringValue('False'))
+
+    async def test_pool(self):
+        pool = ThreadPool('snake', max_workers=1, max_queue=1)
+        started, release = threading.Event(), threading.Event()
+
+        class SnakeService(Service):
+            @rpc(auto=True, executor=pool)
+            def sound(self, name: str) -> str:
+                started.set()
+                release.wait(1)
+                return '{} hisses'.format(name)
+
+        venom = Venom()
+        venom.add(SnakeService)
+
+        def sound(name):
+            return asyncio.ensure_future(venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request(name)))
+
+        first = sound('Snek')
+        await asyncio.get_event_loop().run_in_executor(None, started.wait, 1)
+        second = sound('Sid')
+        await asyncio.sleep(0)
+
+        self.assertEqual(pool.metrics(), {'name': 'snake', 'max_workers': 1, 'active': 1, 'queued': 1,
+                                          'completed': 0, 'saturation': 1.0})
+        with self.assertRaises(ServiceUnavailable):
+            await venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request('Ann'))
+
+        release.set()
+        self.assertEqual(await first, StringValue('Snek hisses'))
+        self.assertEqual(await second, StringValue('Sid hisses'))
+        self.assertEqual((pool.active, pool.queued, pool.completed), (0, 0, 2))
+        pool.shutdown()
+
+    async def test_pool_without_queue(self):
+        pool = ThreadPool('snake', max_workers=2, max_queue=0)
+        barrier = threading.Barrier(2, timeout=1)
+
+        def sound(name):
+            barrier.wait()
+            return '{} hisses'.format(name)
+
+        self.assertEqual(await asyncio.gather(pool.run(sound, 'Snek'), pool.run(sound, 'Sid')),
+                         ['Snek hisses', 'Sid hisses'])
+
+        release = threading.Event()
+        busy = [asyncio.ensure_future(pool.run(release.wait, 1)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with self.assertRaises(ServiceUnavailable):
+            await pool.run(sound, 'Ann')
+
+        release.set()
+        await asyncio.gather(*busy)
+        pool.shutdown()
@@ -1,3 +1,4 @@
+import asyncio
 from collections import namedtuple
 from typing import List, Dict
 from unittest import SkipTest
@@ -192,3 +193,54 @@ class InspectionTestCase(AioTestCase):
         self.assertEqual(inspect.response, IntegerValue)
         self.assertEqual(inspect.request, IntegerValue)
         self.assertEqual(await inspect.invokable(None, IntegerValue(42)), IntegerValue(42))
+
+    async def test_magic_single_resolver_fast_path(self):
+        current_task = getattr(asyncio, 'current_task', None) or asyncio.Task.current_task
+        tasks = []
+
+        class NameResolver(Resolver):
+            async def resolve(self, service, request):
+                tasks.append(current_task())
+                return 'Snek'
+
+        class MemoizedNameResolver(NameResolver):
+            memoize = True
+
+        async def func(self, name: str, request: IntegerValue) -> StringValue:
+            return StringValue('{} {}'.format(name, request.value))
+
+        # a single resolver is awaited in the task of the caller, rather than in a task of its own
+        inspect = magic_normalize(func, additional_args=(NameResolver,))
+        self.assertEqual(await inspect.invokable(None, IntegerValue(3)), StringValue('Snek 3'))
+        self.assertEqual(tasks, [current_task()])
+
+        inspect = magic_normalize(func, additional_args=(MemoizedNameResolver,))
+        self.assertEqual(await inspect.invokable(None, IntegerValue(3)), StringValue('Snek 3'))
+        self.assertNotEqual(tasks[1], current_task())
+
+    async def test_magic_multiple_resolver_args(self):
+        class NameResolver(Resolver):
+            async def resolve(self, service, request):
+                return 'Snek'
+
+        class SizeResolver(Resolver):
+            async def resolve(self, service, request):
+                return request.value
+
+        async def func(self, name: str, size: int, request: IntegerValue) -> StringValue:
+            return StringValue('{} {} {}'.format(name, size, request.value))
+
+        inspect = magic_normalize(func, additional_args=(NameResolver, SizeResolver))
+        self.assertEqual(await inspect.invokable(None, IntegerValue(3)), StringValue('Snek 3 3'))
+
+    async def test_magic_request_message_unpack_defaults(self):
+        class Snake(Message):
+            name = String()
+            size = Int64()
+
+        def func(self, name: str, size: int = 7, hungry: bool = True) -> str:
+            return '{} {} {}'.format(name, size, hungry)
+
+        inspect = magic_normalize(func, request=Snake, converters=[StringValueConverter()])
+        self.assertEqual(await inspect.invokable(None, Snake('snek', 3)), StringValue('snek 3 True'))
+        self.assertEqual(await inspect.invokable(None, Snake()), StringValue(' 7 True'))
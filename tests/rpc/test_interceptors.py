@@ -0,0 +1,73 @@
+from venom import Empty
+from venom.common import StringValue
+from venom.exceptions import Forbidden
+from venom.rpc import Venom, Service, rpc, Interceptor
+from venom.rpc.test_utils import AioTestCase
+
+
+class LogInterceptor(Interceptor):
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+
+    async def intercept(self, instance, method, request, handler):
+        self.log.append('before {}'.format(self.name))
+        try:
+            return await handler(instance, request)
+        finally:
+            self.log.append('after {}'.format(self.name))
+
+
+class InterceptorsTestCase(AioTestCase):
+    async def test_order(self):
+        log = []
+
+        class SnakeService(Service):
+            class Meta:
+                interceptors = [LogInterceptor('service', log)]
+
+            @rpc(interceptors=[LogInterceptor('method', log)])
+            def sound(self) -> str:
+                log.append('sound')
+                return 'hiss'
+
+        venom = Venom(interceptors=[LogInterceptor('venom', log)])
+        venom.add(SnakeService)
+
+        self.assertEqual(await venom.invoke(SnakeService, SnakeService.sound, Empty()), StringValue('hiss'))
+        self.assertEqual(log, ['before venom', 'before service', 'before method', 'sound',
+                               'after method', 'after service', 'after venom'])
+
+    async def test_no_interceptors(self):
+        class SnakeService(Service):
+            @rpc
+            def sound(self) -> str:
+                return 'hiss'
+
+        class PublicOnly(Interceptor):
+            def applies_to(self, service, method):
+                return method.options.get('private', False)
+
+        venom = Venom(interceptors=[PublicOnly()])
+        venom.add(SnakeService)
+
+        self.assertEqual(venom._handler(SnakeService, SnakeService.sound), SnakeService.sound.invoke)
+        self.assertEqual(await venom.invoke(SnakeService, SnakeService.sound, Empty()), StringValue('hiss'))
+
+    async def test_add_interceptor(self):
+        class SnakeService(Service):
+            @rpc
+            def sound(self) -> str:
+                return 'hiss'
+
+        class DenyAll(Interceptor):
+            async def intercept(self, instance, method, request, handler):
+                raise Forbidden()
+
+        venom = Venom()
+        venom.add(SnakeService)
+        self.assertEqual(await venom.invoke(SnakeService, SnakeService.sound, Empty()), StringValue('hiss'))
+
+        venom.add_interceptor(DenyAll())
+        with self.assertRaises(Forbidden):
+            await venom.invoke(SnakeService, SnakeService.sound, Empty())
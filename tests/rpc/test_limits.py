@@ -0,0 +1,57 @@
+import asyncio
+
+from venom.common import StringValue
+from venom.exceptions import ServiceUnavailable
+from venom.rpc import Venom, Service, rpc
+from venom.rpc.limits import ConcurrencyLimit
+from venom.rpc.test_utils import AioTestCase
+
+
+class LimitsTestCase(AioTestCase):
+    async def test_method_limit(self):
+        active = []
+
+        class SnakeService(Service):
+            @rpc(concurrency=ConcurrencyLimit(2, queue_size=1))
+            async def sound(self) -> str:
+                active.append(True)
+                await asyncio.sleep(0.01)
+                return 'hiss'
+
+        venom = Venom()
+        venom.add(SnakeService)
+
+        responses = await asyncio.gather(*[venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request())
+                                           for _ in range(4)], return_exceptions=True)
+        errors = [response for response in responses if isinstance(response, ServiceUnavailable)]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].format().status, 503)
+        self.assertEqual(len(active), 3)
+
+    async def test_service_limit_timeout(self):
+        class SnakeService(Service):
+            class Meta:
+                concurrency = ConcurrencyLimit(1, queue_size=10, timeout=0.01)
+
+            @rpc
+            async def sound(self) -> str:
+                await asyncio.sleep(0.05)
+                return 'hiss'
+
+            @rpc
+            async def name(self) -> str:
+                return 'Snek'
+
+        venom = Venom()
+        venom.add(SnakeService)
+
+        sound = asyncio.ensure_future(venom.invoke(SnakeService, SnakeService.sound, SnakeService.sound.request()))
+        await asyncio.sleep(0)
+        with self.assertRaises(ServiceUnavailable):
+            await venom.invoke(SnakeService, SnakeService.name, SnakeService.name.request())
+        self.assertEqual(await sound, StringValue('hiss'))
+
+        self.assertEqual(await venom.invoke(SnakeService, SnakeService.name, SnakeService.name.request()),
+                         StringValue('Snek'))
+        self.assertEqual(venom._limiters[SnakeService].active, 0)
+        self.assertEqual(venom._limiters[SnakeService].queued, 0)
@@ -0,0 +1,186 @@
+import asyncio
+
+import venom.rpc as venom_rpc
+from venom import Empty
+from venom.common import StringValue
+from venom.rpc import RequestContext, rpc
+from venom.rpc.inspection import magic_normalize
+from venom.rpc.resolver import Resolver, ResolverGraph
+from venom.rpc.service import ServiceManager
+from venom.rpc.test_utils import AioTestCase, mock_venom
+
+
+class Service(object):
+    def __init__(self, context=None):
+        self.context = context
+
+
+class ResolverTestCase(AioTestCase):
+    async def test_dependencies(self):
+        calls = []
+
+        class UserResolver(Resolver):
+            async def resolve(self, service, request):
+                calls.append('user')
+                await asyncio.sleep(0.01)
+                return 'ann'
+
+        class TenantResolver(Resolver):
+            dependencies = (UserResolver,)
+
+            async def resolve(self, service, request, user):
+                calls.append('tenant')
+                return '{}-tenant'.format(user)
+
+        class RegionResolver(Resolver):
+            async def resolve(self, service, request):
+                calls.append('region')
+                return 'eu'
+
+        def func(self, user: str, tenant: str, region: str) -> None:
+            calls.append((user, tenant, region))
+
+        inspect = magic_normalize(func, additional_args=(UserResolver, TenantResolver, RegionResolver))
+        await inspect.invokable(Service(), inspect.request())
+        self.assertEqual(calls, ['user', 'region', 'tenant', ('ann', 'ann-tenant', 'eu')])
+
+    async def test_memoize(self):
+        calls = []
+
+        class UserResolver(Resolver):
+            memoize = True
+
+            async def resolve(self, service, request):
+                calls.append('user')
+                return 'ann'
+
+        class TenantResolver(Resolver):
+            dependencies = (UserResolver,)
+
+            async def resolve(self, service, request, user):
+                calls.append('tenant')
+                return '{}-tenant'.format(user)
+
+        graph = ResolverGraph([UserResolver, TenantResolver])
+        self.assertEqual(await graph.resolve(Service(), None), ['ann', 'ann-tenant'])
+        self.assertEqual(calls, ['user', 'tenant'])
+
+        context = RequestContext()
+        self.assertEqual(await graph.resolve(Service(context), None), ['ann', 'ann-tenant'])
+        self.assertEqual(await graph.resolve(Service(context), None), ['ann', 'ann-tenant'])
+        self.assertEqual(await ResolverGraph([TenantResolver]).resolve(Service(context), None), ['ann-tenant'])
+        self.assertEqual(calls, ['user', 'tenant', 'user', 'tenant', 'tenant', 'tenant'])
+
+    async def test_memoize_nested_invoke(self):
+        calls = []
+
+        class UserResolver(Resolver):
+            python = str
+            memoize = True
+
+            async def resolve(self, service, request):
+                calls.append('user')
+                return 'ann'
+
+        class GreetingServiceManager(ServiceManager):
+            def prepare_method(self, method, name):
+                return method.prepare(self, name, UserResolver)
+
+        class GreetingService(venom_rpc.Service):
+            class Meta:
+                manager = GreetingServiceManager
+
+            @rpc
+            async def name(self, user: str) -> str:
+                return user
+
+            @rpc
+            async def greet(self, user: str) -> str:
+                name = await venom.invoke(GreetingService, GreetingService.name, Empty())
+                return 'Hello, {} ({})'.format(user, name.value)
+
+        venom = mock_venom(GreetingService)
+        response = await venom.invoke(GreetingService, GreetingService.greet, Empty())
+        self.assertEqual(response, StringValue('Hello, ann (ann)'))
+        self.assertEqual(calls, ['user'])
+
+        await venom.invoke(GreetingService, GreetingService.greet, Empty())
+        self.assertEqual(calls, ['user', 'user'])
+
+    async def test_context(self):
+        class ContextResolver(Resolver):
+            async def resolve(self, service, request):
+                return RequestContext.current()
+
+        class ServiceContextResolver(Resolver):
+            async def resolve(self, service, request):
+                return service.context
+
+        context = RequestContext()
+        with context:
+            graph = ResolverGraph([ContextResolver, ServiceContextResolver])
+            self.assertEqual(await graph.resolve(Service(context), None), [context, context])
+
+    async def test_shared_on_failure(self):
+        class UserResolver(Resolver):
+            memoize = True
+
+            async def resolve(self, service, request):
+                await asyncio.sleep(0.01)
+                return 'ann'
+
+        class FailingResolver(Resolver):
+            async def resolve(self, service, request):
+                raise ValueError('no tenant')
+
+        context = RequestContext()
+        failing = asyncio.ensure_future(ResolverGraph([UserResolver, FailingResolver]).resolve(Service(context), None))
+        succeeding = asyncio.ensure_future(ResolverGraph([UserResolver]).resolve(Service(context), None))
+
+        with self.assertRaises(ValueError):
+            await failing
+        self.assertEqual(await succeeding, ['ann'])
+        self.assertEqual(list(context.resolved_values()), [UserResolver])
+
+    async def test_cancel_on_failure(self):
+        cancelled = []
+
+        class SlowResolver(Resolver):
+            memoize = True
+
+            async def resolve(self, service, request):
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+
+        class FailingResolver(Resolver):
+            async def resolve(self, service, request):
+                raise ValueError('no tenant')
+
+        context = RequestContext()
+        graph = ResolverGraph([SlowResolver, FailingResolver])
+        with self.assertRaises(ValueError):
+            await graph.resolve(Service(context), None)
+
+        await asyncio.sleep(0)
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(context.resolved_values(), {})
+
+    def test_circular_dependency(self):
+        class AResolver(Resolver):
+            async def resolve(self, service, request, b):
+                pass
+
+        class BResolver(Resolver):
+            dependencies = (AResolver,)
+
+            async def resolve(self, service, request, a):
+                pass
+
+        AResolver.dependencies = (BResolver,)
+
+        with self.assertRaises(RuntimeError) as e:
+            ResolverGraph([AResolver])
+        self.assertEqual(str(e.exception), 'Circular resolver dependency: AResolver -> BResolver -> AResolver')
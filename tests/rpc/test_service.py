@@ -2,9 +2,10 @@ from unittest import TestCase
 
 from venom import Empty
 from venom.common import StringValue
-from venom.rpc import RequestContext, Venom
-from venom.rpc import rpc, Service
+from venom.rpc import RequestContext, Venom, UnknownService
+from venom.rpc import rpc, Service, ServiceProxy
 from venom.rpc.context import DictRequestContext
+from venom.rpc.service import Lifetime
 from venom.rpc.test_utils import AioTestCase
 
 
@@ -50,4 +51,73 @@ class ServiceTestCase(AioTestCase):
 
         self.assertEqual(await venom.invoke(SnakeService, SnakeService.sound, Empty()), StringValue('hiss'))
 
+    async def test_lifetime(self):
+        class CounterService(Service):
+            class Meta:
+                lifetime = 'singleton'
 
+        class ModelService(Service):
+            class Meta:
+                lifetime = Lifetime.POOLED
+                pool_size = 1
+
+        class SnakeService(Service):
+            counter = ServiceProxy(CounterService)
+            model = ServiceProxy('model')
+
+        self.assertEqual(SnakeService.__meta__.lifetime, Lifetime.REQUEST)
+        self.assertEqual(CounterService.__meta__.lifetime, Lifetime.SINGLETON)
+
+        venom = Venom()
+        venom.add(CounterService)
+        venom.add(ModelService)
+        venom.add(SnakeService)
+
+        counter = venom.get_instance(CounterService)
+        self.assertIs(venom.get_instance('counter'), counter)
+        self.assertIsNot(venom.get_instance(SnakeService), venom.get_instance(SnakeService))
+
+        with venom.get_request_context():
+            snake = venom.get_instance(SnakeService)
+            self.assertIs(venom.get_instance(SnakeService), snake)
+            self.assertIs(snake.counter, counter)
+            model = snake.model
+            self.assertIs(snake.model, model)
+
+            with venom.get_request_context():
+                other_model = venom.get_instance(ModelService)
+                self.assertIsNot(other_model, model)
+                self.assertIsNot(venom.get_instance(SnakeService), snake)
+
+        # instances are returned to the pool once the context exits; the pool keeps one of them
+        with venom.get_request_context():
+            self.assertIs(venom.get_instance(ModelService), other_model)
+            with venom.get_request_context():
+                self.assertIsNot(venom.get_instance(ModelService), model)
+
+    async def test_get_instance_memoized(self):
+        class SnakeService(Service):
+            pass
+
+        class OtherSnakeService(Service):
+            class Meta:
+                name = 'snake'
+
+        venom = Venom()
+        venom.add(SnakeService)
+        venom.add(SnakeService)
+
+        with self.assertRaises(ValueError):
+            venom.add(OtherSnakeService)
+
+        with self.assertRaises(UnknownService):
+            venom.get_instance(OtherSnakeService)
+        with self.assertRaises(UnknownService):
+            venom.get_instance('other')
+
+        with venom.get_request_context():
+            snake = venom.get_instance('snake')
+
+            venom._resolve_service_cls = None  # memoized lookups do not resolve the reference again
+            self.assertIs(venom.get_instance('snake'), snake)
+            self.assertIs(venom.get_instance(SnakeService), snake)
@@ -1,6 +1,13 @@
-from unittest import TestCase
+from array import array
+from unittest import TestCase, skipIf
 
-from venom.fields import String, Field, Repeat, _RepeatValueProxy
+from venom import Message
+from venom.fields import String, Field, Repeat, _RepeatValueProxy, Array, Float64, Int32, Map, _MapValueProxy
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class FieldsTestCase(TestCase):
@@ -44,4 +51,57 @@ class FieldsTestCase(TestCase):
         self.assertEqual(list(m.items), [])
 
         m.items.append(1)
-        self.assertEqual(m['items'], [1])
\ No newline at end of file
+        self.assertEqual(m['items'], [1])
+
+    def test_map_field(self):
+        class Pet(Message):
+            toys = Map(Int32())
+
+        pet = Pet()
+        self.assertIsInstance(pet.toys, _MapValueProxy)
+        self.assertEqual(dict(pet.toys), {})
+        self.assertNotIn('toys', pet)
+
+        pet.toys['ball'] = 2
+        self.assertEqual(pet['toys'], {'ball': 2})
+        self.assertIn('ball', pet.toys)
+
+        del pet.toys['ball']
+        self.assertEqual(pet['toys'], {})
+
+    def test_array_field(self):
+        class Vector(Message):
+            values = Array(Float64())
+            counts = Array(Int32())
+
+        v = Vector()
+        self.assertEqual(list(v.values), [])
+
+        v.values.append(1)
+        self.assertEqual(v['values'], array('d', [1.0]))
+
+        v.counts = [1, 2, 3]
+        self.assertEqual(v['counts'], array('i', [1, 2, 3]))
+
+        v = Vector(values=[1.5, 2.5])
+        v.values[0] = 0.5
+        self.assertEqual(v['values'], array('d', [0.5, 2.5]))
+
+        with self.assertRaises(ValueError):
+            Array(String())
+
+    @skipIf(numpy is None, 'numpy is not installed')
+    def test_array_field_numpy(self):
+        class Vector(Message):
+            values = Array(Float64())
+
+        v = Vector(values=array('d', [1.0, 2.0]))
+        view = v.values.to_numpy()
+        self.assertEqual(view.dtype, numpy.float64)
+        view[0] = 5.0
+        self.assertEqual(v['values'], array('d', [5.0, 2.0]))
+
+        values = numpy.arange(4, dtype=numpy.float64)
+        v.values.from_numpy(values)
+        self.assertIs(v.values.to_numpy(), values)
+        self.assertEqual(list(v.values), [0.0, 1.0, 2.0, 3.0])
@@ -43,6 +43,93 @@ class MessageTestCase(TestCase):
             'age'
         ), tuple(Pet.__fields__.keys()))
 
+    def test_message_slots(self):
+        class Pet(Message):
+            sound = String()
+            size = Integer()
+
+        cat = Pet(sound='meow')
+        self.assertFalse(hasattr(cat, '__dict__'))
+
+        with self.assertRaises(AttributeError):
+            cat.color = 'black'
+
+        self.assertEqual(Pet('hiss', 2), Pet(size=2, sound='hiss'))
+
+    def test_message_presence(self):
+        class Pet(Message):
+            sound = String()
+            size = Integer()
+
+        cat = Pet(sound='meow', size=None)
+        self.assertIn('sound', cat)
+        self.assertNotIn('size', cat)
+        self.assertEqual(1, len(cat))
+        self.assertEqual(0, cat.size)
+        self.assertEqual(0, cat.get('size'))
+        self.assertEqual(42, cat.get('size', 42))
+        self.assertEqual(None, cat.get('color'))
+
+        with self.assertRaises(KeyError):
+            cat['size']
+
+        cat.size = 3
+        self.assertEqual({'sound': 'meow', 'size': 3}, dict(cat))
+
+        cat['sound'] = None
+        self.assertNotIn('sound', cat)
+
+        del cat['size']
+        self.assertEqual({}, dict(cat))
+
+        with self.assertRaises(KeyError):
+            del cat['size']
+
+    def test_message_inheritance(self):
+        class Pet(Message):
+            sound = String()
+
+        class Cat(Pet):
+            size = Integer()
+
+        self.assertEqual(('sound', 'size'), tuple(Cat.__fields__.keys()))
+        self.assertEqual({'sound': 'meow', 'size': 2}, dict(Cat('meow', 2)))
+
+    def test_message_field_name(self):
+        class Pet(Message):
+            sound = String(name='noise')
+
+        cat = Pet('meow')
+        self.assertEqual('meow', cat.sound)
+        self.assertEqual({'noise': 'meow'}, dict(cat))
+        self.assertEqual(Pet(noise='meow'), cat)
+
+        cat.sound = 'purr'
+        self.assertEqual('purr', cat['noise'])
+
+    def test_message_multiple_inheritance(self):
+        class Pet(Message):
+            sound = String()
+
+        class Speaking(Message):
+            def speak(self):
+                return super().get('sound')
+
+        class Cat(Pet, Speaking):
+            size = Integer()
+
+        cat = Cat('meow', 2)
+        self.assertEqual(('sound', 'size'), tuple(Cat.__fields__.keys()))
+        self.assertEqual('meow', cat.speak())
+        self.assertFalse(hasattr(cat, '__dict__'))
+
+        class Sized(Message):
+            size = Integer()
+
+        with self.assertRaises(TypeError):
+            class SizedPet(Pet, Sized):
+                pass
+
     @SkipTest
     def test_message_one_of(self):
         class PetFilter(Message):
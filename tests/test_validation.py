@@ -0,0 +1,163 @@
+from unittest import TestCase
+
+from venom import Message
+from venom.exceptions import ValidationError, ErrorResponse
+from venom.fields import String, Int32, Float64, Repeat, Map, Field, Bytes
+from venom.protocol import JSON, MsgPack, Protobuf, URIString
+from venom.validation import validate
+
+
+class Owner(Message):
+    name = String(required=True, min_length=1)
+
+
+class Pet(Message):
+    name = String(required=True, max_length=8, pattern=r'^[A-Z]')
+    age = Int32(min=0, max=30)
+    weight = Float64(min=0.5)
+    sound = String(choices=['hiss', 'meow'])
+    code = Bytes(max_length=2)
+    toys = Repeat(String(min_length=2), max_length=2)
+    scores = Map(Int32(max=10))
+    owner = Field(Owner)
+
+
+class Node(Message):
+    name = String(min_length=1)
+    parent = Field('tests.test_validation.Node')
+
+
+class ValidationTestCase(TestCase):
+    def assertErrors(self, errors, callable_, *args):
+        with self.assertRaises(ValidationError) as e:
+            callable_(*args)
+
+        self.assertEqual([(error.description, error.path) for error in e.exception.errors or [e.exception]], errors)
+
+    def test_constraints(self):
+        protocol = JSON(Pet)
+        pet = Pet('Snek', 3, 1.5, 'hiss', b'\x00', ['ball'], {'tricks': 10}, Owner('Ann'))
+        self.assertEqual(protocol.decode(protocol.encode(pet)), pet)
+        self.assertEqual(protocol.decode({'name': 'S'}), Pet('S'))
+
+        self.assertErrors([("'snek' does not match '^[A-Z]'", ['name'])], protocol.decode, {'name': 'snek'})
+        self.assertErrors([("'Snek the snake' is longer than the maximum length of 8", ['name'])],
+                          protocol.decode, {'name': 'Snek the snake'})
+        self.assertErrors([('-1 is less than the minimum of 0', ['age'])], protocol.decode, {'name': 'S', 'age': -1})
+        self.assertErrors([('31 is greater than the maximum of 30', ['age'])],
+                          protocol.decode, {'name': 'S', 'age': 31})
+        self.assertErrors([('0.0 is less than the minimum of 0.5', ['weight'])],
+                          protocol.decode, {'name': 'S', 'weight': 0})
+        self.assertErrors([("'woof' is not one of ['hiss', 'meow']", ['sound'])],
+                          protocol.decode, {'name': 'S', 'sound': 'woof'})
+        self.assertErrors([("b'abc' is longer than the maximum length of 2", ['code'])],
+                          protocol.decode, {'name': 'S', 'code': 'YWJj'})
+        self.assertErrors([('Expected at most 2 items, got 3', ['toys'])],
+                          protocol.decode, {'name': 'S', 'toys': ['ab', 'cd', 'ef']})
+        self.assertErrors([("'a' is shorter than the minimum length of 2", ['toys'])],
+                          protocol.decode, {'name': 'S', 'toys': ['a']})
+        self.assertErrors([('11 is greater than the maximum of 10', ['scores', 'tricks'])],
+                          protocol.decode, {'name': 'S', 'scores': {'tricks': 11}})
+
+    def test_braces(self):
+        class Address(Message):
+            zip = String(pattern=r'^\d{5}$')
+            kind = String(choices=['{home}', '{work}'])
+
+        protocol = JSON(Address)
+        self.assertEqual(protocol.decode({'zip': '12345', 'kind': '{home}'}), Address('12345', '{home}'))
+        self.assertErrors([("'123' does not match '^\\\\d{5}$'", ['zip'])], protocol.decode, {'zip': '123'})
+        self.assertErrors([("'home' is not one of ['{home}', '{work}']", ['kind'])],
+                          protocol.decode, {'kind': 'home'})
+
+    def test_collect_errors(self):
+        protocol = JSON(Pet)
+        self.assertErrors([
+            ('This field is required', ['name']),
+            ("42 is not of type 'str'", ['sound']),
+            ('This field is required', ['owner', 'name']),
+        ], protocol.decode, {'sound': 42, 'owner': {}})
+
+        with self.assertRaises(ValidationError) as e:
+            protocol.decode({'age': 99, 'owner': {'name': ''}})
+
+        self.assertEqual(e.exception.description, 'This field is required')
+        self.assertEqual(e.exception.path, ['name'])
+        self.assertEqual(e.exception.format(), ErrorResponse(400, 'This field is required', 'name', [
+            ErrorResponse(400, 'This field is required', 'name'),
+            ErrorResponse(400, '99 is greater than the maximum of 30', 'age'),
+            ErrorResponse(400, "'' is shorter than the minimum length of 1", 'owner.name')
+        ]))
+
+        self.assertErrors([('This field is required', ['0', 'name']),
+                           ('This field is required', ['0', 'owner', 'name'])],
+                          protocol.unpack_many, b'{"owner": {}}\n')
+
+    def test_lazy(self):
+        protocol = JSON(Pet)
+        pet = protocol.unpack(b'{"name": "S", "owner": {}}', lazy=True)
+
+        with self.assertRaises(ValidationError) as e:
+            pet.owner
+
+        self.assertEqual(e.exception.path, ['owner', 'name'])
+
+        class Pets(Message):
+            owner = Field(Owner, required=True)
+
+        self.assertErrors([('This field is required', ['owner'])], JSON(Pets).unpack, b'{}', True)
+
+    def test_msgpack(self):
+        protocol = MsgPack(Pet)
+        self.assertErrors([('-1 is less than the minimum of 0', ['age'])], protocol.decode, {'name': 'S', 'age': -1})
+
+    def test_uri_string(self):
+        protocol = URIString(Pet, {'age'})
+        self.assertEqual(protocol.decode({'age': '3'}), Pet(age=3))
+        self.assertErrors([('31 is greater than the maximum of 30', ['age'])], protocol.decode, {'age': '31'})
+
+    def test_protobuf(self):
+        protocol = Protobuf(Pet)
+        pet = Pet('Snek', 3, 1.5, 'hiss', b'\x00', ['ball'], {'tricks': 10}, Owner('Ann'))
+        self.assertEqual(protocol.unpack(protocol.pack(pet)), pet)
+
+        self.assertErrors([('This field is required', ['name']),
+                           ('Expected at most 2 items, got 3', ['toys'])],
+                          protocol.unpack, protocol.pack(Pet(toys=['ab', 'cd', 'ef'])))
+
+        self.assertErrors([('This field is required', ['name']),
+                           ('Expected at most 2 items, got 3', ['toys']),
+                           ('This field is required', ['owner', 'name'])],
+                          protocol.unpack, protocol.pack(Pet(owner=Owner(), toys=['ab', 'cd', 'ef'])))
+
+    def test_protobuf_recursive(self):
+        protocol = Protobuf(Node)
+        node = Node('a', Node('b'))
+        self.assertEqual(protocol.unpack(protocol.pack(node)), node)
+        self.assertErrors([("'' is shorter than the minimum length of 1", ['parent', 'name'])],
+                          protocol.unpack, protocol.pack(Node('a', Node(''))))
+
+        error = ErrorResponse(400, 'Bad Request', errors=[ErrorResponse(400, 'Bad Request')])
+        self.assertEqual(Protobuf(ErrorResponse).unpack(Protobuf(ErrorResponse).pack(error)), error)
+
+    def test_trusted(self):
+        invalid = Pet('snek', -1, toys=['a', 'b', 'c'], scores={'tricks': 11}, owner=Owner())
+        for protocol in (JSON(Pet), MsgPack(Pet), Protobuf(Pet)):
+            with self.subTest(protocol=protocol.name):
+                self.assertEqual(protocol.unpack(protocol.pack(invalid), trusted=True), invalid)
+                with self.assertRaises(ValidationError):
+                    protocol.unpack(protocol.pack(invalid))
+
+        weight = JSON(Pet).unpack(b'{"weight": 1}', trusted=True).weight
+        self.assertEqual(weight, 1.0)
+        self.assertIs(type(weight), float)
+
+    def test_validate(self):
+        validate(Pet('Snek'))
+        self.assertErrors([('This field is required', ['name']),
+                           ('-1 is less than the minimum of 0', ['age']),
+                           ("'a' is shorter than the minimum length of 2", ['toys', '1'])],
+                          validate, Pet(age=-1, toys=['ab', 'a']))
+        self.assertErrors([('This field is required', ['owner', 'name'])], validate, Pet('Snek', owner=Owner()))
+        self.assertErrors([("'' is shorter than the minimum length of 1", ['parent', 'parent', 'name'])],
+                          validate, Node('a', Node('b', Node(''))))
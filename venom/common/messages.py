@@ -90,13 +90,14 @@ class FieldMask(Message):
     class Meta:
         proto_package = 'google.protobuf'
 
-    # TODO needs tests
     def match_path(self, *path: Tuple[str]) -> bool:
-        for level in range(len(path)):
-            match_path = '.'.join(path[:level + 1])
-            for path_ in self.paths:
-                if match_path in path_:
-                    return True
+        """
+        :return: whether the field at `path` or any field nested within it is selected by this mask
+        """
+        match_path = '.'.join(path)
+        for path_ in self.paths:
+            if path_ == match_path or match_path.startswith(path_ + '.') or path_.startswith(match_path + '.'):
+                return True
         return False
 
 
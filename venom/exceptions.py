@@ -1,5 +1,7 @@
+from typing import List
+
 from venom import Message
-from venom.fields import Int32, String
+from venom.fields import Int32, String, Repeat, Field
 
 
 # TODO consider moving that into the implementations. Should at least be moved into rpc.*
@@ -10,6 +12,9 @@ class ErrorResponse(Message):
     # TODO Repeat(String)
     path = String()
 
+    # all errors, when more than one error was found in a request
+    errors = Repeat(Field('venom.exceptions.ErrorResponse'))
+
     # TODO helper for raising errors
     def raise_(self):
         if self.status == 501:
@@ -69,14 +74,46 @@ class ServerError(Error):
     description = 'Internal Server Error'
 
 
+class ServiceUnavailable(Error):
+    http_status = 503
+    description = 'Service Unavailable'
+
+
+class DeadlineExceeded(Error):
+    http_status = 504
+    description = 'Deadline Exceeded'
+
+
 class ValidationError(BadRequest):
-    def __init__(self, message, path=None):
+    def __init__(self, message, path=None, errors: List['ValidationError'] = None):
         super().__init__(message)
-        self.path = path or []
+        self.path = path if path is not None else []
+        self.errors = errors
+
+    @classmethod
+    def collect(cls, errors: List['ValidationError']) -> 'ValidationError':
+        """
+        :return: an error that reports all `errors`; its description and path are those of the first error
+        """
+        if len(errors) == 1:
+            return errors[0]
+        return cls(errors[0].description, errors[0].path, errors)
+
+    def prefix(self, *path: str) -> 'ValidationError':
+        """
+        Prepends `path` to the path of this error and of all errors collected with it.
+        """
+        self.path[0:0] = path
+        if self.errors:
+            for error in self.errors[1:]:
+                error.path[0:0] = path
+        return self
 
     def format(self) -> ErrorResponse:
         msg = super().format()
         msg.description = self.description
         if self.path:
            msg.path = '.'.join(self.path)
+        if self.errors:
+            msg.errors = [ValidationError.format(error) for error in self.errors]
         return msg
@@ -1,20 +1,48 @@
 from abc import ABCMeta
+from array import array
 from importlib import import_module
-from typing import Iterable, TypeVar, Generic, Any, Tuple, Union, Type
+from typing import Iterable, TypeVar, Generic, Any, Union, Type, Callable
 
 import collections
 
-from venom.util import cached_property, AttributeDict
+from venom.util import cached_property, AttributeDict, NOT_SET
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 T = TypeVar('T', bool, int, float, str, bytes, 'venom.message.Message')
 
 
+class LazyValue(object):
+    """
+    A raw field value that is decoded when the field is first accessed.
+
+    :param decode: a function that decodes (and validates) `value`
+    """
+    __slots__ = ('decode', 'value')
+
+    def __init__(self, decode: Callable[[Any], Any], value: Any) -> None:
+        self.decode = decode
+        self.value = value
+
+    def resolve(self) -> Any:
+        return self.decode(self.value)
+
+
 class FieldDescriptor(Generic[T], metaclass=ABCMeta):
     name: str = None
+    number: int = None  # field number used by binary protocols; defaults to the position of the field
+    slot: str = None  # set by MessageMeta; name of the instance slot holding the value
 
     def __get__(self, instance: 'venom.message.Message', owner):
         if instance is None:
             return self
+        if self.slot is not None:
+            value = getattr(instance, self.slot, NOT_SET)
+            if value is not NOT_SET and type(value) is not LazyValue:
+                return value
         try:
             return instance[self.name]
         except KeyError:
@@ -35,11 +63,13 @@ class Field(Generic[T], FieldDescriptor):
                  type_: Union[Type[T], str],
                  default: Any = None,
                  name: str = None,
+                 number: int = None,
                  **options) -> None:
         self._type = type_
         self._default = default
         self.options = AttributeDict(options)
         self.name = name
+        self.number = number
 
     def default(self):
         if self._default is None:
@@ -60,7 +90,7 @@ class Field(Generic[T], FieldDescriptor):
     def __eq__(self, other):
         if not isinstance(other, Field):
             return False
-        return self.type == other.type and self.options == other.options
+        return self.type == other.type and self.options == other.options and self.number == other.number
 
     def __repr__(self):
         return '<{} {}:{}>'.format(self.__class__.__name__,
@@ -140,6 +170,10 @@ class _RepeatValueProxy(collections.MutableSequence):
         except KeyError:
             return list()
 
+    def _mutable_sequence(self) -> list:
+        self.message[self.name] = sequence = self._sequence
+        return sequence
+
     def __len__(self):
         return len(self._sequence)
 
@@ -147,25 +181,24 @@ class _RepeatValueProxy(collections.MutableSequence):
         return self._sequence[index]
 
     def insert(self, index, value):
-        self.message[self.name] = sequence = self._sequence
-        sequence.insert(index, value)
+        self._mutable_sequence().insert(index, value)
 
     def __delitem__(self, index):
-        self.message[self.name] = sequence = self._sequence
-        del sequence[index]
+        del self._mutable_sequence()[index]
 
     def __setitem__(self, index, value):
-        self.message[self.name] = sequence = self._sequence
-        sequence[index] = value
+        self._mutable_sequence()[index] = value
 
     def __iter__(self):
         return iter(self._sequence)
 
 
 class RepeatField(Generic[CT], FieldDescriptor):
-    def __init__(self, items: Type[CT], name: str = None) -> None:
+    def __init__(self, items: Type[CT], name: str = None, number: int = None, **options) -> None:
         self.items = items
         self.name = name
+        self.number = number
+        self.options = AttributeDict(options)
 
     def __get__(self, instance: 'venom.message.Message', owner):
         if instance is None:
@@ -175,25 +208,161 @@ class RepeatField(Generic[CT], FieldDescriptor):
     def __eq__(self, other):
         if not isinstance(other, RepeatField):
             return False
-        return self.items == other.items and self.name == other.name
+        return self.items == other.items and self.name == other.name and self.number == other.number and \
+               self.options == other.options
+
+
+def as_array(typecode: str, values: Iterable[Union[int, float]]) -> array:
+    """
+    Converts a sequence of numbers to an :class:`array.array`, without copying if it already is one. NumPy arrays
+    are converted through their buffer.
+    """
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        converted = array(typecode)
+        converted.frombytes(numpy.ascontiguousarray(values, dtype=typecode).tobytes())
+        return converted
+    return array(typecode, values)
+
+
+class _ArrayValueProxy(_RepeatValueProxy):
+    def __init__(self, message: 'venom.message.Message', name: str, typecode: str):
+        super().__init__(message, name)
+        self.typecode = typecode
+
+    @property
+    def _sequence(self) -> Union[array, list]:
+        try:
+            return self.message[self.name]
+        except KeyError:
+            return array(self.typecode)
+
+    def _mutable_sequence(self) -> array:
+        self.message[self.name] = sequence = as_array(self.typecode, self._sequence)
+        return sequence
+
+    def to_numpy(self) -> 'numpy.ndarray':
+        """
+        :return: a NumPy array that shares memory with the field value
+        """
+        if numpy is None:
+            raise RuntimeError("You must install the 'numpy' package to use NumPy arrays with Venom")
+
+        sequence = self._sequence
+        if isinstance(sequence, numpy.ndarray):
+            return sequence
+        if not isinstance(sequence, array) or sequence.typecode != self.typecode:
+            sequence = self._mutable_sequence()
+        return numpy.frombuffer(sequence, dtype=self.typecode)
+
+    def from_numpy(self, values: 'numpy.ndarray') -> None:
+        """
+        Sets the field value to `values`, without copying if it is a contiguous array of the item type.
+        """
+        if numpy is None:
+            raise RuntimeError("You must install the 'numpy' package to use NumPy arrays with Venom")
+        self.message[self.name] = numpy.ascontiguousarray(values, dtype=self.typecode)
+
+
+class ArrayField(RepeatField):
+    """
+    A repeated numeric field whose value is stored compactly as an :class:`array.array` or a NumPy array.
+    """
+    def __init__(self, items: Field, name: str = None, number: int = None, **options) -> None:
+        super().__init__(items, name, number, **options)
+        if isinstance(items, Int32):
+            self.typecode = 'i'
+        elif isinstance(items, Float32):
+            self.typecode = 'f'
+        elif isinstance(items, Field) and items.type in (int, float):
+            self.typecode = 'q' if items.type is int else 'd'
+        else:
+            raise ValueError('Unable to store {} in an array; items must be integer or float fields'.format(items))
+
+    def __get__(self, instance: 'venom.message.Message', owner):
+        if instance is None:
+            return self
+        return _ArrayValueProxy(instance, self.name, self.typecode)
+
+    def __set__(self, instance: 'venom.message.Message', value: Iterable[Union[int, float]]):
+        if value is not None and not (numpy is not None and isinstance(value, numpy.ndarray)):
+            value = as_array(self.typecode, value)
+        instance[self.name] = value
+
+
+class _MapValueProxy(collections.MutableMapping):
+    def __init__(self, message: 'venom.message.Message', name: str):
+        self.message = message
+        self.name = name
+
+    @property
+    def _mapping(self) -> dict:
+        try:
+            return self.message[self.name]
+        except KeyError:
+            return dict()
+
+    def _mutable_mapping(self) -> dict:
+        self.message[self.name] = mapping = self._mapping
+        return mapping
+
+    def __len__(self):
+        return len(self._mapping)
+
+    def __getitem__(self, key):
+        return self._mapping[key]
+
+    def __setitem__(self, key, value):
+        self._mutable_mapping()[key] = value
+
+    def __delitem__(self, key):
+        del self._mutable_mapping()[key]
+
+    def __iter__(self):
+        return iter(self._mapping)
+
+    def __contains__(self, key):
+        return key in self._mapping
 
 
 class MapField(Generic[CT], FieldDescriptor):
-    def __init__(self, values: Type[CT], name: str = None) -> None:
+    def __init__(self, values: Type[CT], name: str = None, number: int = None, **options) -> None:
         super().__init__()
         self.keys = String()
         self.values = values
         self.name = name
+        self.number = number
+        self.options = AttributeDict(options)
+
+    def __get__(self, instance: 'venom.message.Message', owner):
+        if instance is None:
+            return self
+        return _MapValueProxy(instance, self.name)
+
+    def __eq__(self, other):
+        if not isinstance(other, MapField):
+            return False
+        return self.values == other.values and self.name == other.name and self.number == other.number and \
+               self.options == other.options
+
+
+def _field(field: Union[Field, MapField, RepeatField, type, str]) -> Union[Field, MapField, RepeatField]:
+    if isinstance(field, type) and issubclass(field, Field):
+        field = field()
+    if not isinstance(field, (Field, MapField, RepeatField)):
+        field = Field(field)
+    return field
 
 
 def Repeat(items: Union[Field, MapField, RepeatField, type, str], **kwargs) -> RepeatField:
-    if isinstance(items, type) and issubclass(items, Field):
-        items = items()
-    if not isinstance(items, (Field, MapField, RepeatField)):
-        items = Field(items)
-    return RepeatField(items, **kwargs)
+    return RepeatField(_field(items), **kwargs)
+
+
+def Array(items: Union[Field, type], **kwargs) -> ArrayField:
+    return ArrayField(_field(items), **kwargs)
 
 
 def Map(values: Union[Field, MapField, RepeatField, type, str], **kwargs) -> MapField:
     # TODO keys argument.
-    return MapField(values, **kwargs)
+    return MapField(_field(values), **kwargs)
@@ -1,10 +1,11 @@
 from abc import ABCMeta
 from collections import MutableMapping
 from collections import OrderedDict
-from typing import Any, Dict, Type, Iterable, TypeVar, Tuple, Set
+from keyword import iskeyword
+from typing import Any, Dict, Type, Iterable, TypeVar, Tuple
 
-from venom.fields import FieldDescriptor
-from venom.util import meta
+from venom.fields import FieldDescriptor, LazyValue
+from venom.util import meta, compile_function, NOT_SET
 
 
 class OneOf(object):
@@ -20,34 +21,102 @@ class OneOf(object):
         raise NotImplementedError
 
 
+def _slot_name(key: str) -> str:
+    return '_f_' + key
+
+
+def _compile_init(name: str, slot_names: Dict[str, str]):
+    """
+    Generates an ``__init__`` that assigns every slot directly, accepting field values by position or keyword.
+
+    Returns ``None`` if a field name cannot be used as a parameter name; the generic
+    :meth:`Message.__init__` is used in that case.
+    """
+    keys = tuple(slot_names.keys())
+    if any(not key.isidentifier() or iskeyword(key) or key == 'self' for key in keys):
+        return None
+
+    lines = ['def __init__(self{}):'.format(''.join(', {}=None'.format(key) for key in keys))]
+    for key, slot in slot_names.items():
+        lines.append('    self.{} = NOT_SET if {} is None else {}'.format(slot, key, key))
+    if not keys:
+        lines.append('    pass')
+
+    init = compile_function('__init__', lines, {'NOT_SET': NOT_SET})
+    init.__qualname__ = '{}.__init__'.format(name)
+    init.__compiled__ = True
+    return init
+
+
+def _check_bases(name: str, bases: Tuple[type, ...]) -> None:
+    """
+    :raises TypeError: if fields are inherited from more than one unrelated base, since only one base can contribute
+        slots to the layout of a class
+    """
+    slotted = []
+    for base in bases:
+        if isinstance(base, MessageMeta) and base.__slot_names__ and \
+                not any(issubclass(other, base) or issubclass(base, other) for other in slotted):
+            slotted.append(base)
+    if len(slotted) > 1:
+        raise TypeError("Message '{}' cannot inherit fields from both {}: their slot layouts conflict".format(
+            name, ' and '.join(base.__name__ for base in slotted)))
+
+
 class MessageMeta(ABCMeta):
     @classmethod
     def __prepare__(metacls, name, bases):
         return OrderedDict()
 
     def __new__(metacls, name, bases, members):
+        _check_bases(name, bases)
+
+        fields_ = OrderedDict()
+        base_slots = set()
+        for base in reversed(bases):
+            fields_.update(getattr(base, '__fields__', None) or ())
+            base_slots.update((getattr(base, '__slot_names__', None) or {}).values())
+
+        # fields are keyed by their name, which may differ from the attribute holding them
+        for key, member in members.items():
+            if isinstance(member, FieldDescriptor):
+                if member.name is None:
+                    member.name = key
+                member.slot = _slot_name(key)
+                fields_[member.name] = member
+
+        slot_names = OrderedDict((name, field.slot) for name, field in fields_.items())
+        members['__slots__'] = tuple(members.get('__slots__', ())) + \
+                               tuple(slot for slot in slot_names.values() if slot not in base_slots)
+
         cls = super(MessageMeta, metacls).__new__(metacls, name, bases, members)
-        cls.__fields__ = OrderedDict(getattr(cls, '__fields__') or ())
+        cls.__fields__ = fields_
+        cls.__slot_names__ = slot_names
         cls.__meta__, meta_changes = meta(bases, members)
         cls.__meta__.protocols = {}
+        cls.__meta__.protocol_subsets = OrderedDict()
+        cls.__meta__.validator = None
 
         if not meta_changes.get('name', None):
             cls.__meta__.name = name
 
-        for name, member in members.items():
-            if isinstance(member, FieldDescriptor):
-                cls.__fields__[name] = member
-                if member.name is None:
-                    member.name = name
-            elif isinstance(member, OneOf):
-                cls.__meta__.one_of_groups += (name, member.choices)
+        for key, member in members.items():
+            if isinstance(member, OneOf):
+                cls.__meta__.one_of_groups += (key, member.choices)
 
+        # only replace __init__ when no class in the hierarchy customizes it
+        if '__init__' not in members and (getattr(cls.__init__, '__compiled__', False) or
+                                          cls.__init__ is Message.__init__):
+            init = _compile_init(name, slot_names)
+            if init is not None:
+                cls.__init__ = init
         return cls
 
 
 class Message(MutableMapping, metaclass=MessageMeta):
-    __slots__ = ('_values',)   # TODO slot message fields directly.
+    __slots__ = ()
     __fields__: Dict[str, FieldDescriptor] = None
+    __slot_names__: Dict[str, str] = None
     __meta__: Dict[str, Any] = None
 
     class Meta:
@@ -56,52 +125,69 @@ class Message(MutableMapping, metaclass=MessageMeta):
         protocols = None
 
     def __init__(self, *args, **kwargs):
-        if args:
-            self._values = {}
-            for value, key in zip(args, self.__fields__.keys()):
-                self[key] = value
-            for key, value in kwargs.items():
-                self[key] = value
-        else:
-            self._values = {key: value for key, value in kwargs.items() if value is not None}
+        for slot in self.__slot_names__.values():
+            setattr(self, slot, NOT_SET)
+        for value, key in zip(args, self.__fields__.keys()):
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
 
     def get(self, key, default=None):
         try:
-            return self._values[key]
+            slot = self.__slot_names__[key]
         except KeyError:
-            if default is None and key in self.__fields__:
+            return default
+        value = getattr(self, slot, NOT_SET)
+        if value is NOT_SET:
+            if default is None:
                 return self.__fields__[key].default()
             return default
+        if type(value) is LazyValue:
+            value = value.resolve()
+            setattr(self, slot, value)
+        return value
 
     def __getitem__(self, key):
-        return self._values[key]
+        slot = self.__slot_names__[key]
+        value = getattr(self, slot, NOT_SET)
+        if value is NOT_SET:
+            raise KeyError(key)
+        if type(value) is LazyValue:
+            value = value.resolve()
+            setattr(self, slot, value)
+        return value
 
     def __setitem__(self, key, value):
         if value is None:
-            try:
-                del self._values[key]
-            except KeyError:
-                pass
-        else:
-            self._values[key] = value
+            value = NOT_SET
+        setattr(self, self.__slot_names__[key], value)
 
     def __delitem__(self, key):
-        del self._values[key]
+        slot = self.__slot_names__[key]
+        if getattr(self, slot, NOT_SET) is NOT_SET:
+            raise KeyError(key)
+        setattr(self, slot, NOT_SET)
 
     def __contains__(self, key):
-        return key in self._values
+        try:
+            return getattr(self, self.__slot_names__[key], NOT_SET) is not NOT_SET
+        except KeyError:
+            return False
 
     def __iter__(self):
-        return iter(self._values)
+        for key, slot in self.__slot_names__.items():
+            if getattr(self, slot, NOT_SET) is not NOT_SET:
+                yield key
 
     def __len__(self):
-        return len(self._values)
+        return sum(1 for _ in self)
 
     def __repr__(self):
         parts = []
-        for key in self.__fields__.keys():
-            if key in self._values:
-                parts.append('{}={}'.format(key, repr(self._values[key])))
+        for key, slot in self.__slot_names__.items():
+            value = getattr(self, slot, NOT_SET)
+            if value is not NOT_SET:
+                parts.append('{}={}'.format(key, repr(value)))
         return '{}({})'.format(self.__meta__.name, ', '.join(parts))
 
 
@@ -109,7 +195,7 @@ def fields(message: Type[Message]) -> Iterable[FieldDescriptor]:
     return message.__fields__.values()
 
 
-def field_names(message: Type[Message]) -> Iterable[FieldDescriptor]:
+def field_names(message: Type[Message]) -> Iterable[str]:
     return message.__fields__.keys()
 
 
@@ -1,15 +1,23 @@
+import asyncio
+import re
 from abc import ABCMeta, abstractmethod
+from array import array
 from base64 import b64encode, b64decode
+from codecs import getincrementaldecoder
 from functools import partial
-from json import JSONDecodeError
-from typing import Type, TypeVar, Generic, Callable, Union, Any, Tuple, Iterable, Dict, List, Set, MutableMapping, \
-    Mapping
+from struct import Struct
+from json import JSONDecodeError, JSONDecoder
+from typing import Type, TypeVar, Callable, Union, Any, Tuple, Iterable, Dict, List, Set, Mapping, Iterator, BinaryIO, \
+    AsyncIterator
 
 from venom import Empty
 from venom import Message
 from venom.exceptions import ValidationError
-from venom.fields import Field, ConverterField, RepeatField, FieldDescriptor
+from venom.fields import Field, RepeatField, MapField, FieldDescriptor, LazyValue, ArrayField
 from venom.message import field_names, fields
+from venom.util import compile_function, reference, indent, NOT_SET
+from venom.protocol.json_backends import get_json_backend
+from venom.validation import constraint_source, is_required, required_source, REQUIRED_MESSAGE
 
 
 # def partial(message: Type[Message], include: Set[str], name: str = None):
@@ -24,38 +32,87 @@ from venom.message import field_names, fields
 #         return message_factory(name, {name: field for name, field in fields(message) if name in include})
 
 
-class Protocol(metaclass=ABCMeta):
-    mime: str = None
-    name: str = None
+_FRAME_LENGTH = Struct('>I')
+
+
+def _field_paths(paths: Iterable[str]) -> Dict[str, Set[str]]:
+    """
+    Groups field mask paths such as ``'owner.name'`` by their first component.
+
+    :return: a mapping of field names to the paths selected within them; an empty set selects the whole field
+    """
+    field_paths = {}
+    for path in paths:
+        name, _, nested_path = path.partition('.')
+        if name in field_paths:
+            if field_paths[name] and nested_path:
+                field_paths[name].add(nested_path)
+            else:
+                field_paths[name] = set()
+        else:
+            field_paths[name] = {nested_path} if nested_path else set()
+    return field_paths
+
 
-    def __new__(cls, fmt: Type[Message], field_names: Set[str] = None):
+class ProtocolMeta(ABCMeta):
+    def __call__(cls, fmt: Type[Message], field_names: Set[str] = None):
         if field_names is None:
             try:
                 return fmt.__meta__.protocols[cls.name]
             except KeyError:
-                instance = super(Protocol, cls).__new__(cls)
-                instance.__init__(fmt)
-                return instance
-        # elif len(field_names) == 0:
-        #     return Protocol.__new__(cls, Empty)
-        else:
-            instance = super(Protocol, cls).__new__(cls)
-            instance.__init__(fmt, field_names)
-            return instance
+                return super().__call__(fmt)
+
+        # protocols for subsets of fields are kept in a least-recently-used cache per message type
+        cache = fmt.__meta__.protocol_subsets
+        key = (cls, frozenset(field_names))
+        try:
+            protocol = cache[key]
+            cache.move_to_end(key)
+            return protocol
+        except KeyError:
+            pass
+
+        protocol = cache[key] = super().__call__(fmt, field_names)
+        if len(cache) > cls.max_cached_subsets:
+            cache.popitem(last=False)
+        return protocol
+
+
+class Protocol(metaclass=ProtocolMeta):
+    mime: str = None
+    name: str = None
+    max_cached_subsets: int = 64
+    #: whether :meth:`unpack_stream` decodes incrementally rather than reading the whole stream first
+    streaming: bool = False
 
     def __init__(self, fmt: Type[Message], field_names_: Set[str] = None):
+        """
+        :param field_names_: names of the fields to include, or dotted paths selecting fields of nested messages
+        """
         if field_names_ is None:
             field_names_ = field_names(fmt)
             fmt.__meta__.protocols[self.name] = self
         self._format = fmt
-        self._fields = [field for field in fields(fmt) if field.name in field_names_]
+        self._field_paths = _field_paths(field_names_)
+        self._fields = [field for field in fields(fmt) if field.name in self._field_paths]
 
     @classmethod
-    def _get_protocol(cls, fmt: Type[Message]):
+    def _get_protocol(cls, fmt: Type[Message], field_names_: Set[str] = None):
         try:
-            return fmt.__meta__.protocols[cls.name]
+            protocol = fmt.__meta__.protocols[cls.name]
         except KeyError:
-            return cls(fmt)
+            protocol = cls(fmt)
+
+        if field_names_:
+            return protocol.subset(field_names_)
+        return protocol
+
+    def subset(self, field_names_: Iterable[str]) -> 'Protocol':
+        """
+        :param field_names_: names of fields or dotted paths, e.g. the paths of a :class:`FieldMask`
+        :return: a protocol for the same message type that only encodes and decodes the given fields
+        """
+        return type(self)(self._format, frozenset(field_names_))
 
     @abstractmethod
     def pack(self, message: Message) -> bytes:
@@ -65,17 +122,163 @@ class Protocol(metaclass=ABCMeta):
     def unpack(self, buffer: bytes) -> Message:
         pass
 
+    def pack_many(self, messages: Iterable[Message]) -> bytes:
+        """
+        Packs a sequence of messages. By default each message is prefixed with its length as a 32-bit big-endian
+        unsigned integer.
+        """
+        pack, frame_length = self.pack, _FRAME_LENGTH.pack
+        parts = []
+        for message in messages:
+            buffer = pack(message)
+            parts.append(frame_length(len(buffer)))
+            parts.append(buffer)
+        return b''.join(parts)
+
+    def unpack_many(self, buffer: bytes) -> List[Message]:
+        """
+        Unpacks a sequence of messages packed with :meth:`pack_many`.
+        """
+        unpack, frame_length = self.unpack, _FRAME_LENGTH.unpack_from
+        view = memoryview(buffer)
+        messages = []
+        pos, end = 0, len(view)
+        while pos < end:
+            if pos + _FRAME_LENGTH.size > end:
+                raise ValidationError('Truncated frame')
+            length, = frame_length(view, pos)
+            pos += _FRAME_LENGTH.size
+            if pos + length > end:
+                raise ValidationError('Truncated frame')
+            messages.append(unpack(bytes(view[pos:pos + length])))
+            pos += length
+        return messages
+
+    def iter_unpack(self, stream: BinaryIO) -> Iterator[Message]:
+        """
+        Unpacks messages packed with :meth:`pack_many` one at a time from a binary file-like object.
+        """
+        unpack, frame_length = self.unpack, _FRAME_LENGTH.unpack
+        while True:
+            header = stream.read(_FRAME_LENGTH.size)
+            if not header:
+                return
+            if len(header) < _FRAME_LENGTH.size:
+                raise ValidationError('Truncated frame')
+            length, = frame_length(header)
+            buffer = stream.read(length)
+            if len(buffer) < length:
+                raise ValidationError('Truncated frame')
+            yield unpack(buffer)
+
+    async def unpack_stream(self, stream: asyncio.StreamReader) -> Message:
+        """
+        Unpacks a message from an asynchronous byte stream such as :class:`aiohttp.StreamReader`. By default the
+        whole stream is read before unpacking.
+        """
+        return self.unpack(await stream.read())
 
-try:
-    import ujson as json
-except ImportError:
-    import json
 
 JSONPrimitive = Union[str, int, float, bool]
 
 JSONValue = Union[JSONPrimitive, Dict[str, JSONPrimitive], List[JSONPrimitive]]
 
 
+_JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_JSON_DELIMITER = re.compile(r'[ \t\n\r,\]}]')
+
+
+class _JSONStreamReader(object):
+    """
+    Reads JSON values from an asynchronous byte stream, buffering no more text than the largest value being read.
+    """
+
+    def __init__(self, stream: asyncio.StreamReader, chunk_size: int):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._text = getincrementaldecoder('utf-8')()
+        self._raw_decode = JSONDecoder().raw_decode
+        self._buffer = ''
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+
+    async def _fill(self, size: int) -> bool:
+        """
+        Reads at least `size` bytes from the stream, in chunks of up to the chunk size, unless it is exhausted.
+
+        :return: whether any data was added to the buffer
+        """
+        if self._eof:
+            return False
+
+        chunks = []
+        while size > 0:
+            chunk = await self._stream.read(self._chunk_size)
+            if not chunk:
+                self._eof = True
+                break
+            chunks.append(chunk)
+            size -= len(chunk)
+
+        try:
+            text = self._text.decode(b''.join(chunks), final=self._eof)
+        except UnicodeDecodeError as e:
+            raise ValidationError("Invalid JSON: {}".format(str(e)))
+
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos:] + text
+        self._pos = 0
+        return bool(chunks)
+
+    def error(self, expected: str) -> ValidationError:
+        return ValidationError("Invalid JSON: Expecting {} (char {})".format(expected, self._offset + self._pos))
+
+    async def peek(self) -> str:
+        """
+        :return: the next character that is not whitespace, or an empty string at the end of the stream
+        """
+        while True:
+            self._pos = _JSON_WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not await self._fill(1):
+                return ''
+
+    async def read_char(self, expected: str) -> str:
+        """
+        Consumes the next character that is not whitespace, which must be one of `expected`.
+        """
+        char = await self.peek()
+        if not char or char not in expected:
+            raise self.error(' or '.join(repr(c) for c in expected))
+        self._pos += 1
+        return char
+
+    async def read_value(self) -> JSONValue:
+        char = await self.peek()
+        if not char:
+            raise self.error('value')
+
+        # a number is only complete once it is followed by a delimiter or the end of the stream
+        if char in '-0123456789':
+            while _JSON_DELIMITER.search(self._buffer, self._pos) is None:
+                if not await self._fill(1):
+                    break
+
+        while True:
+            try:
+                value, end = self._raw_decode(self._buffer, self._pos)
+            except JSONDecodeError as e:
+                # the value may continue in data not yet read; grow the buffer geometrically to stay linear
+                if await self._fill(len(self._buffer) - self._pos):
+                    continue
+                raise ValidationError("Invalid JSON: {} (char {})".format(e.msg, self._offset + e.pos))
+
+            self._pos = end
+            return value
+
+
 class DictProtocol(Protocol, metaclass=ABCMeta):
     @abstractmethod
     def encode(self, message: Message):
@@ -86,15 +289,45 @@ class DictProtocol(Protocol, metaclass=ABCMeta):
         pass
 
 
+def _is_nested(field: FieldDescriptor) -> bool:
+    """
+    :return: whether the field holds messages, directly or in a list or map; these fields can be decoded lazily.
+    """
+    if isinstance(field, RepeatField):
+        field = field.items
+    elif isinstance(field, MapField):
+        field = field.values
+    return isinstance(field, Field) and issubclass(field.type, Message)
+
+
+def _resolve_lazy_source(field: FieldDescriptor, value: str, message: str) -> List[str]:
+    if not _is_nested(field):
+        return []
+    return [
+        'if type({}) is LazyValue:'.format(value),
+        '    {} = {}[{}]'.format(value, message, repr(field.name))
+    ]
+
+
 class JSON(DictProtocol):
+    """
+    :cvar json_backend: the name of the :mod:`venom.protocol.json_backends` backend to serialize with, or ``None``
+        for the default backend. Since protocols are cached by name, a subclass that selects a backend should also
+        set its own :attr:`name`.
+    """
     mime = 'application/json'
     name = 'json'
+    streaming = True
+    json_backend: str = None
 
     def __init__(self, fmt: Type[Message], field_names_: Set[str] = None):
         super().__init__(fmt, field_names_)
+        self._json = None if self.json_backend is None else get_json_backend(self.json_backend)
         # TODO camelCase conversion
-        self.field_encoders = {field.name: self._field_encoder(field) for field in self._fields}
-        self.field_decoders = {field.name: self._field_decoder(field) for field in self._fields}
+        self._encode = self._compile_encoder()
+        self._decode = self._compile_decoder()
+        self._decoder_variants = {}
+        self._stream_decoders = {}
 
     T = TypeVar('T')
 
@@ -111,92 +344,546 @@ class JSON(DictProtocol):
             raise ValidationError("{} is not a number".format(value))
         return float(value)
 
-    def _field_encoder(self, field: FieldDescriptor) -> Callable[[Any], JSONValue]:
+    @staticmethod
+    def _array_error(field: ArrayField, values: List[Any]) -> ValidationError:
+        for value in values:
+            try:
+                array(field.typecode, (value,))
+            except TypeError:
+                if field.items.type is float:
+                    return ValidationError("{} is not a number".format(value))
+                return ValidationError("{} is not of type '{}'".format(repr(value), field.items.type.__name__))
+            except OverflowError:
+                return ValidationError("{} is out of range".format(value))
+        return ValidationError("{} is not a valid array".format(repr(values)))
+
+    def _field_encoder_source(self,
+                              field: FieldDescriptor,
+                              value: str,
+                              namespace: Dict[str, Any],
+                              include: Set[str] = None) -> str:
+        """
+        :param include: paths within nested messages to encode; all fields are encoded if empty
+        :return: an expression that encodes the Python expression `value` of the field `field`
+        """
+        if isinstance(field, ArrayField):
+            return "{0}.tolist() if hasattr({0}, 'tolist') else list({0})".format(value)
+
         if isinstance(field, RepeatField):
-            field_item_encoder = self._field_encoder(field.items)
-            return lambda lst: [field_item_encoder(item) for item in lst]
+            item = value + '_item'
+            item_encoder = self._field_encoder_source(field.items, item, namespace, include)
+            if item_encoder == item:
+                return 'list({})'.format(value)
+            return '[{} for {} in {}]'.format(item_encoder, item, value)
+
+        if isinstance(field, MapField):
+            key, item = value + '_key', value + '_item'
+            item_encoder = self._field_encoder_source(field.values, item, namespace, include)
+            if item_encoder == item:
+                return 'dict({})'.format(value)
+            return '{{{}: {} for {}, {} in {}.items()}}'.format(key, item_encoder, key, item, value)
 
         if not isinstance(field, Field):
             raise NotImplementedError()
 
         if issubclass(field.type, Message):
-            field_protocol = self._get_protocol(field.type)
-            return lambda msg: field_protocol.encode(msg)
+            field_protocol = self._get_protocol(field.type, include)
+            return '{}.encode({})'.format(reference(namespace, field_protocol, 'protocol'), value)
 
         if field.type is bytes:
-            return lambda b: b64encode(b)
+            return "b64encode({}).decode('ascii')".format(value)
 
         # assume all is JSON from here
-        return lambda value: value
+        return value
+
+    def _field_decoder_source(self,
+                              field: FieldDescriptor,
+                              value: str,
+                              namespace: Dict[str, Any]) -> Tuple[List[str], str]:
+        """
+        :return: a list of statements that validate the JSON expression `value` and an expression that decodes it
+        """
+        if isinstance(field, ArrayField):
+            items = value + '_items'
+            return [
+                'if not isinstance({}, list):'.format(value),
+                '    raise ValidationError("{{}} is not of type \'list\'".format(repr({})))'.format(value),
+                'try:',
+                '    {} = array({}, {})'.format(items, repr(field.typecode), value),
+                'except (TypeError, OverflowError):',
+                '    raise {}({})'.format(reference(namespace, partial(self._array_error, field), 'error'), value)
+            ], items
 
-    def _field_decoder(self, field: FieldDescriptor) -> Callable[[JSONValue], Any]:
         if isinstance(field, RepeatField):
-            field_item_decoder = self._field_decoder(field.items)
-            return lambda lst: [field_item_decoder(item) for item in self._cast(list, lst)]
+            items, item = value + '_items', value + '_item'
+            item_lines, item_decoder = self._checked_decoder_source(field.items, item, namespace)
+            return [
+                'if not isinstance({}, list):'.format(value),
+                '    raise ValidationError("{{}} is not of type \'list\'".format(repr({})))'.format(value),
+                '{} = []'.format(items),
+                'for {} in {}:'.format(item, value),
+                *indent(item_lines),
+                '    {}.append({})'.format(items, item_decoder)
+            ], items
+
+        if isinstance(field, MapField):
+            items, key, item = value + '_items', value + '_key', value + '_item'
+            item_lines, item_decoder = self._checked_decoder_source(field.values, item, namespace)
+            return [
+                'if not isinstance({}, Mapping):'.format(value),
+                '    raise ValidationError("{{}} is not of type \'object\'".format(repr({})))'.format(value),
+                '{} = {{}}'.format(items),
+                'for {}, {} in {}.items():'.format(key, item, value),
+                '    try:',
+                '        if not isinstance({}, str):'.format(key),
+                '            raise ValidationError("{{}} is not of type \'str\'".format(repr({})))'.format(key),
+                *indent(item_lines, 2),
+                '        {}[{}] = {}'.format(items, key, item_decoder),
+                '    except ValidationError as e:',
+                '        raise e.prefix(str({}))'.format(key)
+            ], items
 
         if not isinstance(field, Field):
             raise NotImplementedError()
 
         if issubclass(field.type, Message):
             field_protocol = self._get_protocol(field.type)
-            return lambda msg: field_protocol.decode(msg)
+            return [], '{}.decode({})'.format(reference(namespace, field_protocol, 'protocol'), value)
 
         # an integer (int) in JSON is also a number (float), so we convert here if necessary:
         if field.type is float:
-            return self._cast_number
+            return [
+                'if type({}) not in (int, float):'.format(value),
+                '    raise ValidationError("{{}} is not a number".format({}))'.format(value)
+            ], 'float({})'.format(value)
 
         if field.type is bytes:
-            # TODO catch TypeError
-            return lambda b: b64decode(b)
+            return [
+                'try:',
+                '    {0} = b64decode({0})'.format(value),
+                'except (TypeError, ValueError):',
+                '    raise ValidationError("{{}} is not valid base64".format(repr({})))'.format(value)
+            ], value
+
+        type_ = reference(namespace, field.type, 'type')
+        return [
+            'if not isinstance({}, {}):'.format(value, type_),
+            '    raise ValidationError("{{}} is not of type \'{}\'".format(repr({})))'.format(field.type.__name__,
+                                                                                          value)
+        ], value
+
+    def _checked_decoder_source(self,
+                                field: FieldDescriptor,
+                                value: str,
+                                namespace: Dict[str, Any]) -> Tuple[List[str], str]:
+        """
+        Like :meth:`_field_decoder_source`, but also checks the constraints of `field` on the decoded value.
+        """
+        lines, decoder = self._field_decoder_source(field, value, namespace)
+        checks = constraint_source(field, value, namespace)
+        if not checks:
+            return lines, decoder
+        if decoder != value:
+            lines = lines + ['{} = {}'.format(value, decoder)]
+        return lines + checks, value
+
+    def _trusted_field_decoder_source(self, field: FieldDescriptor, value: str, namespace: Dict[str, Any]) -> str:
+        """
+        :return: an expression that decodes the JSON expression `value` without validating it
+        """
+        if isinstance(field, ArrayField):
+            return 'array({}, {})'.format(repr(field.typecode), value)
+
+        if isinstance(field, RepeatField):
+            item = value + '_item'
+            item_decoder = self._trusted_field_decoder_source(field.items, item, namespace)
+            if item_decoder == item:
+                return value
+            return '[{} for {} in {}]'.format(item_decoder, item, value)
+
+        if isinstance(field, MapField):
+            key, item = value + '_key', value + '_item'
+            item_decoder = self._trusted_field_decoder_source(field.values, item, namespace)
+            if item_decoder == item:
+                return value
+            return '{{{}: {} for {}, {} in {}.items()}}'.format(key, item_decoder, key, item, value)
+
+        if isinstance(field, Field) and issubclass(field.type, Message):
+            field_protocol = self._get_protocol(field.type)
+            return '{}.decode_trusted({})'.format(reference(namespace, field_protocol, 'protocol'), value)
+
+        if isinstance(field, Field) and field.type is bytes:
+            return 'b64decode({})'.format(value)
+        if isinstance(field, Field) and field.type is float:
+            return 'float({})'.format(value)  # JSON numbers without a fraction are decoded as int
+        return value
+
+    def _namespace(self) -> Dict[str, Any]:
+        return {
+            'b64encode': b64encode,
+            'b64decode': b64decode,
+            'Mapping': Mapping,
+            'NOT_SET': NOT_SET,
+            'LazyValue': LazyValue,
+            'array': array,
+            'ValidationError': ValidationError
+        }
+
+    def _compile_encoder(self) -> Callable[[Message], Any]:
+        namespace = self._namespace()
+        lines = ['def encode(message):',
+                 '    obj = {}']
+
+        for field in self._fields:
+            lines += indent([
+                'value = message.{}'.format(field.slot),
+                'if value is not NOT_SET:',
+                *indent(_resolve_lazy_source(field, 'value', 'message')),
+                '    obj[{}] = {}'.format(repr(field.name), self._field_encoder_source(
+                    field, 'value', namespace, self._field_paths.get(field.name)))
+            ])
+
+        lines.append('    return obj')
+        return compile_function('encode', lines, namespace)
+
+    def _compile_field_decoder(self, field: FieldDescriptor) -> Callable[[Any], Any]:
+        namespace = self._namespace()
+        field_lines, field_decoder = self._checked_decoder_source(field, 'value', namespace)
+        lines = ['def decode_field(value):',
+                 '    try:',
+                 *indent(field_lines, 2),
+                 '        return {}'.format(field_decoder),
+                 '    except ValidationError as e:',
+                 '        raise e.prefix({})'.format(repr(field.name))]
+        return compile_function('decode_field', lines, namespace)
+
+    def _compile_item_decoder(self, field: RepeatField) -> Callable[[Any], Any]:
+        namespace = self._namespace()
+        item_lines, item_decoder = self._checked_decoder_source(field.items, 'value', namespace)
+        lines = ['def decode_item(value):',
+                 *indent(item_lines),
+                 '    return {}'.format(item_decoder)]
+        return compile_function('decode_item', lines, namespace)
+
+    def _compile_check(self, field: FieldDescriptor) -> Callable[[Any], Any]:
+        """
+        :return: a function that checks the constraints of `field` on a decoded value and returns it
+        """
+        namespace = self._namespace()
+        lines = ['def check(value):',
+                 '    try:',
+                 *indent(constraint_source(field, 'value', namespace) or ['pass'], 2),
+                 '    except ValidationError as e:',
+                 '        raise e.prefix({})'.format(repr(field.name)),
+                 '    return value']
+        return compile_function('check', lines, namespace)
+
+    def _stream_decoder(self, field: FieldDescriptor, kind: str = 'field') -> Callable[[Any], Any]:
+        """
+        :param kind: ``'field'`` for a decoder of the whole value of `field`, ``'items'`` for a decoder of the items
+                     of a repeated field, or ``'check'`` for a function that checks the constraints of a decoded value
+        """
+        try:
+            return self._stream_decoders[field.name, kind]
+        except KeyError:
+            if kind == 'items':
+                decoder = self._compile_item_decoder(field)
+            elif kind == 'check':
+                decoder = self._compile_check(field)
+            else:
+                decoder = self._compile_field_decoder(field)
+            self._stream_decoders[field.name, kind] = decoder
+            return decoder
+
+    def _lazy_field_decoder(self, field: FieldDescriptor, trusted: bool = False) -> Callable[[Any], Any]:
+        """
+        :return: the function that decodes a value of the nested field `field` when it is first accessed
+        """
+        if not trusted:
+            return self._compile_field_decoder(field)
+
+        namespace = self._namespace()
+        return compile_function('decode_field',
+                                ['def decode_field(value):',
+                                 '    return {}'.format(self._trusted_field_decoder_source(field, 'value', namespace))],
+                                namespace)
+
+    def _compile_trusted_decoder(self, lazy: bool = False) -> Callable[[Any, Message], Message]:
+        namespace = self._namespace()
+        namespace['Format'] = self._format
+        lines = ['def decode(instance, message=None):',
+                 '    if message is None:',
+                 '        message = Format()',
+                 '    get = instance.get']
+
+        for field in self._fields:
+            if lazy and _is_nested(field):
+                field_decoder = 'LazyValue({}, value)'.format(
+                    reference(namespace, self._lazy_field_decoder(field, trusted=True), 'decode'))
+            else:
+                field_decoder = self._trusted_field_decoder_source(field, 'value', namespace)
 
-        return partial(self._cast, field.type)
+            lines += indent([
+                'value = get({}, NOT_SET)'.format(repr(field.name)),
+                'if value is not NOT_SET:',
+                '    message.{} = {}'.format(field.slot, field_decoder)
+            ])
+
+        lines.append('    return message')
+        return compile_function('decode', lines, namespace)
+
+    def _compile_decoder(self, lazy: bool = False, trusted: bool = False) -> Callable[[Any, Message], Message]:
+        """
+        :param lazy: whether to defer decoding of nested messages until they are accessed
+        :param trusted: whether to skip all type checks and constraints, for input from a trusted source
+        """
+        if trusted:
+            return self._compile_trusted_decoder(lazy)
+
+        namespace = self._namespace()
+        namespace['Format'] = self._format
+        lines = ['def decode(instance, message=None):',
+                 '    if not isinstance(instance, Mapping):',
+                 '        raise ValidationError("{} is not of type \'object\'".format(repr(instance)))',
+                 '    if message is None:',
+                 '        message = Format()',
+                 '    get = instance.get',
+                 '    errors = None']
+
+        for field in self._fields:
+            # errors are collected so that all of them can be reported at once
+            missing = [] if not is_required(field) else [
+                'else:',
+                '    ' + required_source(field, 'errors')
+            ]
+
+            if lazy and _is_nested(field):
+                lines += indent([
+                    'value = get({}, NOT_SET)'.format(repr(field.name)),
+                    'if value is not NOT_SET:',
+                    '    message.{} = LazyValue({}, value)'.format(
+                        field.slot,
+                        reference(namespace, self._lazy_field_decoder(field), 'decode')),
+                    *missing
+                ])
+                continue
+
+            field_lines, field_decoder = self._checked_decoder_source(field, 'value', namespace)
+            lines += indent([
+                'value = get({}, NOT_SET)'.format(repr(field.name)),
+                'if value is not NOT_SET:',
+                '    try:',
+                *indent(field_lines, 2),
+                '        message.{} = {}'.format(field.slot, field_decoder),
+                '    except ValidationError as e:',
+                '        e.prefix({})'.format(repr(field.name)),
+                '        errors = (errors or []) + (e.errors or [e])',
+                *missing
+            ])
+
+        lines += ['    if errors:',
+                  '        raise ValidationError.collect(errors)',
+                  '    return message']
+        return compile_function('decode', lines, namespace)
 
     def encode(self, message: Message):
-        obj = {}
-        for name, encode in self.field_encoders.items():
-            try:
-                obj[name] = encode(message[name])
-            except KeyError:
-                pass
-        return obj
+        return self._encode(message)
 
     def decode(self, instance: Any, message: Message = None) -> Message:
-        if not isinstance(instance, Mapping):
-            raise ValidationError("{} is not of type 'object'".format(repr(instance)))
+        return self._decode(instance, message)
 
-        if message is None:
-            message = self._format()
+    def _decoder(self, lazy: bool = False, trusted: bool = False) -> Callable[[Any, Message], Message]:
+        if not lazy and not trusted:
+            return self.decode
 
-        for name, decode in self.field_decoders.items():
-            if name in instance:
-                try:
-                    message[name] = decode(instance[name])
-                except ValidationError as e:
-                    e.path.insert(0, name)
-                    raise e
-        return message
+        try:
+            return self._decoder_variants[lazy, trusted]
+        except KeyError:
+            if type(self).decode is not JSON.decode:
+                decoder = self.decode  # custom decoding
+            else:
+                decoder = self._compile_decoder(lazy, trusted)
+            self._decoder_variants[lazy, trusted] = decoder
+            return decoder
+
+    def decode_lazy(self, instance: Any, message: Message = None) -> Message:
+        """
+        Like :meth:`decode`, but nested messages and lists of messages are only decoded and validated when they are
+        first accessed. Validation errors are raised at that point.
+        """
+        return self._decoder(lazy=True)(instance, message)
+
+    def decode_trusted(self, instance: Any, message: Message = None) -> Message:
+        """
+        Like :meth:`decode`, but without any type checks or constraints. Only use this for input from a trusted
+        source, such as another service built from the same message definitions; invalid input leads to undefined
+        results rather than a :class:`ValidationError`.
+        """
+        return self._decoder(trusted=True)(instance, message)
 
-    # TODO include It
     def pack(self, message: Message, include: Iterable[str] = None) -> bytes:
+        """
+        :param include: names of fields or dotted paths to encode; see :meth:`subset`
+        """
+        if include is not None:
+            return self.subset(include).pack(message)
         if self._format is Empty:
             return b''
-        return json.dumps(self.encode(message)).encode('utf-8')
+        return (self._json or get_json_backend()).dumps(self.encode(message))
 
-    def unpack(self, buffer: bytes):
+    def unpack(self, buffer: bytes, lazy: bool = False, trusted: bool = False):
+        """
+        :param lazy: if ``True``, nested messages are decoded on first access; see :meth:`decode_lazy`
+        :param trusted: if ``True``, values are not validated; see :meth:`decode_trusted`
+        """
         # Allow empty string when message is empty
         if len(buffer) == 0 and not self._fields:
             return self._format()
 
         try:
-            return self.decode(json.loads(buffer.decode('utf-8')))
+            instance = (self._json or get_json_backend()).loads(buffer)
         except (ValueError, JSONDecodeError) as e:
             raise ValidationError("Invalid JSON: {}".format(str(e)))
 
+        return self._decoder(lazy, trusted)(instance)
+
+    async def _decode_stream(self,
+                             reader: _JSONStreamReader,
+                             message: Message,
+                             stream_field: str = None) -> AsyncIterator[Any]:
+        """
+        Decodes a JSON object into `message` one field at a time. Items of repeated fields are decoded as they are
+        read; items of the field named `stream_field` are yielded rather than added to the message.
+        """
+        if not await reader.peek() and not self._fields:
+            return
+
+        await reader.read_char('{')
+        if await reader.peek() == '}':
+            await reader.read_char('}')
+        else:
+            fields_by_name = {field.name: field for field in self._fields}
+            while True:
+                key = await reader.read_value()
+                if not isinstance(key, str):
+                    raise reader.error('property name')
+                await reader.read_char(':')
+
+                field = fields_by_name.get(key)
+                if field is None:
+                    await reader.read_value()
+                elif isinstance(field, RepeatField) and not isinstance(field, ArrayField) \
+                        and await reader.peek() == '[':
+                    decode_item = self._stream_decoder(field, 'items')
+                    items = []
+                    await reader.read_char('[')
+                    if await reader.peek() == ']':
+                        await reader.read_char(']')
+                    else:
+                        index = 0
+                        while True:
+                            try:
+                                item = decode_item(await reader.read_value())
+                            except ValidationError as e:
+                                raise e.prefix(key, str(index))
+                            if key == stream_field:
+                                yield item
+                            else:
+                                items.append(item)
+                            index += 1
+                            if await reader.read_char(',]') == ']':
+                                break
+                    if key != stream_field:
+                        setattr(message, field.slot, self._stream_decoder(field, 'check')(items))
+                else:
+                    setattr(message, field.slot, self._stream_decoder(field)(await reader.read_value()))
+
+                if await reader.read_char(',}') == '}':
+                    break
+
+        if await reader.peek():
+            raise reader.error('end of data')
+
+        missing = [field for field in self._fields if is_required(field) and field.name != stream_field and
+                   getattr(message, field.slot, NOT_SET) is NOT_SET]
+        if missing:
+            raise ValidationError.collect([ValidationError(REQUIRED_MESSAGE, [field.name]) for field in missing])
+
+    async def unpack_stream(self, stream: asyncio.StreamReader, chunk_size: int = 2 ** 16) -> Message:
+        """
+        Unpacks a message incrementally from an asynchronous byte stream such as :class:`aiohttp.StreamReader`.
+        Fields are decoded as they are read, so no copy of the complete body is ever held in memory.
+        """
+        if type(self).decode is not JSON.decode:
+            return await super().unpack_stream(stream)  # custom decoding
+
+        message = self._format()
+        async for _ in self._decode_stream(_JSONStreamReader(stream, chunk_size), message):
+            pass
+        return message
+
+    def iter_unpack_stream(self,
+                           stream: asyncio.StreamReader,
+                           field_name: str,
+                           message: Message = None,
+                           chunk_size: int = 2 ** 16) -> AsyncIterator[Any]:
+        """
+        Decodes a message from an asynchronous byte stream and yields the items of the repeated field `field_name`
+        as they arrive. Other fields are decoded into `message`, if given; the streamed field is left unset there.
+
+        Usage::
+
+            async for pet in JSON(PetList).iter_unpack_stream(http_request.content, 'pets'):
+                ...
+        """
+        field = next((field for field in self._fields if field.name == field_name), None)
+        if not isinstance(field, RepeatField) or isinstance(field, ArrayField) or type(self).decode is not JSON.decode:
+            raise ValueError("'{}' is not a repeated field of {}".format(field_name, self._format.__meta__.name))
+
+        if message is None:
+            message = self._format()
+        return self._decode_stream(_JSONStreamReader(stream, chunk_size), message, field_name)
+
+    def _decode_line(self, loads: Callable[[bytes], Any], line: bytes, index: int) -> Message:
+        try:
+            return self.decode(loads(line))
+        except (ValueError, JSONDecodeError) as e:
+            raise ValidationError("Invalid JSON: {}".format(str(e)), [str(index)])
+        except ValidationError as e:
+            raise e.prefix(str(index))
+
+    def pack_many(self, messages: Iterable[Message]) -> bytes:
+        """
+        Packs a sequence of messages as newline-delimited JSON.
+        """
+        encode, dumps = self.encode, (self._json or get_json_backend()).dumps
+        lines = [dumps(encode(message)) for message in messages]
+        if not lines:
+            return b''
+        lines.append(b'')
+        return b'\n'.join(lines)
+
+    def unpack_many(self, buffer: bytes) -> List[Message]:
+        """
+        Unpacks newline-delimited JSON. Blank lines are ignored. Validation errors report the line index in their path.
+        """
+        decode_line, loads = self._decode_line, (self._json or get_json_backend()).loads
+        return [decode_line(loads, line, index) for index, line in enumerate(buffer.split(b'\n')) if line.strip()]
+
+    def iter_unpack(self, stream: BinaryIO) -> Iterator[Message]:
+        decode_line, loads = self._decode_line, (self._json or get_json_backend()).loads
+        for index, line in enumerate(stream):
+            if line.strip():
+                yield decode_line(loads, line, index)
+
 
 class URIString(JSON):
 
-    def _field_decoder(self, field: FieldDescriptor) -> Callable[[JSONValue], Any]:
-        if isinstance(field, RepeatField):
+    def _field_decoder_source(self,
+                              field: FieldDescriptor,
+                              value: str,
+                              namespace: Dict[str, Any]) -> Tuple[List[str], str]:
+        if isinstance(field, (RepeatField, MapField)):
             raise NotImplementedError('Unable to decode {} from URI string'.format(field))
 
         if not isinstance(field, Field):
@@ -206,16 +893,19 @@ class URIString(JSON):
             raise NotImplementedError('Unable to decode {} from URI string'.format(field))
 
         if field.type is str:
-            return lambda s: s
+            return [], value
 
         if field.type is bytes:
-            # TODO catch TypeError
-            return lambda b: b64decode(b)
+            return super()._field_decoder_source(field, value, namespace)
 
-        return partial(self._cast, field.type)
+        return [], '{}({})'.format(reference(namespace, partial(self._cast, field.type), 'cast'), value)
 
-    def _field_encoder(self, field: FieldDescriptor) -> Callable[[Any], JSONValue]:
-        if isinstance(field, RepeatField):
+    def _field_encoder_source(self,
+                              field: FieldDescriptor,
+                              value: str,
+                              namespace: Dict[str, Any],
+                              include: Set[str] = None) -> str:
+        if isinstance(field, (RepeatField, MapField)):
             raise NotImplementedError('Unable to encode {} to URI string'.format(field))
 
         if not isinstance(field, Field):
@@ -225,9 +915,9 @@ class URIString(JSON):
             raise NotImplementedError('Unable to encode {} to URI string'.format(field))
 
         if field.type is bytes:
-            return lambda b: b64encode(b)
+            return super()._field_encoder_source(field, value, namespace)
 
-        return lambda x: str(x)
+        return 'str({})'.format(value)
 
     @staticmethod
     def _cast(type_: type, value: Any):
@@ -236,3 +926,132 @@ class URIString(JSON):
             return type_(value)
         except ValueError:
             raise ValidationError("{} is not formatted as a '{}'".format(repr(value), type_.__name__))
+
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class MsgPack(JSON):
+    """
+    MessagePack encoding of the JSON object model. Bytes fields are encoded as native binary rather than base64.
+    """
+    mime = 'application/x-msgpack'
+    name = 'msgpack'
+    streaming = False
+
+    def __init__(self, fmt: Type[Message], field_names_: Set[str] = None):
+        if msgpack is None:
+            raise RuntimeError("You must install the 'msgpack' package to use the MsgPack protocol")
+        super().__init__(fmt, field_names_)
+
+    def _field_encoder_source(self,
+                              field: FieldDescriptor,
+                              value: str,
+                              namespace: Dict[str, Any],
+                              include: Set[str] = None) -> str:
+        if isinstance(field, Field) and field.type is bytes:
+            return value
+        return super()._field_encoder_source(field, value, namespace, include)
+
+    def _field_decoder_source(self,
+                              field: FieldDescriptor,
+                              value: str,
+                              namespace: Dict[str, Any]) -> Tuple[List[str], str]:
+        if isinstance(field, Field) and field.type is bytes:
+            return [
+                'if not isinstance({}, bytes):'.format(value),
+                '    raise ValidationError("{{}} is not of type \'bytes\'".format(repr({})))'.format(value)
+            ], value
+        return super()._field_decoder_source(field, value, namespace)
+
+    def pack(self, message: Message, include: Iterable[str] = None) -> bytes:
+        if include is not None:
+            return self.subset(include).pack(message)
+        if self._format is Empty:
+            return b''
+        return msgpack.packb(self.encode(message), use_bin_type=True)
+
+    def _trusted_field_decoder_source(self, field: FieldDescriptor, value: str, namespace: Dict[str, Any]) -> str:
+        if isinstance(field, Field) and field.type is bytes:
+            return value
+        return super()._trusted_field_decoder_source(field, value, namespace)
+
+    def unpack(self, buffer: bytes, lazy: bool = False, trusted: bool = False):
+        # Allow empty string when message is empty
+        if len(buffer) == 0 and not self._fields:
+            return self._format()
+
+        try:
+            instance = msgpack.unpackb(buffer, raw=False)
+        except (ValueError, msgpack.UnpackException) as e:
+            raise ValidationError("Invalid MessagePack: {}".format(str(e)))
+
+        return self._decoder(lazy, trusted)(instance)
+
+    # MessagePack is not decoded incrementally; the whole stream is read first
+    unpack_stream = Protocol.unpack_stream
+
+    def iter_unpack_stream(self,
+                           stream: asyncio.StreamReader,
+                           field_name: str,
+                           message: Message = None,
+                           chunk_size: int = 2 ** 16) -> AsyncIterator[Any]:
+        """
+        Like :meth:`JSON.iter_unpack_stream`, but the items are only yielded once the whole stream has been read.
+        """
+        field = next((field for field in self._fields if field.name == field_name), None)
+        if not isinstance(field, RepeatField) or isinstance(field, ArrayField):
+            raise ValueError("'{}' is not a repeated field of {}".format(field_name, self._format.__meta__.name))
+
+        if message is None:
+            message = self._format()
+        return self._iter_items(stream, field_name, message)
+
+    async def _iter_items(self, stream: asyncio.StreamReader, field_name: str, message: Message) -> AsyncIterator[Any]:
+        decoded = await self.unpack_stream(stream)
+        for name in decoded:
+            if name != field_name:
+                message[name] = decoded[name]
+        for item in decoded.get(field_name):
+            yield item
+
+    def pack_many(self, messages: Iterable[Message]) -> bytes:
+        """
+        Packs a sequence of messages as consecutive MessagePack objects; MessagePack needs no additional framing.
+        """
+        encode, pack = self.encode, msgpack.Packer(use_bin_type=True).pack
+        return b''.join([pack(encode(message)) for message in messages])
+
+    def _iter_decode(self, chunks: Iterable[bytes]) -> Iterator[Message]:
+        decode = self.decode
+        unpacker = msgpack.Unpacker(raw=False)
+        index = size = 0
+        try:
+            for chunk in chunks:
+                unpacker.feed(chunk)
+                size += len(chunk)
+                for instance in unpacker:
+                    try:
+                        yield decode(instance)
+                    except ValidationError as e:
+                        raise e.prefix(str(index))
+                    index += 1
+        except (ValueError, msgpack.UnpackException) as e:
+            raise ValidationError("Invalid MessagePack: {}".format(str(e)), [str(index)])
+
+        if unpacker.tell() != size:
+            raise ValidationError('Truncated MessagePack object', [str(index)])
+
+    def unpack_many(self, buffer: bytes) -> List[Message]:
+        return list(self._iter_decode([buffer]))
+
+    def iter_unpack(self, stream: BinaryIO, chunk_size: int = 2 ** 16) -> Iterator[Message]:
+        return self._iter_decode(iter(partial(stream.read, chunk_size), b''))
+
+
+# re-exported; imported last since these modules depend on the protocols above
+from .protobuf import Protobuf  # noqa: F401
+from .columnar import ColumnarJSON, Columns  # noqa: F401
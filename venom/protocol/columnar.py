@@ -0,0 +1,252 @@
+import asyncio
+from collections.abc import Sequence
+from functools import partial
+from typing import Any, Dict, List, Tuple, Set, Iterable, Callable, Mapping, AsyncIterator, Type
+
+from venom.exceptions import ValidationError
+from venom.fields import Field, RepeatField, ArrayField, FieldDescriptor
+from venom.message import Message
+from venom.protocol import JSON, _resolve_lazy_source
+from venom.util import compile_function, reference, indent
+
+
+def _is_columnar(field: FieldDescriptor) -> bool:
+    return isinstance(field, RepeatField) and not isinstance(field, ArrayField) \
+        and isinstance(field.items, Field) and issubclass(field.items.type, Message)
+
+
+def _dictionary_encode(column: List[Any], threshold: float) -> Any:
+    index = {}
+    indices = [index.setdefault(value, len(index)) for value in column]
+    if len(index) > threshold * len(column):
+        return column
+    return {'dictionary': list(index), 'indices': indices}
+
+
+def _dictionary_decode(column: Mapping) -> List[Any]:
+    dictionary, indices = column.get('dictionary'), column.get('indices')
+    if not isinstance(dictionary, list):
+        raise ValidationError("{} is not of type 'list'".format(repr(dictionary)), ['dictionary'])
+    if not isinstance(indices, list):
+        raise ValidationError("{} is not of type 'list'".format(repr(indices)), ['indices'])
+    try:
+        return [dictionary[index] for index in indices]
+    except (IndexError, TypeError):
+        raise ValidationError('Invalid dictionary index', ['indices'])
+
+
+class Columns(Sequence):
+    """
+    A read-only view of messages decoded from columns, returned in place of the list of a repeated field when a
+    :class:`ColumnarJSON` message is decoded lazily. A message is decoded and validated only when it is accessed;
+    :meth:`column` decodes the values of a single field.
+    """
+
+    def __init__(self, protocol: 'ColumnarJSON', length: int, columns: Dict[str, List[Any]], trusted: bool = False):
+        self._protocol = protocol
+        self._length = length
+        self._columns = columns
+        self._decode = protocol.decode_trusted if trusted else protocol.decode
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('Columns index out of range')
+
+        row = {name: column[index] for name, column in self._columns.items() if column[index] is not None}
+        try:
+            return self._decode(row)
+        except ValidationError as e:
+            raise e.prefix(str(index))
+
+    def column(self, name: str) -> List[Any]:
+        """
+        :return: the decoded values of the field named `name`, with ``None`` for messages where it is not set
+        """
+        field = next((field for field in self._protocol._fields if field.name == name), None)
+        if field is None:
+            raise KeyError(name)
+
+        column = self._columns.get(name)
+        if column is None:
+            return [None] * self._length
+
+        decode = self._protocol._stream_decoder(field)
+        values = []
+        for index, value in enumerate(column):
+            try:
+                values.append(None if value is None else decode(value))
+            except ValidationError as e:
+                raise e.prefix(str(index))
+        return values
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return '<Columns of {} {}>'.format(self._length, self._protocol._format.__meta__.name)
+
+
+class ColumnarJSON(JSON):
+    """
+    A variant of :class:`JSON` for tabular data. Repeated message fields are encoded as one array per field of the
+    nested message, rather than as an array of objects::
+
+        {"pets": {"length": 3, "columns": {"name": ["Snek", "Sid", null], "sound": {"dictionary": ["hiss"],
+                                                                                    "indices": [0, 0, 0]}}}}
+
+    String columns with few distinct values are dictionary-encoded, and fields that are not set in any of the messages
+    are left out. When decoded lazily, repeated message fields hold :class:`Columns` views that decode each message on
+    access; the view itself is returned by item access, e.g. ``pet_list['pets']``.
+    """
+    mime = 'application/vnd.venom.columnar+json'
+    name = 'columnar-json'
+
+    #: string columns are dictionary-encoded when the number of distinct values is at most this fraction of rows
+    dictionary_threshold: float = 0.5
+
+    def __init__(self, fmt: Type[Message], field_names_: Set[str] = None):
+        super().__init__(fmt, field_names_)
+        self._encode_columns = None
+
+    def _field_encoder_source(self,
+                              field: FieldDescriptor,
+                              value: str,
+                              namespace: Dict[str, Any],
+                              include: Set[str] = None) -> str:
+        if _is_columnar(field):
+            row_protocol = self._get_protocol(field.items.type, include)
+            return '{}({})'.format(reference(namespace, row_protocol.encode_columns, 'encode_columns'), value)
+        return super()._field_encoder_source(field, value, namespace, include)
+
+    def _field_decoder_source(self,
+                              field: FieldDescriptor,
+                              value: str,
+                              namespace: Dict[str, Any]) -> Tuple[List[str], str]:
+        if _is_columnar(field):
+            row_protocol = self._get_protocol(field.items.type)
+            return [], '{}({})'.format(reference(namespace, row_protocol.decode_columns, 'decode_columns'), value)
+        return super()._field_decoder_source(field, value, namespace)
+
+    def _trusted_field_decoder_source(self, field: FieldDescriptor, value: str, namespace: Dict[str, Any]) -> str:
+        if _is_columnar(field):
+            row_protocol = self._get_protocol(field.items.type)
+            return '{}({}, trusted=True)'.format(reference(namespace, row_protocol.decode_columns, 'decode_columns'),
+                                                 value)
+        return super()._trusted_field_decoder_source(field, value, namespace)
+
+    def _lazy_field_decoder(self, field: FieldDescriptor, trusted: bool = False) -> Callable[[Any], Any]:
+        if _is_columnar(field):
+            row_protocol = self._get_protocol(field.items.type)
+            if trusted:
+                return partial(row_protocol.column_view, trusted=True)
+            check = self._compile_check(field)
+            return lambda value: check(row_protocol.column_view(value))
+        return super()._lazy_field_decoder(field, trusted)
+
+    def _compile_columns_encoder(self) -> Callable[[Iterable[Message]], Dict[str, Any]]:
+        namespace = self._namespace()
+        namespace['dictionary_encode'] = _dictionary_encode
+        namespace['threshold'] = self.dictionary_threshold
+
+        lines = ['def encode_columns(rows):']
+        for i, field in enumerate(self._fields):
+            lines += indent(['column_{0} = []'.format(i),
+                             'append_{0} = column_{0}.append'.format(i)])
+
+        lines.append('    for row in rows:')
+        for i, field in enumerate(self._fields):
+            lines += indent([
+                'value = row.{}'.format(field.slot),
+                'if value is NOT_SET:',
+                '    append_{}(None)'.format(i),
+                'else:',
+                *indent(_resolve_lazy_source(field, 'value', 'row')),
+                '    append_{}({})'.format(i, self._field_encoder_source(field, 'value', namespace,
+                                                                       self._field_paths.get(field.name)))
+            ], 2)
+        if not self._fields:
+            lines.append('        pass')
+
+        # columns of fields that are not set in any row are left out
+        lines += ['    length = len(rows)',
+                  '    columns = {}']
+        for i, field in enumerate(self._fields):
+            column = 'column_{}'.format(i)
+            if isinstance(field, Field) and field.type is str:
+                column = 'dictionary_encode({}, threshold)'.format(column)
+            lines += indent(['if column_{}.count(None) != length:'.format(i),
+                             '    columns[{!r}] = {}'.format(field.name, column)])
+
+        lines.append("    return {'length': length, 'columns': columns}")
+        return compile_function('encode_columns', lines, namespace)
+
+    def encode_columns(self, rows: Iterable[Message]) -> Dict[str, Any]:
+        if self._encode_columns is None:
+            self._encode_columns = self._compile_columns_encoder()
+        return self._encode_columns(rows)
+
+    def _columns(self, instance: Any) -> Tuple[int, Dict[str, List[Any]]]:
+        """
+        :return: the number of rows and the columns of the known fields, with dictionary-encoded columns expanded
+        """
+        if not isinstance(instance, Mapping):
+            raise ValidationError("{} is not of type 'object'".format(repr(instance)))
+
+        length = instance.get('length', 0)
+        if type(length) is not int or length < 0:
+            raise ValidationError('{} is not a valid length'.format(repr(length)), ['length'])
+
+        columns = instance.get('columns', {})
+        if not isinstance(columns, Mapping):
+            raise ValidationError("{} is not of type 'object'".format(repr(columns)), ['columns'])
+
+        decoded = {}
+        for name, column in columns.items():
+            if name not in self._field_paths:
+                continue
+            if isinstance(column, Mapping):
+                try:
+                    column = _dictionary_decode(column)
+                except ValidationError as e:
+                    raise e.prefix('columns', name)
+            if not isinstance(column, list) or len(column) != length:
+                raise ValidationError('Expected a list of {} values'.format(length), ['columns', name])
+            decoded[name] = column
+        return length, decoded
+
+    def decode_columns(self, instance: Any, trusted: bool = False) -> List[Message]:
+        length, columns = self._columns(instance)
+        decode = self.decode_trusted if trusted else self.decode
+        columns = list(columns.items())
+
+        messages = []
+        for index in range(length):
+            try:
+                messages.append(decode({name: column[index] for name, column in columns if column[index] is not None}))
+            except ValidationError as e:
+                raise e.prefix(str(index))
+        return messages
+
+    def column_view(self, instance: Any, trusted: bool = False) -> Columns:
+        length, columns = self._columns(instance)
+        return Columns(self, length, columns, trusted)
+
+    def iter_unpack_stream(self,
+                           stream: asyncio.StreamReader,
+                           field_name: str,
+                           message: Message = None,
+                           chunk_size: int = 2 ** 16) -> AsyncIterator[Message]:
+        field = next((field for field in self._fields if field.name == field_name), None)
+        if field is not None and _is_columnar(field):
+            raise ValueError("'{}' is encoded as columns and cannot be streamed".format(field_name))
+        return super().iter_unpack_stream(stream, field_name, message, chunk_size)
@@ -0,0 +1,116 @@
+"""
+Serializers used by the :class:`venom.protocol.JSON` protocol. Every backend reads and writes UTF-8 encoded bytes,
+so that libraries which work on bytes natively avoid an extra copy through :class:`str`.
+
+The backends of ``orjson``, ``rapidjson`` and ``ujson`` are registered when the package is installed. The default
+backend is the first available one in the fixed order of :data:`PREFERENCE`, so that it does not depend on timings
+taken at import. :func:`benchmark` compares the available backends on a given payload; the default can be changed
+globally with :func:`set_default_json_backend`, or for a :class:`JSON` subclass through its ``json_backend``
+attribute.
+"""
+import json
+from timeit import timeit
+from typing import Any, Union, Dict, List, Tuple, Callable
+
+PREFERENCE = ('orjson', 'rapidjson', 'ujson', 'json')
+
+
+class JSONBackend(object):
+    """
+    :param dumps: serializes a JSON value to UTF-8 encoded bytes
+    :param loads: parses UTF-8 encoded bytes or a string, raising :class:`ValueError` if it is not valid JSON
+    """
+
+    def __init__(self, name: str, dumps: Callable[[Any], bytes], loads: Callable[[Union[bytes, str]], Any]):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        return '<JSONBackend {}>'.format(self.name)
+
+
+def _stdlib_backend() -> JSONBackend:
+    encode = json.JSONEncoder(separators=(',', ':')).encode
+    # json.loads() decodes bytes itself
+    return JSONBackend('json', lambda value: encode(value).encode('utf-8'), json.loads)
+
+
+def _ujson_backend() -> JSONBackend:
+    import ujson
+    return JSONBackend('ujson', lambda value: ujson.dumps(value).encode('utf-8'), ujson.loads)
+
+
+def _rapidjson_backend() -> JSONBackend:
+    import rapidjson
+    return JSONBackend('rapidjson', lambda value: rapidjson.dumps(value).encode('utf-8'), rapidjson.loads)
+
+
+def _orjson_backend() -> JSONBackend:
+    import orjson
+    return JSONBackend('orjson', orjson.dumps, orjson.loads)
+
+
+_backends: Dict[str, JSONBackend] = {}
+_default: JSONBackend = None
+
+
+def register_json_backend(backend: JSONBackend, default: bool = False) -> None:
+    global _default
+    _backends[backend.name] = backend
+    if default or _default is None:
+        _default = backend
+
+
+def get_json_backend(name: str = None) -> JSONBackend:
+    """
+    :param name: the name of a registered backend; defaults to the default backend
+    """
+    if name is None:
+        return _default
+    try:
+        return _backends[name]
+    except KeyError:
+        raise RuntimeError("JSON backend '{}' is not available; you must install the '{}' package "
+                           "to use it".format(name, name))
+
+
+def set_default_json_backend(name: str) -> None:
+    global _default
+    _default = get_json_backend(name)
+
+
+def available_json_backends() -> List[str]:
+    return list(_backends)
+
+
+def benchmark(value: Any = None, number: int = 10000) -> List[Tuple[str, float]]:
+    """
+    Times a round trip of `value` through each available backend.
+
+    :return: a list of backend names and times in seconds, fastest first
+    """
+    if value is None:
+        value = {
+            'name': 'Snek',
+            'weight': 1.5,
+            'tags': ['snake', 'hiss', 'slither'],
+            'code': 'AP8=',
+            'owner': {'name': 'Ann', 'age': 42, 'tame': True},
+            'scores': [0.1 * i for i in range(20)]
+        }
+
+    results = []
+    for name, backend in _backends.items():
+        dumps, loads = backend.dumps, backend.loads
+        results.append((name, timeit(lambda: loads(dumps(value)), number=number)))
+    return sorted(results, key=lambda result: result[1])
+
+
+for _backend_factory in (_stdlib_backend, _ujson_backend, _rapidjson_backend, _orjson_backend):
+    try:
+        register_json_backend(_backend_factory())
+    except ImportError:
+        pass
+
+_default = next(_backends[name] for name in PREFERENCE if name in _backends)
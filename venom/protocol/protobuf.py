@@ -0,0 +1,525 @@
+import sys
+from array import array
+from struct import Struct, error as StructError
+from typing import Type, Set, Dict, Callable, Any, Tuple, NamedTuple, Optional, Iterable, List, Iterator, BinaryIO
+
+from venom.exceptions import ValidationError
+from venom.fields import Field, RepeatField, MapField, FieldDescriptor, Int32, Float32, LazyValue, ArrayField, \
+    as_array
+from venom.message import Message, fields
+from venom.protocol import Protocol, _resolve_lazy_source
+from venom.util import compile_function, reference, indent, NOT_SET
+from venom.validation import compile_validator
+
+VARINT = 0
+FIXED64 = 1
+LENGTH_DELIMITED = 2
+FIXED32 = 5
+
+_MASK_64 = (1 << 64) - 1
+
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+_FLOAT = Struct('<f')
+_DOUBLE = Struct('<d')
+
+Buffer = memoryview
+
+
+def encode_varint(value: int) -> bytes:
+    bits = value & 0x7f
+    value >>= 7
+    if not value:
+        return bytes((bits,))
+
+    out = bytearray()
+    while value:
+        out.append(0x80 | bits)
+        bits = value & 0x7f
+        value >>= 7
+    out.append(bits)
+    return bytes(out)
+
+
+def decode_varint(buffer: Buffer, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        b = buffer[pos]
+        pos += 1
+        result |= (b & 0x7f) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+        if shift >= 70:
+            raise ValidationError('Invalid protocol buffer: varint is too long')
+
+
+def encode_zigzag(value: int) -> bytes:
+    return encode_varint((value << 1) ^ (value >> 63))
+
+
+def decode_zigzag(buffer: Buffer, pos: int) -> Tuple[int, int]:
+    value, pos = decode_varint(buffer, pos)
+    return (value >> 1) ^ -(value & 1), pos
+
+
+def _encode_int(value: int) -> bytes:
+    # negative values are always encoded as ten-byte two's complement, like in the reference implementation
+    return encode_varint(value & _MASK_64)
+
+
+def _decode_int32(buffer: Buffer, pos: int) -> Tuple[int, int]:
+    value, pos = decode_varint(buffer, pos)
+    value &= 0xffffffff
+    if value & 0x80000000:
+        value -= 0x100000000
+    return value, pos
+
+
+def _decode_int64(buffer: Buffer, pos: int) -> Tuple[int, int]:
+    value, pos = decode_varint(buffer, pos)
+    value &= _MASK_64
+    if value & 0x8000000000000000:
+        value -= 0x10000000000000000
+    return value, pos
+
+
+def _encode_bool(value: bool) -> bytes:
+    return b'\x01' if value else b'\x00'
+
+
+def _decode_bool(buffer: Buffer, pos: int) -> Tuple[bool, int]:
+    value, pos = decode_varint(buffer, pos)
+    return value != 0, pos
+
+
+def _decode_float(buffer: Buffer, pos: int) -> Tuple[float, int]:
+    return _FLOAT.unpack_from(buffer, pos)[0], pos + 4
+
+
+def _decode_double(buffer: Buffer, pos: int) -> Tuple[float, int]:
+    return _DOUBLE.unpack_from(buffer, pos)[0], pos + 8
+
+
+def _length_delimited(data: bytes) -> bytes:
+    return encode_varint(len(data)) + data
+
+
+def _encode_str(value: str) -> bytes:
+    return _length_delimited(value.encode('utf-8'))
+
+
+def _encode_bytes(value: bytes) -> bytes:
+    return _length_delimited(value)
+
+
+def _decode_length(buffer: Buffer, pos: int) -> Tuple[int, int]:
+    length, pos = decode_varint(buffer, pos)
+    end = pos + length
+    if end > len(buffer):
+        raise ValidationError('Invalid protocol buffer: truncated length-delimited value')
+    return pos, end
+
+
+def _decode_str(buffer: Buffer, pos: int) -> Tuple[str, int]:
+    pos, end = _decode_length(buffer, pos)
+    try:
+        return str(buffer[pos:end], 'utf-8'), end
+    except UnicodeDecodeError as e:
+        raise ValidationError('Invalid protocol buffer: {}'.format(e))
+
+
+def _decode_bytes(buffer: Buffer, pos: int) -> Tuple[bytes, int]:
+    pos, end = _decode_length(buffer, pos)
+    return bytes(buffer[pos:end]), end
+
+
+def _encode_many_float(values) -> bytes:
+    return Struct('<{}f'.format(len(values))).pack(*values)
+
+
+def _encode_many_double(values) -> bytes:
+    return Struct('<{}d'.format(len(values))).pack(*values)
+
+
+def _skip(buffer: Buffer, pos: int, wire_type: int) -> int:
+    if wire_type == VARINT:
+        return decode_varint(buffer, pos)[1]
+    elif wire_type == FIXED64:
+        return pos + 8
+    elif wire_type == LENGTH_DELIMITED:
+        return _decode_length(buffer, pos)[1]
+    elif wire_type == FIXED32:
+        return pos + 4
+    raise ValidationError('Invalid protocol buffer: unsupported wire type {}'.format(wire_type))
+
+
+Scalar = NamedTuple('Scalar', [
+    ('wire_type', int),
+    ('encode', Callable[[Any], bytes]),
+    ('decode', Callable[[Buffer, int], Tuple[Any, int]]),
+    ('encode_many', Optional[Callable[[Any], bytes]])  # packed encoding of many values; None if not packable
+])
+
+_BOOL = Scalar(VARINT, _encode_bool, _decode_bool, lambda values: bytes(1 if v else 0 for v in values))
+_INT32 = Scalar(VARINT, _encode_int, _decode_int32, lambda values: b''.join([_encode_int(v) for v in values]))
+_INT64 = Scalar(VARINT, _encode_int, _decode_int64, lambda values: b''.join([_encode_int(v) for v in values]))
+_SINT = Scalar(VARINT, encode_zigzag, decode_zigzag, lambda values: b''.join([encode_zigzag(v) for v in values]))
+_FLOAT32 = Scalar(FIXED32, _FLOAT.pack, _decode_float, _encode_many_float)
+_FLOAT64 = Scalar(FIXED64, _DOUBLE.pack, _decode_double, _encode_many_double)
+_STRING = Scalar(LENGTH_DELIMITED, _encode_str, _decode_str, None)
+_BYTES = Scalar(LENGTH_DELIMITED, _encode_bytes, _decode_bytes, None)
+
+
+def _tag(number: int, wire_type: int) -> bytes:
+    return encode_varint(number << 3 | wire_type)
+
+
+class Protobuf(Protocol):
+    """
+    Protocol Buffers (proto3) binary wire format.
+
+    Fields are numbered using :attr:`FieldDescriptor.number`, or by their position in the message when no number
+    is given. Integer fields with the ``zigzag=True`` option are encoded like *sint32* and *sint64*. Repeated
+    numeric fields use packed encoding.
+    """
+    mime = 'application/x-protobuf'
+    name = 'protobuf'
+
+    def __init__(self, fmt: Type[Message], field_names_: Set[str] = None):
+        super().__init__(fmt, field_names_)
+        self._numbers = self._field_numbers(fmt)
+        self._encode = self._compile_encoder()
+        self._decoders = {self._numbers[field.name]: (field.name, self._field_decoder(field))
+                          for field in self._fields}
+        # constraints are checked once the whole message is decoded, since repeated fields may occur more than once
+        self._validate = compile_validator(fmt, self._fields, nested=self._nested_validator)
+
+    def _nested_validator(self, fmt: Type[Message]) -> Callable[[Message], None]:
+        # the protocol of a nested message is looked up when it is first validated, since messages may be recursive
+        protocol = None
+
+        def validate(message: Message) -> None:
+            nonlocal protocol
+            if protocol is None:
+                protocol = self._get_protocol(fmt)
+            if protocol._validate is not None:
+                protocol._validate(message)
+
+        return validate
+
+    @staticmethod
+    def _field_numbers(fmt: Type[Message]) -> Dict[str, int]:
+        numbers = {}
+        for position, field in enumerate(fields(fmt), 1):
+            number = position if field.number is None else field.number
+            if number in numbers.values():
+                raise RuntimeError('Duplicate field number {} in {}'.format(number, fmt))
+            numbers[field.name] = number
+        return numbers
+
+    def _scalar(self, field: FieldDescriptor) -> Scalar:
+        if not isinstance(field, Field):
+            raise NotImplementedError('Unable to encode {} in a protocol buffer'.format(field))
+
+        if issubclass(field.type, Message):
+            field_protocol = self._get_protocol(field.type)
+
+            def decode_message(buffer: Buffer, pos: int) -> Tuple[Message, int]:
+                pos, end = _decode_length(buffer, pos)
+                return field_protocol._decode(buffer, pos, end), end
+
+            return Scalar(LENGTH_DELIMITED,
+                          lambda message: _length_delimited(field_protocol._encode(message)),
+                          decode_message,
+                          None)
+
+        if field.type is bool:
+            return _BOOL
+        if field.type is int:
+            if field.options.get('zigzag', False):
+                return _SINT
+            return _INT32 if isinstance(field, Int32) else _INT64
+        if field.type is float:
+            return _FLOAT32 if isinstance(field, Float32) else _FLOAT64
+        if field.type is str:
+            return _STRING
+        if field.type is bytes:
+            return _BYTES
+        raise NotImplementedError('Unable to encode {} in a protocol buffer'.format(field))
+
+    def _compile_encoder(self) -> Callable[[Message], bytes]:
+        namespace = {
+            'NOT_SET': NOT_SET,
+            'LazyValue': LazyValue,
+            'length_delimited': _length_delimited
+        }
+        lines = ['def encode(message):',
+                 '    parts = []',
+                 '    append = parts.append']
+
+        for field in self._fields:
+            number = self._numbers[field.name]
+            lines += indent(['value = message.{}'.format(field.slot)])
+
+            if isinstance(field, MapField):
+                key_scalar, value_scalar = _STRING, self._scalar(field.values)
+                lines += indent([
+                    'if value is not NOT_SET:',
+                    *indent(_resolve_lazy_source(field, 'value', 'message')),
+                    '    for key, item in value.items():',
+                    '        append({})'.format(reference(namespace, _tag(number, LENGTH_DELIMITED), 'tag')),
+                    '        append(length_delimited({} + {}(key) + {} + {}(item)))'.format(
+                        reference(namespace, _tag(1, key_scalar.wire_type), 'tag'),
+                        reference(namespace, key_scalar.encode, 'encode'),
+                        reference(namespace, _tag(2, value_scalar.wire_type), 'tag'),
+                        reference(namespace, value_scalar.encode, 'encode'))
+                ])
+            elif isinstance(field, ArrayField):
+                lines += indent([
+                    'if value is not NOT_SET and len(value):',
+                    '    append({})'.format(reference(namespace, _tag(number, LENGTH_DELIMITED), 'tag')),
+                    '    append(length_delimited({}(value)))'.format(
+                        reference(namespace, self._array_encoder(field), 'encode'))
+                ])
+            elif isinstance(field, RepeatField):
+                scalar = self._scalar(field.items)
+                if scalar.encode_many is not None:
+                    lines += indent([
+                        'if value:',
+                        '    append({})'.format(reference(namespace, _tag(number, LENGTH_DELIMITED), 'tag')),
+                        '    append(length_delimited({}(value)))'.format(
+                            reference(namespace, scalar.encode_many, 'encode'))
+                    ])
+                else:
+                    lines += indent([
+                        'if value is not NOT_SET:',
+                        *indent(_resolve_lazy_source(field, 'value', 'message')),
+                        '    for item in value:',
+                        '        append({})'.format(reference(namespace, _tag(number, scalar.wire_type), 'tag')),
+                        '        append({}(item))'.format(reference(namespace, scalar.encode, 'encode'))
+                    ])
+            else:
+                scalar = self._scalar(field)
+                lines += indent([
+                    'if value is not NOT_SET:',
+                    *indent(_resolve_lazy_source(field, 'value', 'message')),
+                    '    append({})'.format(reference(namespace, _tag(number, scalar.wire_type), 'tag')),
+                    '    append({}(value))'.format(reference(namespace, scalar.encode, 'encode'))
+                ])
+
+        lines.append("    return b''.join(parts)")
+        return compile_function('encode', lines, namespace)
+
+    def _array_encoder(self, field: ArrayField) -> Callable[[Any], bytes]:
+        scalar = self._scalar(field.items)
+        typecode = field.typecode
+
+        if scalar.wire_type == VARINT:
+            return lambda values: scalar.encode_many(as_array(typecode, values))
+
+        def encode_array(values) -> bytes:
+            values = as_array(typecode, values)
+            if _BIG_ENDIAN:
+                values = array(typecode, values)
+                values.byteswap()
+            return values.tobytes()
+
+        return encode_array
+
+    def _field_decoder(self, field: FieldDescriptor) -> Callable[[Buffer, int, int, Message], int]:
+        slot = field.slot
+
+        if isinstance(field, ArrayField):
+            scalar = self._scalar(field.items)
+            typecode = field.typecode
+
+            def decode_array(buffer: Buffer, pos: int, wire_type: int, message: Message) -> int:
+                items = getattr(message, slot)
+                if items is NOT_SET:
+                    items = array(typecode)
+                    setattr(message, slot, items)
+
+                if wire_type == LENGTH_DELIMITED:
+                    pos, end = _decode_length(buffer, pos)
+                    if scalar.wire_type != VARINT:
+                        chunk = array(typecode)
+                        chunk.frombytes(buffer[pos:end])
+                        if _BIG_ENDIAN:
+                            chunk.byteswap()
+                        items.extend(chunk)
+                        return end
+
+                    decode, append = scalar.decode, items.append
+                    while pos < end:
+                        item, pos = decode(buffer, pos)
+                        append(item)
+                    return pos
+
+                if wire_type != scalar.wire_type:
+                    raise ValidationError('Unexpected wire type {}'.format(wire_type))
+
+                item, pos = scalar.decode(buffer, pos)
+                items.append(item)
+                return pos
+
+            return decode_array
+
+        if isinstance(field, MapField):
+            value_scalar = self._scalar(field.values)
+            value_default = field.values.default
+
+            def decode_map_entry(buffer: Buffer, pos: int, wire_type: int, message: Message) -> int:
+                if wire_type != LENGTH_DELIMITED:
+                    raise ValidationError('Unexpected wire type {}'.format(wire_type))
+
+                pos, end = _decode_length(buffer, pos)
+                key, value = '', NOT_SET
+                while pos < end:
+                    entry_key, pos = decode_varint(buffer, pos)
+                    if entry_key == 1 << 3 | LENGTH_DELIMITED:
+                        key, pos = _decode_str(buffer, pos)
+                    elif entry_key == 2 << 3 | value_scalar.wire_type:
+                        value, pos = value_scalar.decode(buffer, pos)
+                    else:
+                        pos = _skip(buffer, pos, entry_key & 7)
+
+                mapping = getattr(message, slot)
+                if mapping is NOT_SET:
+                    mapping = {}
+                    setattr(message, slot, mapping)
+                mapping[key] = value_default() if value is NOT_SET else value
+                return end
+
+            return decode_map_entry
+
+        if isinstance(field, RepeatField):
+            scalar = self._scalar(field.items)
+            packed = scalar.encode_many is not None
+
+            def decode_repeat(buffer: Buffer, pos: int, wire_type: int, message: Message) -> int:
+                items = getattr(message, slot)
+                if items is NOT_SET:
+                    items = []
+                    setattr(message, slot, items)
+
+                if packed and wire_type == LENGTH_DELIMITED:
+                    pos, end = _decode_length(buffer, pos)
+                    decode, append = scalar.decode, items.append
+                    while pos < end:
+                        item, pos = decode(buffer, pos)
+                        append(item)
+                    return pos
+
+                if wire_type != scalar.wire_type:
+                    raise ValidationError('Unexpected wire type {}'.format(wire_type))
+
+                item, pos = scalar.decode(buffer, pos)
+                items.append(item)
+                return pos
+
+            return decode_repeat
+
+        scalar = self._scalar(field)
+
+        def decode_field(buffer: Buffer, pos: int, wire_type: int, message: Message) -> int:
+            if wire_type != scalar.wire_type:
+                raise ValidationError('Unexpected wire type {}'.format(wire_type))
+            value, pos = scalar.decode(buffer, pos)
+            setattr(message, slot, value)
+            return pos
+
+        return decode_field
+
+    def _decode(self, buffer: Buffer, pos: int, end: int, message: Message = None) -> Message:
+        if message is None:
+            message = self._format()
+
+        decoders = self._decoders
+        while pos < end:
+            key, pos = decode_varint(buffer, pos)
+            wire_type = key & 7
+            try:
+                name, decode = decoders[key >> 3]
+            except KeyError:
+                pos = _skip(buffer, pos, wire_type)
+                continue
+
+            try:
+                pos = decode(buffer, pos, wire_type, message)
+            except ValidationError as e:
+                raise e.prefix(name)
+
+        if pos != end:
+            raise ValidationError('Invalid protocol buffer: truncated message')
+        return message
+
+    def pack(self, message: Message) -> bytes:
+        return self._encode(message)
+
+    def unpack(self, buffer: bytes, trusted: bool = False) -> Message:
+        """
+        :param trusted: if ``True``, constraints are not checked; only use this for input from a trusted source
+        """
+        buffer = memoryview(buffer)
+        try:
+            message = self._decode(buffer, 0, len(buffer))
+        except (IndexError, ValueError, StructError) as e:
+            raise ValidationError('Invalid protocol buffer: {}'.format(str(e)))
+
+        if not trusted and self._validate is not None:
+            self._validate(message)
+        return message
+
+    def pack_many(self, messages: Iterable[Message]) -> bytes:
+        """
+        Packs a sequence of messages, each prefixed with its length as a varint (the "delimited" format of the
+        reference implementations).
+        """
+        encode = self._encode
+        parts = []
+        for message in messages:
+            buffer = encode(message)
+            parts.append(encode_varint(len(buffer)))
+            parts.append(buffer)
+        return b''.join(parts)
+
+    def unpack_many(self, buffer: bytes) -> List[Message]:
+        decode, validate = self._decode, self._validate
+        buffer = memoryview(buffer)
+        messages = []
+        pos, end = 0, len(buffer)
+        try:
+            while pos < end:
+                try:
+                    pos, message_end = _decode_length(buffer, pos)
+                    message = decode(buffer, pos, message_end)
+                    if validate is not None:
+                        validate(message)
+                    messages.append(message)
+                except ValidationError as e:
+                    raise e.prefix(str(len(messages)))
+                pos = message_end
+        except (IndexError, ValueError, StructError) as e:
+            raise ValidationError('Invalid protocol buffer: {}'.format(str(e)), [str(len(messages))])
+        return messages
+
+    def iter_unpack(self, stream: BinaryIO) -> Iterator[Message]:
+        while True:
+            length, shift = 0, 0
+            while True:
+                b = stream.read(1)
+                if not b:
+                    if shift:
+                        raise ValidationError('Invalid protocol buffer: truncated length')
+                    return
+                length |= (b[0] & 0x7f) << shift
+                if not b[0] & 0x80:
+                    break
+                shift += 7
+
+            buffer = stream.read(length)
+            if len(buffer) < length:
+                raise ValidationError('Invalid protocol buffer: truncated message')
+            yield self.unpack(buffer)
@@ -1,15 +1,22 @@
-from typing import Type, Union, Iterable, Tuple, ClassVar
+import asyncio
+from collections import deque
+from functools import partial
+from typing import Type, Union, Iterable, Tuple, ClassVar, List
 from weakref import WeakKeyDictionary
 
-import asyncio
 from blinker import Signal
 
+from venom.rpc.cache import CacheBackend, LRUCache, ResponseCache, TTL, Invoke  # noqa: F401
+from venom.rpc.coalesce import Coalescer
+from venom.rpc.deadline import get_deadline, get_timeout, wait_until
+from venom.rpc.limits import ConcurrencyLimit, Limiter
 from venom.rpc.context import RequestContext, DictRequestContext
-from venom.rpc.stub import Stub, RPC
-from venom.protocol import Protocol
-from .method import rpc, http
+from venom.rpc.interceptors import Interceptor, Handler, compile_handler
+from venom.rpc.stub import Stub, RPC  # noqa: F401
+from venom.protocol import Protocol  # noqa: F401
+from .method import rpc, http  # noqa: F401
 from .proxy import ServiceProxy
-from .service import Service
+from .service import Service, Lifetime
 
 
 class UnknownService(RuntimeError):
@@ -23,10 +30,28 @@ class Venom(object):
 
     _request_context_cls: Type[RequestContext]
 
-    def __init__(self, *, request_context_cls: Type[RequestContext] = DictRequestContext):
+    def __init__(self,
+                 *,
+                 request_context_cls: Type[RequestContext] = DictRequestContext,
+                 interceptors: Iterable[Interceptor] = (),
+                 cache_backend: CacheBackend = None):
+        """
+        :param interceptors: interceptors that apply to the methods of all services; see :class:`Interceptor`
+        :param cache_backend: the backend for methods with a ``cache`` option; defaults to a :class:`LRUCache`
+        """
         self._request_context_cls = request_context_cls
+        self._interceptors = list(interceptors)
+        self._handlers = {}
+        self._cache_backend = cache_backend if cache_backend is not None else LRUCache()
+        self._invokers = {}
+        self._limiters = {}
+        self._coalescers = {}
         self._instances = WeakKeyDictionary()
+        self._singletons = {}
+        self._pools = {}
+        # services are indexed both by name and by class
         self._services = {}
+        self._service_names = {}
         self._public_services = {}
         self._clients = {}
 
@@ -46,6 +71,7 @@ class Venom(object):
             raise ValueError("A service with name '{}' already exists".format(name))
 
         self._services[name] = service
+        self._service_names[service] = name
 
         if client:
             self._clients[service] = client(service, *client_args, **client_kwargs)
@@ -65,35 +91,130 @@ class Venom(object):
                 return self._services[reference]
             except KeyError:
                 raise UnknownService("No service with name '{}' is known to this Venom".format(reference))
-        elif reference not in self._services.values():
+        elif reference not in self._service_names:
             raise UnknownService("'{}' is not known to this Venom".format(reference))
         return reference
 
+    def _create_instance(self, cls: Type[Service]) -> Service:
+        if issubclass(cls, Stub):
+            return cls(self._clients[cls], venom=self)
+        return cls(venom=self)
+
+    def _release_instance(self, cls: Type[Service], instance: Service) -> None:
+        pool = self._pools[cls]
+        if len(pool) < cls.__meta__.pool_size:
+            pool.append(instance)
+
     def get_instance(self, reference: Union[str, type]):
-        cls = self._resolve_service_cls(reference)
+        """
+        Returns an instance of a service according to its :class:`Lifetime`. Outside of a request context, services
+        that are not singletons get a new instance on every call.
+
+        Within a request context, instances are memoized by `reference`, so that repeated lookups, such as those of a
+        :class:`ServiceProxy`, cost a dictionary lookup.
+        """
         context = RequestContext.current()
+        if context is not None:
+            try:
+                instances = self._instances[context]
+            except KeyError:
+                instances = self._instances[context] = {}
+            else:
+                try:
+                    return instances[reference]
+                except KeyError:
+                    pass
+
+        cls = self._resolve_service_cls(reference)
+        lifetime = cls.__meta__.lifetime
+
+        if lifetime is Lifetime.SINGLETON:
+            try:
+                instance = self._singletons[cls]
+            except KeyError:
+                instance = self._singletons[cls] = self._create_instance(cls)
+            if context is not None:
+                instances[reference] = instance
+            return instance
+
+        if context is None:
+            return self._create_instance(cls)
 
         try:
-            return self._instances[context][cls]
+            instance = instances[reference] = instances[cls]
+            return instance
         except KeyError:
             pass
 
-        if issubclass(cls, Stub):
-            instance = cls(self._clients[cls], venom=self)
+        if lifetime is Lifetime.POOLED:
+            pool = self._pools.setdefault(cls, deque())
+            instance = pool.pop() if pool else self._create_instance(cls)
+            context.on_exit(partial(self._release_instance, cls, instance))
         else:
-            instance = cls(venom=self)
+            instance = self._create_instance(cls)
 
-        if context:
-            if context in self._instances:
-                self._instances[context][cls] = instance
-            else:
-                self._instances[context] = {cls: instance}
+        instances[cls] = instances[reference] = instance
         return instance
 
     def iter_methods(self) -> Iterable[Tuple[Type[Service], 'venom.rpc.method.Method']]:
         for service in self._public_services.values():
-            for rpc in service.__methods__.values():
-                yield service, rpc
+            for method in service.__methods__.values():
+                yield service, method
+
+    def add_interceptor(self, interceptor: Interceptor) -> None:
+        self._interceptors.append(interceptor)
+        self._handlers.clear()
+
+    def _innermost_interceptors(self, service: Type[Service], method: 'venom.rpc.method.Method') -> List[Interceptor]:
+        """
+        :return: the interceptors for the ``cache`` and ``coalesce`` options of the method
+        """
+        interceptors = []
+        policy = method.options.get('cache')
+        if policy is not None:
+            interceptors.append(ResponseCache(service, method, policy, self._cache_backend))
+
+        if method.options.get('coalesce', False):
+            try:
+                coalescer = self._coalescers[service, method]
+            except KeyError:
+                coalescer = self._coalescers[service, method] = Coalescer(service, method)
+            interceptors.append(coalescer)
+        return interceptors
+
+    def _handler(self, service: Type[Service], method: 'venom.rpc.method.Method') -> Handler:
+        try:
+            return self._handlers[service, method]
+        except KeyError:
+            handler = self._handlers[service, method] = compile_handler(service,
+                                                                        method,
+                                                                        self._interceptors,
+                                                                        self._innermost_interceptors(service, method))
+            return handler
+
+    def _invoker(self, service: Type[Service], method: 'venom.rpc.method.Method') -> Invoke:
+        """
+        :return: :meth:`_invoke`, wrapped according to the ``concurrency`` options of the method and its service
+        """
+        try:
+            return self._invokers[service, method]
+        except KeyError:
+            invoke = self._invoke
+
+            service_limit = ConcurrencyLimit.of(service.__meta__.get('concurrency'))
+            if service_limit is not None:
+                try:
+                    limiter = self._limiters[service]
+                except KeyError:
+                    limiter = self._limiters[service] = Limiter(service_limit)
+                invoke = partial(limiter, invoke)
+
+            method_limit = ConcurrencyLimit.of(method.options.get('concurrency'))
+            if method_limit is not None:
+                invoke = partial(Limiter(method_limit), invoke)
+
+            self._invokers[service, method] = invoke
+            return invoke
 
     def get_request_context(self) -> RequestContext:
         return self._request_context_cls(self)
@@ -101,20 +222,54 @@ class Venom(object):
     async def _invoke(self,
                       service: Type[Service],
                       method: 'venom.rpc.method.Method',
-                      request: 'venom.Message'):
-        with self._request_context_cls(self):
+                      request: 'venom.Message',
+                      field_mask: 'venom.common.FieldMask' = None,
+                      deadline: float = None):
+        if deadline is not None:
+            # requests whose deadline passed while they were queued are dropped
+            get_timeout(deadline)
+
+        parent = RequestContext.current()
+        with self._request_context_cls(self) as context:
+            context.field_mask = field_mask
+            context.deadline = deadline
+            if parent is not None:
+                context.inherit_resolved_values(parent)
             instance = self.get_instance(service)
-            self.before_invoke.send(self, service=service, method=method, request=request)
-            return await method.invoke(instance, request)
+            # deprecated in favor of interceptors; only dispatched if anyone is listening
+            if self.before_invoke.receivers:
+                self.before_invoke.send(self, service=service, method=method, request=request)
+            if deadline is None:
+                return await self._handler(service, method)(instance, request)
+            return await wait_until(deadline, self._handler(service, method), instance, request)
 
     async def invoke(self,
                      service: Type[Service],
                      method: 'venom.rpc.method.Method',
                      request: 'venom.Message',
-                     loop: 'asyncio.AbstractEventLoop' = None):
-        if loop is None:
-            loop = asyncio.get_event_loop()
-        return await loop.create_task(self._invoke(service, method, request))
+                     loop: 'asyncio.AbstractEventLoop' = None,
+                     *,
+                     field_mask: 'venom.common.FieldMask' = None,
+                     timeout: float = None):
+        """
+        Invokes `method` within a new :class:`RequestContext`. The method is awaited in the current task; the
+        context of the caller, if any, is current again once the method returns.
+
+        Methods with a ``cache`` option, such as ``@rpc(cache=TTL(30))``, are only invoked when there is no cached
+        response for the request. Methods with ``coalesce=True`` share an invocation between equal requests that are
+        in flight at the same time; see :class:`Coalescer`. Both apply after the interceptors of the method, so cached
+        and shared responses are subject to e.g. authentication as well. Calls beyond the ``concurrency`` limit of the method or
+        its service are queued or rejected; see :class:`ConcurrencyLimit`.
+
+        :param loop: not used; methods are always awaited in the current task
+        :param field_mask: the fields of the response requested by the caller; available to the service as
+                           ``self.context.field_mask``
+        :param timeout: the number of seconds the caller waits for the response; the deadline of the context of the
+                        caller applies as well. The method is cancelled with :class:`DeadlineExceeded` once the
+                        deadline passes, and the deadline is available to the service as ``self.context.deadline``
+        """
+        deadline = get_deadline(timeout, RequestContext.current())
+        return await self._invoker(service, method)(service, method, request, field_mask, deadline)
 
     def __iter__(self) -> Iterable[Type[Service]]:
         return iter(self._public_services.values())
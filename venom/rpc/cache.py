@@ -0,0 +1,166 @@
+"""
+Caching of the responses of idempotent methods. A method opts in with a cache policy::
+
+    class PetService(Service):
+        @rpc(cache=TTL(30))
+        async def get_pet(self, id: int) -> Pet:
+            ...
+
+Entries are keyed on the method and the canonical encoding of the request.
+"""
+import json
+import time
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from copy import copy, deepcopy
+from typing import Any, Optional, Type, Callable, Awaitable
+
+from venom.exceptions import NotFound
+from venom.message import Message
+from venom.protocol import JSON
+from venom.rpc.interceptors import Interceptor, Handler
+
+
+class CacheBackend(metaclass=ABCMeta):
+    """
+    Storage for cached responses. Values are :class:`Message` instances, or :class:`NotFound` errors when negative
+    caching is enabled; a backend that stores values out of process has to serialize them.
+    """
+
+    @abstractmethod
+    def get(self, key: bytes) -> Optional[Any]:
+        """
+        :return: the value stored under `key`, or ``None`` if there is no value or it has expired
+        """
+
+    @abstractmethod
+    def set(self, key: bytes, value: Any, ttl: float) -> None:
+        """
+        :param ttl: the number of seconds after which the value expires
+        """
+
+    @abstractmethod
+    def delete(self, key: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+
+class LRUCache(CacheBackend):
+    """
+    An in-memory backend holding at most `max_size` entries; the least recently used entry is evicted first.
+    """
+
+    def __init__(self, max_size: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self._clock = clock
+        self._entries = OrderedDict()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        try:
+            expires, value = self._entries[key]
+        except KeyError:
+            return None
+
+        if expires <= self._clock():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: bytes, value: Any, ttl: float) -> None:
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: bytes) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TTL(object):
+    """
+    A cache policy that keeps responses for `seconds`.
+
+    :param not_found: the number of seconds to cache :class:`NotFound` errors for; defaults to `seconds`, and ``0``
+                      disables negative caching
+    :param backend: the backend to store responses in; defaults to the backend of the :class:`venom.rpc.Venom`
+                    instance
+    """
+
+    def __init__(self, seconds: float, *, not_found: float = None, backend: CacheBackend = None):
+        self.seconds = seconds
+        self.not_found = seconds if not_found is None else not_found
+        self.backend = backend
+
+    def __repr__(self):
+        return 'TTL({!r}, not_found={!r})'.format(self.seconds, self.not_found)
+
+
+class RequestKey(object):
+    """
+    Computes a key that is equal for equal requests to a method and field masks.
+    """
+
+    def __init__(self, service: Type['venom.rpc.service.Service'], method: 'venom.rpc.method.Method'):
+        self._prefix = '{}.{}\0'.format(service.__meta__.name, method.name).encode('utf-8')
+        self._encode = JSON(method.request).encode
+        self._dumps = json.JSONEncoder(separators=(',', ':'), sort_keys=True).encode
+
+    def __call__(self, request: Message, field_mask: 'venom.common.FieldMask' = None) -> bytes:
+        key = self._prefix + self._dumps(self._encode(request)).encode('utf-8')
+        if field_mask is not None:
+            key += b'\0' + ','.join(sorted(field_mask.paths)).encode('utf-8')
+        return key
+
+
+# invoke(service, method, request, field_mask, deadline)
+Invoke = Callable[[Type['venom.rpc.service.Service'], 'venom.rpc.method.Method', Message, Any, Optional[float]],
+                  Awaitable[Message]]
+
+
+class ResponseCache(Interceptor):
+    """
+    Caches the responses of a single method according to its cache policy.
+    """
+
+    def __init__(self,
+                 service: Type['venom.rpc.service.Service'],
+                 method: 'venom.rpc.method.Method',
+                 policy: TTL,
+                 backend: CacheBackend):
+        self.policy = policy
+        self.backend = policy.backend or backend
+        self.key = RequestKey(service, method)
+
+    async def intercept(self,
+                        instance: 'venom.rpc.service.Service',
+                        method: 'venom.rpc.method.Method',
+                        request: Message,
+                        handler: Handler) -> Message:
+        context = instance.context
+        key = self.key(request, context.field_mask if context is not None else None)
+        value = self.backend.get(key)
+        if value is not None:
+            if isinstance(value, NotFound):
+                raise copy(value)
+            return deepcopy(value)
+
+        try:
+            response = await handler(instance, request)
+        except NotFound as e:
+            if self.policy.not_found:
+                self.backend.set(key, copy(e), self.policy.not_found)
+            raise
+
+        self.backend.set(key, deepcopy(response), self.policy.seconds)
+        return response
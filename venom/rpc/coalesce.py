@@ -0,0 +1,62 @@
+import asyncio
+from copy import deepcopy
+from typing import Type, Dict
+
+from venom.message import Message
+from venom.rpc.cache import RequestKey
+from venom.rpc.context import create_task
+from venom.rpc.interceptors import Interceptor, Handler
+
+
+class _Flight(object):
+    __slots__ = ('future', 'waiters')
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 0
+
+
+class Coalescer(Interceptor):
+    """
+    Shares an in-flight invocation of a method between callers making equal requests. The invocation is cancelled
+    once every caller has been cancelled.
+    """
+
+    def __init__(self, service: Type['venom.rpc.service.Service'], method: 'venom.rpc.method.Method'):
+        self.key = RequestKey(service, method)
+        self._flights: Dict[bytes, _Flight] = {}
+
+    def _land(self, key: bytes, flight: _Flight, future: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def intercept(self,
+                        instance: 'venom.rpc.service.Service',
+                        method: 'venom.rpc.method.Method',
+                        request: Message,
+                        handler: Handler) -> Message:
+        context = instance.context
+        key = self.key(request, context.field_mask if context is not None else None)
+        started = False
+        try:
+            flight = self._flights[key]
+        except KeyError:
+            future = create_task(handler(instance, request))
+            flight = self._flights[key] = _Flight(future)
+            flight.future.add_done_callback(lambda future: self._land(key, flight, future))
+            started = True
+
+        flight.waiters += 1
+        try:
+            response = await asyncio.shield(flight.future)
+            # the other callers get their own copy, which they may modify
+            return response if started else deepcopy(response)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.future.done():
+                flight.future.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def __len__(self):
+        return len(self._flights)
@@ -1,11 +1,14 @@
-from typing import Type
+from typing import Type, NamedTuple, List, Mapping, Tuple, Iterable, Optional
 
 import aiohttp
 import asyncio
 
-from venom.exceptions import Error, ErrorResponse
+from venom.common import FieldMask
+from venom.exceptions import Error, ErrorResponse, BadRequest
 from venom.rpc.comms import BaseClient
-from venom.rpc.method import Method, HTTPVerb, HTTPFieldLocation
+from venom.rpc.deadline import TIMEOUT_HEADER, parse_timeout, format_timeout, get_deadline, get_timeout, \
+    wait_until
+from venom.rpc.method import Method, HTTPFieldLocation
 from venom.protocol import JSON, Protocol, DictProtocol, URIString
 
 try:
@@ -14,48 +17,168 @@ except ImportError:
     raise RuntimeError("You must install the 'aiohttp' package to use the AioHTTP features of Venom RPC")
 
 
+_HTTPProtocols = NamedTuple('_HTTPProtocols', [
+    ('request', Protocol),
+    ('response', Protocol),
+    ('error_response', Protocol)
+])
+
+
+def _accepted_mime_types(accept: str) -> List[str]:
+    """
+    :return: the media ranges of an Accept header, ordered by preference
+    """
+    media_ranges = []
+    for position, media_range in enumerate(accept.split(',')):
+        mime, *params = media_range.split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            media_ranges.append((-quality, position, mime.strip().lower()))
+    return [mime for _, _, mime in sorted(media_ranges)]
+
+
+def _negotiate(http_request: web.Request,
+               protocols: Mapping[str, _HTTPProtocols],
+               default: _HTTPProtocols) -> Tuple[_HTTPProtocols, _HTTPProtocols]:
+    """
+    Chooses the protocols for reading the request body from its Content-Type, and for writing the response from
+    the Accept header. Falls back to the default protocol if the request does not match any of them.
+    """
+    request_protocols = protocols.get(http_request.content_type, default)
+    response_protocols = default
+
+    accept = http_request.headers.get('accept')
+    if accept:
+        for mime in _accepted_mime_types(accept):
+            if mime in protocols:
+                response_protocols = protocols[mime]
+                break
+            if mime == '*/*':
+                break
+    return request_protocols, response_protocols
+
+
+def _field_mask(http_request: web.Request) -> Optional[FieldMask]:
+    """
+    :return: the field mask from the ``fields`` query parameter, e.g. ``?fields=name,owner.name``, if present
+    """
+    fields = http_request.query.get('fields')
+    if fields is None:
+        return None
+    return FieldMask([path.strip() for path in fields.split(',') if path.strip()])
+
+
+#: request bodies larger than this number of bytes are decoded as they are received, rather than read at once
+STREAM_THRESHOLD = 2 ** 20
+
+
+def _timeout(http_request: web.Request) -> Optional[float]:
+    """
+    :return: the timeout from the ``X-Request-Timeout`` header, in seconds, if present
+    """
+    value = http_request.headers.get(TIMEOUT_HEADER)
+    if value is None:
+        return None
+    try:
+        return parse_timeout(value)
+    except ValueError:
+        raise BadRequest('Invalid {} header: {!r}'.format(TIMEOUT_HEADER, value))
+
+
 def _route_handler(venom: 'venom.rpc.Venom',
                    service: Type['venom.rpc.Service'],
                    rpc: Method,
                    protocol_factory: Type[Protocol],
                    query_protocol_factory: Type[DictProtocol] = URIString,
-                   path_protocol_factory: Type[DictProtocol] = URIString):
-    rpc_response = protocol_factory(rpc.response)
-    rpc_error_response = protocol_factory(ErrorResponse)
-
+                   path_protocol_factory: Type[DictProtocol] = URIString,
+                   additional_protocol_factories: Iterable[Type[Protocol]] = (),
+                   trusted: bool = False,
+                   stream_threshold: Optional[int] = STREAM_THRESHOLD):
     http_status = rpc.http_status
 
     http_field_locations = rpc.http_field_locations()
-    http_request_body = protocol_factory(rpc.request, http_field_locations[HTTPFieldLocation.BODY])
     http_request_query = query_protocol_factory(rpc.request, http_field_locations[HTTPFieldLocation.QUERY])
     http_request_path = path_protocol_factory(rpc.request, http_field_locations[HTTPFieldLocation.PATH])
 
+    protocols = {}
+    for factory in (protocol_factory, *additional_protocol_factories):
+        protocols[factory.mime] = _HTTPProtocols(factory(rpc.request, http_field_locations[HTTPFieldLocation.BODY]),
+                                                 factory(rpc.response),
+                                                 factory(ErrorResponse))
+
+    default_protocols = protocols[protocol_factory.mime]
+
+    # a request field named "fields" takes precedence over the field mask parameter
+    accepts_field_mask = 'fields' not in rpc.request.__fields__
+
     async def handler(http_request):
+        if len(protocols) == 1:
+            request_protocols = response_protocols = default_protocols
+        else:
+            request_protocols, response_protocols = _negotiate(http_request, protocols, default_protocols)
+
         try:
-            request = http_request_body.unpack(await http_request.read())
+            if trusted:
+                request = request_protocols.request.unpack(await http_request.read(), trusted=True)
+            elif request_protocols.request.streaming and stream_threshold is not None and \
+                    (http_request.content_length or 0) > stream_threshold:
+                request = await request_protocols.request.unpack_stream(http_request.content)
+            else:
+                request = request_protocols.request.unpack(await http_request.read())
             http_request_query.decode(http_request.url.query, request)
             http_request_path.decode(http_request.match_info, request)
 
-            response = await venom.invoke(service, rpc, request)
-            return web.Response(body=rpc_response.pack(response),
-                                content_type=rpc_response.mime,
+            field_mask = _field_mask(http_request) if accepts_field_mask else None
+            # the method is cancelled along with this handler if the client disconnects
+            response = await venom.invoke(service, rpc, request, field_mask=field_mask, timeout=_timeout(http_request))
+
+            response_protocol = response_protocols.response
+            if field_mask is not None:
+                response_protocol = response_protocol.subset(field_mask.paths)
+
+            return web.Response(body=response_protocol.pack(response),
+                                content_type=response_protocol.mime,
                                 status=http_status)
         except Error as e:
-            return web.Response(body=rpc_error_response.pack(e.format()),
-                                content_type=rpc_error_response.mime,
+            return web.Response(body=response_protocols.error_response.pack(e.format()),
+                                content_type=response_protocols.error_response.mime,
                                 status=e.http_status)
     return handler
 
 
 def create_app(venom: 'venom.rpc.Venom',
                app: web.Application = None,
-               protocol_factory: Type[Protocol] = JSON):
+               protocol_factory: Type[Protocol] = JSON,
+               *,
+               additional_protocol_factories: Iterable[Type[Protocol]] = (),
+               trusted: bool = False,
+               stream_threshold: Optional[int] = STREAM_THRESHOLD):
+    """
+    :param protocol_factory: the default protocol for request and response bodies
+    :param additional_protocol_factories: other protocols, chosen through the Content-Type and Accept headers
+    :param trusted: whether to skip validation of request bodies; only use this for internal traffic from services
+        built from the same message definitions
+    :param stream_threshold: the Content-Length above which request bodies in a protocol that supports streaming are
+        decoded as they are received, which saves memory but is slower for small bodies; ``0`` streams every body with
+        a length, and ``None`` reads every body at once
+    """
     if app is None:
         app = web.Application()
 
     for service, rpc in venom.iter_methods():
         http_rule = rpc.http_rule(service)
-        app.router.add_route(rpc.http_verb.value, http_rule, _route_handler(venom, service, rpc, protocol_factory))
+        handler = _route_handler(venom, service, rpc, protocol_factory,
+                                 additional_protocol_factories=additional_protocol_factories,
+                                 trusted=trusted,
+                                 stream_threshold=stream_threshold)
+        app.router.add_route(rpc.http_verb.value, http_rule, handler)
 
     return app
 
@@ -68,10 +191,22 @@ class HTTPClient(BaseClient):
                  protocol_factory: Type[Protocol] = None,
                  query_protocol_factory: Type[DictProtocol] = URIString,
                  path_protocol_factory: Type[DictProtocol] = URIString,
+                 lazy: bool = False,
+                 trusted: bool = False,
                  session: aiohttp.ClientSession = None,
                  **session_kwargs):
+        """
+        :param lazy: whether to decode nested messages in responses only when they are accessed; requires a protocol
+            that supports lazy decoding, such as :class:`JSON`
+        :param trusted: whether to skip validation of responses; only use this with trusted servers
+        """
         super().__init__(stub, protocol_factory=protocol_factory)
         self._base_url = base_url
+        self._unpack_options = {}
+        if lazy:
+            self._unpack_options['lazy'] = True
+        if trusted:
+            self._unpack_options['trusted'] = True
         self._query_protocol_factory = query_protocol_factory
         self._path_protocol_factory = path_protocol_factory
 
@@ -87,24 +222,41 @@ class HTTPClient(BaseClient):
                      *,
                      context: 'venom.RequestContext' = None,
                      loop: 'asyncio.BaseEventLoop' = None,
-                     timeout: int = None):
+                     timeout: float = None,
+                     field_mask: FieldMask = None):
+        """
+        :param context: the context of the caller; its deadline applies to the request
+        :param timeout: the number of seconds to wait for the response
+        :param field_mask: the fields of the response to request; other fields are left unset
+        """
+        headers = {'accept': self._protocol_factory.mime,
+                   'content-type': self._protocol_factory.mime}
 
-        # TODO optional timeouts
+        deadline = get_deadline(timeout, context)
+        if deadline is None:
+            return await self._request(stub, rpc, request, headers, field_mask)
 
+        # the server is told how long it has left, and the request is cancelled if the deadline passes
+        headers[TIMEOUT_HEADER] = format_timeout(get_timeout(deadline))
+        return await wait_until(deadline, self._request, stub, rpc, request, headers, field_mask)
+
+    async def _request(self,
+                       stub: 'venom.rpc.Service',
+                       rpc: 'venom.rpc.stub.RPC',
+                       request: 'venom.message.Message',
+                       headers: Mapping[str, str],
+                       field_mask: FieldMask = None):
         if rpc.http_path_params():
             url = self._base_url + rpc.http_rule(stub).format(**request)
         else:
             url = self._base_url + rpc.http_rule(stub)
 
-        headers = None
-        if rpc.http_verb in (HTTPVerb.POST, HTTPVerb.PUT, HTTPVerb.PATCH):
-            headers = {'content-type': self._protocol_factory.mime}
-
         http_field_locations = rpc.http_field_locations()
 
-        # TODO cache this for each RPC call in HTTPClient.__init__()
         params = self._query_protocol_factory(rpc.request,
                                               http_field_locations[HTTPFieldLocation.QUERY]).encode(request)
+        if field_mask is not None:
+            params['fields'] = ','.join(field_mask.paths)
         body = self._protocol_factory(rpc.request,
                                       http_field_locations[HTTPFieldLocation.BODY]).pack(request)
 
@@ -113,7 +265,13 @@ class HTTPClient(BaseClient):
                                          data=body,
                                          params=params) as response:
             if 200 <= response.status < 400:
-                return self._protocol_factory(rpc.response).unpack(await response.read())
+                if field_mask is None:
+                    response_protocol = self._protocol_factory(rpc.response)
+                else:
+                    # fields that were not requested are exempt from validation
+                    response_protocol = self._protocol_factory(rpc.response, field_mask.paths)
+
+                return response_protocol.unpack(await response.read(), **self._unpack_options)
             else:
                 self._protocol_factory(ErrorResponse).unpack(await response.read()).raise_()
 
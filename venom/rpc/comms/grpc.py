@@ -5,7 +5,8 @@ from threading import Thread
 from typing import Type
 
 from venom.rpc.comms import BaseClient
-from venom.protocol import Protocol, JSON
+from venom.rpc.deadline import get_deadline, get_timeout
+from venom.protocol import Protocol, Protobuf
 
 try:
     from grpc.beta import implementations
@@ -18,12 +19,16 @@ except ImportError:
 
 def create_server(venom: 'venom.rpc.Venom',
                   *,
-                  protocol_factory: Type[Protocol] = JSON,
+                  protocol_factory: Type[Protocol] = Protobuf,
                   pool=None,
                   pool_size=None,
                   default_timeout=None,
                   maximum_timeout=None,
+                  trusted=False,
                   loop=None):
+    """
+    :param trusted: whether to skip validation of requests; only use this for traffic from trusted clients
+    """
     if loop is None:
         loop = asyncio.new_event_loop()
 
@@ -32,14 +37,18 @@ def create_server(venom: 'venom.rpc.Venom',
     method_implementations = {}
 
     def grpc_unary_unary(rpc, venom, service, request, context, *, loop):
-        instance = venom.get_instance(service)
-        future = asyncio.run_coroutine_threadsafe(rpc.invoke(instance, request), loop)
-        # TODO use context.timeout
+        future = asyncio.run_coroutine_threadsafe(venom.invoke(service, rpc, request,
+                                                               timeout=context.time_remaining()), loop)
+        # the method is cancelled when the call is aborted, e.g. because the client disconnected
+        context.add_abortion_callback(lambda *args: future.cancel())
         return future.result()
 
     for service, rpc in venom.iter_methods():
         grpc_name = (service.__meta__.name, rpc.name)
-        request_deserializers[grpc_name] = protocol_factory(rpc.request).unpack
+        if trusted:
+            request_deserializers[grpc_name] = partial(protocol_factory(rpc.request).unpack, trusted=True)
+        else:
+            request_deserializers[grpc_name] = protocol_factory(rpc.request).unpack
         response_serializers[grpc_name] = protocol_factory(rpc.response).pack
         method_implementations[grpc_name] = utilities.unary_unary_inline(partial(grpc_unary_unary,
                                                                                  rpc,
@@ -66,6 +75,9 @@ def create_server(venom: 'venom.rpc.Venom',
 
 class Client(BaseClient):
     def __init__(self, stub: Type['venom.rpc.Service'], host=None, port=50051, *, protocol_factory: Type[Protocol] = None):
+        if protocol_factory is None:
+            protocol_factory = Protobuf
+
         super().__init__(stub, protocol_factory=protocol_factory)
         channel = implementations.insecure_channel(host, port)
         self._group = stub.__meta__.name
@@ -89,19 +101,27 @@ class Client(BaseClient):
         return implementations.generic_stub(channel, stub_options)
 
     async def invoke(self,
+                     stub: 'venom.rpc.Service',
                      rpc: 'venom.stub.RPC',
                      request: 'venom.message.Message',
                      *,
                      context: 'venom.rpc.RequestContext' = None,
                      loop: asyncio.BaseEventLoop = None,
-                     timeout: int = None):
+                     timeout: float = None,
+                     field_mask: 'venom.common.FieldMask' = None):
+        """
+        :param context: the context of the caller; its deadline applies to the call
+        :param timeout: the number of seconds to wait for the response
+        :param field_mask: not supported by gRPC; the response always has all fields
+        """
         if loop is None:
             loop = asyncio.get_event_loop()
 
+        # the remaining time is sent to the server as the deadline of the call
         future = loop.run_in_executor(None, partial(self._grpc_stub.blocking_unary_unary,
                                                     self._group,
                                                     rpc.name,
                                                     request,
-                                                    timeout=timeout))
+                                                    timeout=get_timeout(get_deadline(timeout, context))))
 
         return await future
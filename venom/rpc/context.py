@@ -1,39 +1,160 @@
 import asyncio
-from typing import Optional, MutableMapping
+import sys
+import threading
+from functools import partial
+from typing import Optional, MutableMapping, Any, Tuple, Callable, Dict, Hashable, Union, Awaitable
 
 from venom.rpc.resolver import Resolver
 from weakref import WeakKeyDictionary
 
+# the contextvars backport for Python 3.6 is not integrated with asyncio, so its variables are shared by all tasks
+if sys.version_info >= (3, 7):
+    from contextvars import ContextVar, copy_context
+else:
+    ContextVar = copy_context = None
+
+
+def _current_task_or_thread() -> Union[asyncio.Task, threading.Thread]:
+    try:
+        current_task = asyncio.Task.current_task()
+    except RuntimeError:
+        # no event loop in this thread
+        current_task = None
+    return current_task if current_task is not None else threading.current_thread()
+
+
+class _TaskContextVar(object):
+    """
+    A stand-in for :class:`contextvars.ContextVar` on Python versions without it, keyed on the current task, or on
+    the current thread outside of a task. Unlike a context variable, the value is not inherited by tasks created
+    within the task.
+    """
+
+    def __init__(self, name: str, *, default: Any = None):
+        self.name = name
+        self._default = default
+        self._values: MutableMapping[Union[asyncio.Task, threading.Thread], Any] = WeakKeyDictionary()
+
+    def get(self) -> Any:
+        return self._values.get(_current_task_or_thread(), self._default)
+
+    def set(self, value: Any) -> Tuple[Union[asyncio.Task, threading.Thread], Any]:
+        current = _current_task_or_thread()
+        token = current, self._values.get(current, self._default)
+        self._values[current] = value
+        return token
+
+    def reset(self, token: Tuple[asyncio.Task, Any]) -> None:
+        task, previous = token
+        if previous is self._default:
+            del self._values[task]
+        else:
+            self._values[task] = previous
+
+
+if ContextVar is not None:
+    _current_context = ContextVar('venom.rpc.context', default=None)
+else:
+    _current_context = _TaskContextVar('venom.rpc.context', default=None)
+
+
+def bind_context(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    :return: a function that calls `func` with the request context that is current now, e.g. in another thread
+    """
+    if copy_context is not None:
+        return partial(copy_context().run, func)
+
+    context = _current_context.get()
+
+    def bound(*args, **kwargs):
+        token = _current_context.set(context)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_context.reset(token)
+
+    return bound
+
+
+async def _run_in_context(context: Optional['RequestContext'], awaitable: Awaitable[Any]) -> Any:
+    token = _current_context.set(context)
+    try:
+        return await awaitable
+    finally:
+        _current_context.reset(token)
+
+
+def create_task(coro: Awaitable[Any]) -> asyncio.Future:
+    """
+    Schedules `coro` in a new task in which the request context that is current now is current as well, including on
+    Python versions where tasks do not inherit context variables.
+    """
+    if copy_context is not None:
+        return asyncio.ensure_future(coro)
+    return asyncio.ensure_future(_run_in_context(_current_context.get(), coro))
+
 
 class RequestContext(object):
-    __contexts: MutableMapping[asyncio.Task, 'RequestContext'] = WeakKeyDictionary()
-    _context_task: asyncio.Task = None
+    """
+    The context of a request. A context is current from when it is entered until it is exited; contexts entered
+    within another context replace it until they exit.
+
+    The current context is kept in a context variable, so it is shared with the methods and stubs invoked while
+    handling the request, as well as with any tasks started from them (on Python 3.7 and later).
+    """
+    _token = None
+    _exit_callbacks = None
+    _resolved_values = None
+
+    # the fields of the response requested by the caller, or None if all fields are requested
+    field_mask: Optional['venom.common.FieldMask'] = None
+
+    # the time, on the clock of time.monotonic(), after which the caller no longer waits for the response
+    deadline: Optional[float] = None
 
     def __init__(self, venom: 'venom.rpc.Venom' = None):
         self.venom = venom
 
-    @classmethod
-    def current(cls) -> Optional['RequestContext']:
-        current_task = asyncio.Task.current_task()
-        if current_task is None:
-            return None
-        return cls.__contexts.get(current_task)
+    @staticmethod
+    def current() -> Optional['RequestContext']:
+        return _current_context.get()
 
     def __enter__(self) -> 'RequestContext':
-        current_task = asyncio.Task.current_task()
-
-        if current_task is None:
-            raise RuntimeError('Unable to create RequestContext: No current task')
-
-        if self._context_task is not None:
+        if self._token is not None:
             raise RuntimeError('Unable to re-enter RequestContext: This context has already been entered')
 
-        self._context_task = current_task
-        self.__contexts[current_task] = self
+        self._token = _current_context.set(self)
         return self
 
     def __exit__(self, *args) -> None:
-        del self.__contexts[self._context_task]
+        _current_context.reset(self._token)
+
+        if self._exit_callbacks is not None:
+            for callback in self._exit_callbacks:
+                callback()
+
+    def on_exit(self, callback: Callable[[], None]) -> None:
+        """
+        Registers a function to call when the context exits.
+        """
+        if self._exit_callbacks is None:
+            self._exit_callbacks = []
+        self._exit_callbacks.append(callback)
+
+    def resolved_values(self) -> Dict[Hashable, Any]:
+        """
+        :return: the values of the memoized resolvers resolved in this context, by the key of the resolver
+        """
+        if self._resolved_values is None:
+            self._resolved_values = {}
+        return self._resolved_values
+
+    def inherit_resolved_values(self, parent: 'RequestContext') -> None:
+        """
+        Shares the memoized resolver values of `parent`, the context of the request this context is handled for.
+        """
+        self._resolved_values = parent.resolved_values()
 
 
 class RequestContextResolver(Resolver):
@@ -47,9 +168,9 @@ class RequestContextResolver(Resolver):
 
 class RequestContextDescriptor(object):
     def __get__(self, instance, owner) -> Optional['RequestContext']:
-        return RequestContext.current()
+        return _current_context.get()
 
 
 class DictRequestContext(RequestContext, dict):
     def __hash__(self):
-        return hash(self._context_task)
+        return id(self)
@@ -0,0 +1,91 @@
+"""
+Deadlines of requests, as points in time on the clock of :func:`time.monotonic`. Requests made within a request
+context inherit its deadline.
+"""
+import asyncio
+import math
+import time
+from typing import Optional, Callable, Awaitable, TypeVar
+
+from venom.exceptions import DeadlineExceeded
+
+#: the HTTP header holding the number of seconds the caller is willing to wait for a response
+TIMEOUT_HEADER = 'X-Request-Timeout'
+
+T = TypeVar('T')
+
+# Task.current_task() is deprecated since Python 3.7
+_current_task = getattr(asyncio, 'current_task', None) or asyncio.Task.current_task
+
+
+def get_deadline(timeout: float = None, context: 'venom.rpc.RequestContext' = None) -> Optional[float]:
+    """
+    :param timeout: the number of seconds from now; ``None`` or an infinite timeout means no timeout
+    :param context: a request context whose deadline applies as well
+    :return: the earlier of the deadline of `timeout` and the deadline of `context`, or ``None`` if neither is set
+    """
+    deadline = None
+    if timeout is not None and math.isfinite(timeout):
+        deadline = time.monotonic() + timeout
+
+    inherited = context.deadline if context is not None else None
+    if inherited is not None and (deadline is None or inherited < deadline):
+        return inherited
+    return deadline
+
+
+def get_timeout(deadline: Optional[float]) -> Optional[float]:
+    """
+    :return: the number of seconds until `deadline`, or ``None`` if there is no deadline
+    :raises DeadlineExceeded: if the deadline has passed
+    """
+    if deadline is None:
+        return None
+    timeout = deadline - time.monotonic()
+    if timeout <= 0:
+        raise DeadlineExceeded()
+    return timeout
+
+
+def parse_timeout(value: str) -> float:
+    """
+    :return: the timeout from the value of a :data:`TIMEOUT_HEADER` header, in seconds
+    :raises ValueError: if the value is not a number of seconds
+    """
+    timeout = float(value)
+    if not timeout >= 0:
+        raise ValueError('{!r} is not a valid timeout'.format(value))
+    return timeout
+
+
+def format_timeout(timeout: float) -> str:
+    return '{:.3f}'.format(timeout)
+
+
+async def wait_until(deadline: Optional[float], func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+    """
+    Awaits ``func(*args, **kwargs)`` in the current task, cancelling it if `deadline` passes first.
+
+    :raises DeadlineExceeded: if the deadline passes before `func` completes, or has already passed
+    """
+    timeout = get_timeout(deadline)
+    if timeout is None:
+        return await func(*args, **kwargs)
+
+    task = _current_task()
+    expired = False
+
+    def expire():
+        nonlocal expired
+        expired = True
+        task.cancel()
+
+    handle = asyncio.get_event_loop().call_later(timeout, expire)
+    try:
+        return await func(*args, **kwargs)
+    except asyncio.CancelledError:
+        if expired:
+            raise DeadlineExceeded()
+        raise
+    finally:
+        handle.cancel()
@@ -0,0 +1,147 @@
+"""
+Thread pools for blocking synchronous methods, which are otherwise called on the event loop::
+
+    class PetService(Service):
+        class Meta:
+            executor = 'thread'
+
+        @rpc
+        def get_pet(self, id: int) -> Pet:
+            return legacy_db.load_pet(id)
+
+        @rpc(executor=ThreadPool('reports', max_workers=2, max_queue=10))
+        def pet_report(self) -> Report:
+            ...
+
+``executor='thread'`` uses the shared pool returned by :func:`get_thread_pool`.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Dict, Union, Optional, Awaitable
+
+from venom.exceptions import ServiceUnavailable
+from venom.rpc.context import bind_context
+
+
+class ThreadPool(object):
+    """
+    A bounded pool of named threads, created when it is first used.
+
+    :param name: the prefix of the names of the threads
+    :param max_workers: the number of threads; defaults to the number of CPUs plus 4, at most 32
+    :param max_queue: the maximum number of calls waiting for a thread; further calls are rejected with
+                      :class:`ServiceUnavailable`. By default, calls wait for as long as it takes.
+    """
+
+    def __init__(self, name: str = 'venom', *, max_workers: int = None, max_queue: int = None):
+        self.name = name
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.max_queue = max_queue
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    @property
+    def saturation(self) -> float:
+        """
+        :return: the share of threads that are busy; calls are queued once this is 1
+        """
+        return self.active / self.max_workers
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'max_workers': self.max_workers,
+            'active': self.active,
+            'queued': self.queued,
+            'completed': self.completed,
+            'saturation': self.saturation
+        }
+
+    def _call(self, func: Callable[..., Any], args, kwargs) -> Any:
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def _done(self, future: Future) -> None:
+        if future.cancelled():
+            # cancelled before a thread picked it up
+            with self._lock:
+                self.queued -= 1
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Calls `func` in a thread of the pool, with the current request context.
+        """
+        with self._lock:
+            # calls that have been submitted but not started yet are only waiting if no thread is idle
+            if self.max_queue is not None and self.active + self.queued - self.max_workers >= self.max_queue:
+                raise ServiceUnavailable("Thread pool '{}' is saturated".format(self.name))
+            self.queued += 1
+        future = self.executor.submit(bind_context(self._call), func, args, kwargs)
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait)
+            self._executor = None
+
+    def __repr__(self):
+        return '<ThreadPool {} active={} queued={}>'.format(self.name, self.active, self.queued)
+
+
+_thread_pool: ThreadPool = None
+
+
+def get_thread_pool() -> ThreadPool:
+    """
+    :return: the pool used by methods with ``executor='thread'``
+    """
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPool()
+    return _thread_pool
+
+
+def set_thread_pool(pool: ThreadPool) -> None:
+    global _thread_pool
+    _thread_pool = pool
+
+
+def run_in_thread(func: Callable[..., Any], *args, **kwargs) -> Awaitable[Any]:
+    """
+    Calls `func` in the pool returned by :func:`get_thread_pool`.
+    """
+    return get_thread_pool().run(func, *args, **kwargs)
+
+
+def resolve_executor(executor: Union[str, ThreadPool, None]) -> Optional[Callable[..., Awaitable[Any]]]:
+    """
+    :param executor: the ``executor`` option of a method or service: ``'thread'``, a :class:`ThreadPool`, or ``None``
+                     to call methods on the event loop
+    :return: a function that runs a function with arguments and can be awaited for the result, or ``None``
+    """
+    if executor is None:
+        return None
+    if isinstance(executor, ThreadPool):
+        return executor.run
+    if executor == 'thread':
+        return run_in_thread
+    raise ValueError("Unknown executor: {!r}".format(executor))
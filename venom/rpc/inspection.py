@@ -1,16 +1,16 @@
 import asyncio
 from functools import wraps
 from inspect import signature, Parameter
-from typing import Callable, Any, Sequence, get_type_hints, Type, NamedTuple, Optional, List, Dict
+from typing import Callable, Any, Sequence, get_type_hints, Type, NamedTuple, Optional, List, Dict, Awaitable
 from typing import Tuple
 from typing import Union
-from venom.fields import RepeatField, MapField, Field, ConverterField, Repeat
+from venom.fields import RepeatField, MapField, Field, ConverterField, Repeat, LazyValue
 
 from venom.converter import Converter
 
-from venom.message import Empty, Message, message_factory, fields, field_names
-from venom.rpc.resolver import Resolver
-from venom.util import upper_camelcase
+from venom.message import Empty, Message, message_factory, field_names
+from venom.rpc.resolver import Resolver, ResolverGraph
+from venom.util import upper_camelcase, compile_function, reference, NOT_SET
 
 MessageFunction = NamedTuple('MessageFunction', [
     ('request', Type[Message]),
@@ -53,14 +53,18 @@ def magic_normalize(func: Callable[..., Any],
                     response: Type[Message] = None,
                     converters: Sequence[Union[Converter, Type[Converter]]] = (),
                     additional_args: Sequence[Union[Resolver, Type[Resolver]]] = (),
-                    auto_generate_request: bool = False) -> MessageFunction:
+                    auto_generate_request: bool = False,
+                    executor: Callable[..., Awaitable[Any]] = None) -> MessageFunction:
     """
 
     :param func:
     :param request:
     :param response:
     :param converters:
-    :param additional_args: additional arguments that are resolved during invocation.
+    :param additional_args: additional arguments that are resolved during invocation, together with the resolvers
+        they depend on.
+    :param executor: runs a synchronous `func` and its arguments, e.g. in a thread, instead of calling it on the event
+        loop; see :func:`venom.rpc.executor.resolve_executor`
     :return:
     """
     if func_name is None:
@@ -68,7 +72,7 @@ def magic_normalize(func: Callable[..., Any],
 
     # TODO parameters supplied by the service implementation through a context; session etc.
 
-    additional_args = [resolver() if isinstance(resolver, type) else resolver for resolver in additional_args]
+    additional_args = ResolverGraph(additional_args)
     converters = [converter() if isinstance(converter, type) else converter for converter in converters]
 
     func_signature = signature(func)
@@ -79,7 +83,7 @@ def magic_normalize(func: Callable[..., Any],
         raise RuntimeError("At least one argument expected in {}".format(func))
 
     request_converter = None
-    func_parameters = tuple(func_signature.parameters.items())[1 + len(additional_args):]
+    func_parameters = tuple(func_signature.parameters.items())[1 + len(additional_args.resolvers):]
 
     if len(func_parameters):
         name, param = func_parameters[0]
@@ -210,45 +214,95 @@ def magic_normalize(func: Callable[..., Any],
             raise RuntimeError("Unable to coerce return value to wire format: "
                                "'{}' in {}".format(return_type, func))
 
-    wrap_args = lambda req: (req,)
-    wrap_kwargs = lambda req: {}
+    invokable = _compile_invokable(func,
+                                   request,
+                                   request_converter,
+                                   unpack_request,
+                                   func_parameters,
+                                   response_converter,
+                                   response == Empty and return_type != Empty,
+                                   additional_args,
+                                   executor)
+    return MessageFunction(request, response, wraps(func)(invokable))
 
-    if unpack_request is True:
-        wrap_args = lambda req: ()
-        wrap_kwargs = lambda req: req
-    elif unpack_request is False:
-        if request_converter:
-            wrap_args = lambda req: (request_converter.convert(req),)
-    elif unpack_request == ():
-        wrap_args = lambda req: ()
-    else:
-        wrap_args = lambda req: ()
-        wrap_kwargs = lambda req: {f: req.get(f, d) for f, d in unpack_request}
 
-    if response == Empty and return_type != Empty:
-        wrap_response = lambda res: Empty()
+def _compile_invokable(func: Callable[..., Any],
+                       request: Type[Message],
+                       request_converter: Optional[Converter],
+                       unpack_request: Union[bool, Tuple[Tuple[str, Any], ...]],
+                       func_parameters: Sequence[Tuple[str, Parameter]],
+                       response_converter: Optional[Converter],
+                       empty_response: bool,
+                       additional_args: ResolverGraph,
+                       executor: Callable[..., Awaitable[Any]] = None) -> Callable[..., Awaitable[Message]]:
+    """
+    Generates an ``invokable(inst, req, loop=None)`` specialized for the signature of `func`: arguments are fetched
+    from the request directly, a single resolver without dependencies or memoization is awaited on its own and
+    synchronous functions are called without an intermediate coroutine.
+
+    :param unpack_request: ``False`` to pass the request (or its converted value) as the argument, ``True`` to pass
+        every field of the request as a keyword argument, or the names and defaults of the fields to pass
+    :param empty_response: whether to discard the return value and respond with :class:`Empty`
+    :param executor: runs synchronous functions in place of calling them directly
+    """
+    namespace = {
+        'func': func,
+        'NOT_SET': NOT_SET,
+        'LazyValue': LazyValue,
+        'Empty': Empty
+    }
+    lines = ['async def invokable(inst, req, loop=None):']
+    args = ['inst']
+
+    resolvers = additional_args.resolvers
+    if len(resolvers) == 1 and not resolvers[0].dependencies and not resolvers[0].memoize:
+        lines.append('    arg_0 = await {}.resolve(inst, req)'.format(reference(namespace, resolvers[0], 'resolver')))
+        args.append('arg_0')
+    elif resolvers:
+        names = ['arg_{}'.format(i) for i in range(len(resolvers))]
+        lines.append('    {}, = await {}.resolve(inst, req, loop)'.format(
+            ', '.join(names), reference(namespace, additional_args, 'resolvers')))
+        args += names
+
+    if unpack_request is False:
+        if request_converter:
+            args.append('{}.convert(req)'.format(reference(namespace, request_converter, 'converter')))
+        else:
+            args.append('req')
+    elif unpack_request:
+        if unpack_request is True:
+            # fields that are not set are left to the defaults of the function
+            defaults = dict((name, param.default) for name, param in func_parameters
+                            if param.default is not Parameter.empty)
+            unpack_request = tuple((name, defaults.get(name, None)) for name in request.__fields__)
+
+        for i, (name, default) in enumerate(unpack_request):
+            field = request.__fields__[name]
+            value = 'value_{}'.format(i)
+            if default is None:
+                missing = '{}()'.format(reference(namespace, field.default, 'default'))
+            else:
+                missing = reference(namespace, default, 'default')
+            lines += [
+                '    {} = req.{}'.format(value, request.__slot_names__[name]),
+                '    if {} is NOT_SET:'.format(value),
+                '        {} = {}'.format(value, missing),
+                '    elif type({}) is LazyValue:'.format(value),
+                '        {} = req[{!r}]'.format(value, name)
+            ]
+            args.append('{}={}'.format(name, value))
+
+    call = 'func({})'.format(', '.join(args))
+    if asyncio.iscoroutinefunction(func):
+        call = 'await ' + call
+    elif executor is not None:
+        call = 'await {}({})'.format(reference(namespace, executor, 'executor'), ', '.join(['func'] + args))
+
+    if empty_response:
+        lines += ['    {}'.format(call),
+                  '    return Empty()']
     elif response_converter:
-        wrap_response = lambda res: response_converter.format(res)
-    else:
-        wrap_response = lambda res: res
-
-    if not asyncio.iscoroutinefunction(func):
-        func_ = func
-
-        @wraps(func)
-        async def func(*args, **kwargs):
-            return func_(*args, **kwargs)
-
-    # TODO (optimization) do not wrap what does not need to be wrapped
-    if additional_args:
-        async def invokable(inst, req: Message, loop: 'asyncio.BaseEventLoop' = None) -> Message:
-            return wrap_response(await func(inst,
-                                            *(await asyncio.gather(*[arg.resolve(inst, req)
-                                                                     for arg in additional_args], loop=loop)),
-                                            *wrap_args(req),
-                                            **wrap_kwargs(req)))
+        lines.append('    return {}.format({})'.format(reference(namespace, response_converter, 'converter'), call))
     else:
-        async def invokable(inst, req: Message, loop: 'asyncio.BaseEventLoop' = None) -> Message:
-            return wrap_response(await func(inst, *wrap_args(req), **wrap_kwargs(req)))
-
-    return MessageFunction(request, response, wraps(func)(invokable))
+        lines.append('    return {}'.format(call))
+    return compile_function('invokable', lines, namespace)
@@ -0,0 +1,78 @@
+from typing import Type, Callable, Awaitable, Iterable
+
+from venom.message import Message
+
+Handler = Callable[['venom.rpc.service.Service', Message], Awaitable[Message]]
+
+
+class Interceptor(object):
+    """
+    Wraps the invocation of service methods, e.g. for authentication, metrics or caching. Interceptors are
+    registered with :class:`venom.rpc.Venom`, in the ``interceptors`` option of a service's ``Meta`` or in the
+    ``interceptors`` option of a method::
+
+        class AuthInterceptor(Interceptor):
+            def applies_to(self, service, method):
+                return method.options.get('auth', True)
+
+            async def intercept(self, instance, method, request, handler):
+                if 'user' not in instance.context:
+                    raise Unauthorized()
+                return await handler(instance, request)
+
+    The interceptors of a method are compiled into a single chain of handlers the first time it is invoked, so an
+    interceptor that does not apply to a method adds no cost to its invocation.
+    """
+
+    def applies_to(self, service: Type['venom.rpc.service.Service'], method: 'venom.rpc.method.Method') -> bool:
+        return True
+
+    async def intercept(self,
+                        instance: 'venom.rpc.service.Service',
+                        method: 'venom.rpc.method.Method',
+                        request: Message,
+                        handler: Handler) -> Message:
+        """
+        :param handler: invokes the next interceptor, or the method itself
+        """
+        return await handler(instance, request)
+
+    def wrap(self,
+             service: Type['venom.rpc.service.Service'],
+             method: 'venom.rpc.method.Method',
+             handler: Handler) -> Handler:
+        """
+        :return: a handler that intercepts calls to `handler`; a subclass may override this to compile a more
+                 specific handler
+        """
+        if not self.applies_to(service, method):
+            return handler
+
+        intercept = self.intercept
+
+        async def intercepted(instance: 'venom.rpc.service.Service', request: Message) -> Message:
+            return await intercept(instance, method, request, handler)
+
+        return intercepted
+
+
+def compile_handler(service: Type['venom.rpc.service.Service'],
+                    method: 'venom.rpc.method.Method',
+                    interceptors: Iterable[Interceptor] = (),
+                    innermost: Iterable[Interceptor] = ()) -> Handler:
+    """
+    Builds the chain of handlers for a method, with the interceptors of the :class:`venom.rpc.Venom` instance first,
+    followed by those of the service and those of the method.
+
+    :param interceptors: the interceptors registered with the :class:`venom.rpc.Venom` instance
+    :param innermost: interceptors that follow all others, such as the response cache of the method
+    """
+    interceptors = [*interceptors,
+                    *service.__meta__.get('interceptors', ()),
+                    *method.options.get('interceptors', ()),
+                    *innermost]
+
+    handler = method.invoke
+    for interceptor in reversed(interceptors):
+        handler = interceptor.wrap(service, method, handler)
+    return handler
@@ -0,0 +1,126 @@
+"""
+Limits on the number of concurrent invocations of a method or of all methods of a service::
+
+    class PetService(Service):
+        class Meta:
+            concurrency = ConcurrencyLimit(100, queue_size=500, timeout=1)
+
+        @rpc(concurrency=ConcurrencyLimit(4, queue_size=10))
+        async def export_pets(self) -> PetList:
+            ...
+
+Calls beyond the limit are queued, or rejected with :class:`venom.exceptions.ServiceUnavailable`.
+"""
+import asyncio
+from collections import deque
+from typing import Union, Optional
+
+from venom.exceptions import ServiceUnavailable, DeadlineExceeded
+from venom.message import Message
+from venom.rpc.cache import Invoke
+from venom.rpc.deadline import get_timeout
+
+
+class ConcurrencyLimit(object):
+    """
+    :param limit: the maximum number of calls in flight
+    :param queue_size: the maximum number of calls waiting for another call to complete; calls are rejected
+                       immediately when this is 0
+    :param timeout: the number of seconds a call waits in the queue before it is rejected, or ``None`` to wait
+                    indefinitely
+    """
+
+    def __init__(self, limit: int, *, queue_size: int = 0, timeout: float = None):
+        if limit < 1:
+            raise ValueError('The concurrency limit must be at least 1')
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+
+    @classmethod
+    def of(cls, value: Union['ConcurrencyLimit', int, None]) -> Optional['ConcurrencyLimit']:
+        """
+        :return: the limit `value`, where an integer is a limit without a queue
+        """
+        if value is None or isinstance(value, ConcurrencyLimit):
+            return value
+        return cls(value)
+
+    def __repr__(self):
+        return 'ConcurrencyLimit({!r}, queue_size={!r}, timeout={!r})'.format(self.limit,
+                                                                              self.queue_size,
+                                                                              self.timeout)
+
+
+class Limiter(object):
+    """
+    Enforces a :class:`ConcurrencyLimit`; queued calls are admitted in order.
+    """
+
+    def __init__(self, limit: ConcurrencyLimit):
+        self.limit = limit
+        self.active = 0
+        self._waiters = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, deadline: float = None) -> None:
+        """
+        :param deadline: the deadline of the call; the call is dropped if it passes while the call is queued
+        """
+        if self.active < self.limit.limit and not self._waiters:
+            self.active += 1
+            return
+
+        if len(self._waiters) >= self.limit.queue_size:
+            raise ServiceUnavailable('Too many concurrent requests')
+
+        timeout = self.limit.timeout
+        remaining = get_timeout(deadline)
+        expires = remaining is not None and (timeout is None or remaining < timeout)
+        if expires:
+            timeout = remaining
+
+        waiter = asyncio.Future()
+        self._waiters.append(waiter)
+        try:
+            if timeout is None:
+                await waiter
+            else:
+                await asyncio.wait_for(waiter, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as the call gave up
+                self.release()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            if expires:
+                raise DeadlineExceeded()
+            raise ServiceUnavailable('Timed out waiting for a concurrent request to complete')
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    async def __call__(self,
+                       invoke: Invoke,
+                       service: 'venom.rpc.service.Service',
+                       method: 'venom.rpc.method.Method',
+                       request: Message,
+                       field_mask: 'venom.common.FieldMask' = None,
+                       deadline: float = None) -> Message:
+        await self.acquire(deadline)
+        try:
+            return await invoke(service, method, request, field_mask, deadline)
+        finally:
+            self.release()
@@ -2,16 +2,16 @@ import asyncio
 import enum
 import re
 import warnings
-from functools import partial
 from types import MethodType
-from typing import Callable, Any, Type, Union, Set, Dict, Sequence, Tuple, Mapping, Optional, Awaitable, NamedTuple
+from typing import Callable, Any, Type, Union, Set, Dict, Sequence, Tuple, Awaitable
 
 from venom.converter import Converter
 from venom.exceptions import NotImplemented_
 from venom.message import Message, Empty, field_names
 from venom.rpc.inspection import magic_normalize
+from venom.rpc.executor import resolve_executor
 from venom.rpc.resolver import Resolver
-from venom.util import AttributeDict, MetaDict
+from venom.util import AttributeDict
 
 _RULE_PARAMETER_RE = re.compile('\{([^}:]+)(:[^}]*)?\}')
 
@@ -172,7 +172,9 @@ class ServiceMethod(Method):
                                    response=self.response,
                                    additional_args=args,
                                    converters=tuple(converters) + tuple(manager.meta.converters),
-                                   auto_generate_request=self.options.get('auto', False))
+                                   auto_generate_request=self.options.get('auto', False),
+                                   executor=resolve_executor(self.options.get('executor',
+                                                                              manager.meta.get('executor'))))
 
         return ServiceMethod(self._fn,
                              request=magic_fn.request,
@@ -6,7 +6,10 @@ from venom.rpc.service import Service
 S = TypeVar('S', bound=Service)
 
 class ServiceProxy(Generic[S]):
-    # TODO define life-time. can be global or request or session.
+    """
+    Refers to another service from within a service. The instance returned depends on the :class:`Lifetime` of the
+    service referred to.
+    """
     def __init__(self, reference: Union[str, Type[S]]) -> None:
         self.reference = reference
 
@@ -1,19 +1,200 @@
+import asyncio
 from abc import abstractmethod, ABCMeta
-from typing import TypeVar, Generic, Type
+from typing import TypeVar, Generic, Type, Tuple, Union, Sequence, List, Dict, Any, Hashable, Callable, Awaitable
 
 T = TypeVar('T')
 
 
 class Resolver(Generic[T], metaclass=ABCMeta):
+    """
+    Resolves an additional argument of a service method. A resolver may depend on other resolvers, whose values are
+    passed to :meth:`resolve` in the order of :attr:`dependencies`::
+
+        class TenantResolver(Resolver):
+            dependencies = (UserResolver,)
+
+            async def resolve(self, service, request, user):
+                return await load_tenant(user.tenant_id)
+
+    A resolver that sets :attr:`memoize` to ``True`` is resolved once per request: its value is memoized under its
+    :attr:`key` in the request context and shared with the methods invoked while handling the request. Only
+    resolvers whose value does not depend on the request message should be memoized.
+    """
     python: Type[T] = None
 
+    #: resolvers whose values are passed to :meth:`resolve`
+    dependencies: Tuple[Union['Resolver', Type['Resolver']], ...] = ()
+
+    #: whether the value is memoized in the request context
+    memoize: bool = False
+
+    @property
+    def key(self) -> Hashable:
+        return type(self)
+
     async def __call__(self,
                        service: 'venom.rpc.service.Service',
-                       request: 'venom.message.Message') -> T:
-        return await self.resolve(service, request)
+                       request: 'venom.message.Message',
+                       *dependencies: Any) -> T:
+        return await self.resolve(service, request, *dependencies)
 
     @abstractmethod
     async def resolve(self,
                       service: 'venom.rpc.service.Service',
-                      request: 'venom.message.Message') -> T:
+                      request: 'venom.message.Message',
+                      *dependencies: Any) -> T:
         pass
+
+
+def _instance(resolver: Union[Resolver, Type[Resolver]]) -> Resolver:
+    return resolver() if isinstance(resolver, type) else resolver
+
+
+class ResolverGraph(object):
+    """
+    The resolvers of a method together with their dependencies. Resolvers that do not depend on each other are
+    resolved concurrently; when one fails, the resolvers still running are cancelled.
+
+    :raises RuntimeError: if the dependencies of the resolvers contain a cycle
+    """
+
+    def __init__(self, resolvers: Sequence[Union[Resolver, Type[Resolver]]]):
+        self.resolvers: List[Resolver] = [_instance(resolver) for resolver in resolvers]
+        self._dependencies: Dict[Hashable, Tuple[Resolver, ...]] = {}
+
+        visiting = []
+        for resolver in self.resolvers:
+            self._add(resolver, visiting)
+
+    def _add(self, resolver: Resolver, visiting: List[Hashable]) -> None:
+        key = resolver.key
+        if key in self._dependencies:
+            return
+        if key in visiting:
+            cycle = visiting[visiting.index(key):] + [key]
+            raise RuntimeError('Circular resolver dependency: {}'.format(
+                ' -> '.join(getattr(key, '__name__', repr(key)) for key in cycle)))
+
+        visiting.append(key)
+        dependencies = tuple(_instance(dependency) for dependency in resolver.dependencies)
+        for dependency in dependencies:
+            self._add(dependency, visiting)
+        visiting.pop()
+        self._dependencies[key] = dependencies
+
+    async def _resolve(self,
+                       resolver: Resolver,
+                       dependencies: List[asyncio.Future],
+                       service: 'venom.rpc.service.Service',
+                       request: 'venom.message.Message') -> Any:
+        if dependencies:
+            # dependencies may be shared with other invocations, and are not cancelled with this resolver
+            values = [await asyncio.shield(dependency) for dependency in dependencies]
+            return await resolver.resolve(service, request, *values)
+        return await resolver.resolve(service, request)
+
+    def _future(self,
+                resolver: Resolver,
+                service: 'venom.rpc.service.Service',
+                request: 'venom.message.Message',
+                resolved: Dict[Hashable, asyncio.Future],
+                memo: Dict[Hashable, '_MemoizedValue'],
+                started: List[asyncio.Future],
+                used: List[Tuple[Hashable, '_MemoizedValue']],
+                create_task: Callable[[Awaitable[Any]], asyncio.Future]) -> asyncio.Future:
+        key = resolver.key
+        future = resolved.get(key)
+        if future is None and resolver.memoize:
+            memoized = memo.get(key)
+            if memoized is not None:
+                memoized.users += 1
+                used.append((key, memoized))
+                future = memoized.future
+        if future is None:
+            dependencies = [self._future(dependency, service, request, resolved, memo, started, used, create_task)
+                            for dependency in self._dependencies[key]]
+            future = create_task(self._resolve(resolver, dependencies, service, request))
+            started.append(future)
+            if resolver.memoize:
+                memoized = memo[key] = _MemoizedValue(future)
+                used.append((key, memoized))
+        resolved[key] = future
+        return future
+
+    async def resolve(self,
+                      service: 'venom.rpc.service.Service',
+                      request: 'venom.message.Message',
+                      loop: 'asyncio.AbstractEventLoop' = None) -> List[Any]:
+        """
+        :param loop: not used
+        :return: the values of :attr:`resolvers`, in order
+        """
+        if len(self.resolvers) == 1:
+            resolver = self.resolvers[0]
+            if not resolver.memoize and not self._dependencies[resolver.key]:
+                return [await resolver.resolve(service, request)]
+
+        # imported here since venom.rpc.context depends on this module
+        from venom.rpc.context import create_task
+
+        context = getattr(service, 'context', None)
+        memo = context.resolved_values() if context is not None else {}
+        started, used = [], []
+
+        resolved = {}
+        futures = [self._future(resolver, service, request, resolved, memo, started, used, create_task)
+                   for resolver in self.resolvers]
+
+        try:
+            try:
+                done, _ = await asyncio.wait(set(started) | set(futures), return_when=asyncio.FIRST_EXCEPTION)
+            except asyncio.CancelledError:
+                self._discard(started, used, memo)
+                raise
+
+            failed = [future for future in done if future.cancelled() or future.exception() is not None]
+            if failed:
+                self._discard(started, used, memo)
+                errors = [future.exception() for future in failed if not future.cancelled()]
+                raise errors[0] if errors else asyncio.CancelledError()
+        finally:
+            for _, memoized in used:
+                memoized.users -= 1
+
+        return [future.result() for future in futures]
+
+    @staticmethod
+    def _discard(started: List[asyncio.Future],
+                 used: List[Tuple[Hashable, '_MemoizedValue']],
+                 memo: Dict[Hashable, '_MemoizedValue']) -> None:
+        """
+        Cancels the resolvers still running after an invocation failed, unless another invocation awaits them as
+        well; values that were not resolved are removed from `memo`.
+        """
+        memoized_futures = set(memoized.future for _, memoized in used)
+        for future in started:
+            if future not in memoized_futures and not future.done():
+                future.cancel()
+
+        for key, memoized in used:
+            future = memoized.future
+            if future.done():
+                if not future.cancelled() and future.exception() is None:
+                    continue
+            elif memoized.users > 1:
+                continue
+            else:
+                future.cancel()
+            if memo.get(key) is memoized:
+                del memo[key]
+
+
+class _MemoizedValue(object):
+    """
+    A value resolved for a request, with the number of invocations awaiting it.
+    """
+    __slots__ = ('future', 'users')
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.users = 1
@@ -1,3 +1,4 @@
+import enum
 from typing import Dict, Any, MutableMapping
 
 from venom.common import IntegerValueConverter, BooleanValueConverter, DateTimeConverter, DateConverter
@@ -7,6 +8,19 @@ from venom.rpc.method import Method
 from venom.util import meta, MetaDict
 
 
+class Lifetime(enum.Enum):
+    """
+    How long an instance of a service is used for, set with the ``lifetime`` option of the service's ``Meta``.
+    """
+    #: one instance is shared by all requests
+    SINGLETON = 'singleton'
+    #: every request context gets a new instance
+    REQUEST = 'request'
+    #: instances are reused by later request contexts once a context exits; at most ``Meta.pool_size`` idle
+    #: instances are kept
+    POOLED = 'pooled'
+
+
 class ServiceManager(object):
     def __init__(self, meta: MetaDict, meta_changes: MetaDict):
         self.meta = meta
@@ -27,6 +41,8 @@ class ServiceManager(object):
 
         if not meta_changes.get('http_rule', None):
             meta.http_rule = '/' + meta.name.lower().replace('_', '-')
+
+        meta.lifetime = Lifetime(meta.lifetime)
         return meta
 
     def prepare_members(self, members: MutableMapping[str, Any]) -> MutableMapping[str, Any]:
@@ -93,3 +109,8 @@ class Service(object, metaclass=ServiceMeta):
             DateConverter)
         stub = None
         http_rule = None
+        interceptors = ()
+        lifetime = Lifetime.REQUEST
+        pool_size = 16
+        concurrency = None
+        executor = None
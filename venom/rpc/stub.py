@@ -13,9 +13,16 @@ class Stub(Service):
         super().__init__(venom)
         self._client = client
 
-    async def invoke_(self, rpc, request, loop: 'asyncio.BaseEventLoop' = None):
+    async def invoke_(self,
+                      rpc,
+                      request,
+                      loop: 'asyncio.BaseEventLoop' = None,
+                      field_mask: 'venom.common.FieldMask' = None):
         if self._client:
-            return await self._client.invoke(self, rpc, request, loop=loop, context=self.context)
+            return await self._client.invoke(self, rpc, request,
+                                             loop=loop,
+                                             context=self.context,
+                                             field_mask=field_mask)
         raise NotImplementedError
 
 
@@ -34,9 +41,13 @@ class RPC(Method):
     async def _invoke(self,
                       service: 'venom.rpc.service.Service',
                       request: 'venom.Message',
-                      loop: 'asyncio.BaseEventLoop' = None) -> 'venom.Message':
+                      loop: 'asyncio.BaseEventLoop' = None,
+                      field_mask: 'venom.common.FieldMask' = None) -> 'venom.Message':
+        """
+        :param field_mask: the fields of the response the caller is interested in, if supported by the client
+        """
         if isinstance(service, Stub):
-            return await service.invoke_(self, request, loop=loop)
+            return await service.invoke_(self, request, loop=loop, field_mask=field_mask)
         raise NotImplementedError
 
     async def invoke(self,
@@ -1,4 +1,4 @@
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Iterable, Callable, List
 
 
 # FIXME should be Generic
@@ -33,6 +33,46 @@ def meta(bases, members, meta_name='Meta') -> Tuple[MetaDict, MetaDict]:
     return meta_, AttributeDict(changes)
 
 
+class _NotSet(object):
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'NOT_SET'
+
+    def __reduce__(self):
+        return 'NOT_SET'
+
+
+NOT_SET = _NotSet()
+
+
+def compile_function(name: str, lines: Iterable[str], namespace: Dict[str, Any] = None) -> Callable:
+    """
+    Compiles the source of a single function definition named `name` and returns the function. `namespace` is used
+    as the globals of the function.
+    """
+    if namespace is None:
+        namespace = {}
+    exec('\n'.join(lines), namespace)
+    return namespace[name]
+
+
+def reference(namespace: Dict[str, Any], obj: Any, prefix: str) -> str:
+    """
+    Adds `obj` to the `namespace` of a function to be compiled and returns a unique name to refer to it by.
+    """
+    name = '{}_{}'.format(prefix, len(namespace))
+    namespace[name] = obj
+    return name
+
+
+def indent(lines: Iterable[str], level: int = 1) -> List[str]:
+    return ['    ' * level + line for line in lines]
+
+
 def upper_camelcase(s: str) -> str:
     return s.title().replace('_', '')
 
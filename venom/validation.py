@@ -0,0 +1,201 @@
+"""
+Declarative constraints on message fields. Constraints are given as field options::
+
+    class Pet(Message):
+        name = String(required=True, min_length=1, max_length=64, pattern=r'^[A-Z]')
+        age = Int32(min=0)
+        sound = String(choices=['hiss', 'meow'])
+        toys = Repeat(String(max_length=32), max_length=10)
+
+The protocols compile the constraints into their decoders, so that messages are validated as they are decoded.
+:func:`validate` checks a message that has been constructed in Python.
+"""
+import re
+from typing import Any, Dict, List, Type, Callable, Iterable, Optional
+
+from venom.exceptions import ValidationError
+from venom.fields import FieldDescriptor, RepeatField, MapField, LazyValue, Field
+from venom.message import Message, fields
+from venom.util import compile_function, reference, indent, NOT_SET
+
+CONSTRAINTS = ('min', 'max', 'min_length', 'max_length', 'pattern', 'choices')
+
+REQUIRED_MESSAGE = 'This field is required'
+
+
+def is_required(field: FieldDescriptor) -> bool:
+    options = getattr(field, 'options', None)
+    return bool(options and options.get('required', False))
+
+
+def required_source(field: FieldDescriptor, errors: str) -> str:
+    """
+    :return: a statement that adds an error for the missing required field `field` to the list or ``None``
+             `errors`
+    """
+    return "{0} = ({0} or []) + [ValidationError({1!r}, [{2!r}])]".format(errors, REQUIRED_MESSAGE, field.name)
+
+
+def has_constraints(field: FieldDescriptor) -> bool:
+    """
+    :return: whether values of `field`, or its items, are subject to constraints
+    """
+    options = getattr(field, 'options', None)
+    if options and any(name in options for name in CONSTRAINTS):
+        return True
+    if isinstance(field, RepeatField):
+        return has_constraints(field.items)
+    if isinstance(field, MapField):
+        return has_constraints(field.values)
+    return False
+
+
+def constraint_source(field: FieldDescriptor, value: str, namespace: Dict[str, Any]) -> List[str]:
+    """
+    :return: a list of statements that raise a :class:`ValidationError` if the decoded Python expression `value`
+             violates a constraint of `field`; constraints on the items of a repeated field are not included.
+    """
+    options = getattr(field, 'options', None)
+    if not options:
+        return []
+
+    namespace.setdefault('ValidationError', ValidationError)
+    lines = []
+
+    def check(condition: str, template: str, *args: str):
+        lines.extend([
+            'if {}:'.format(condition),
+            '    raise ValidationError({}.format({}))'.format(reference(namespace, template, 'message'),
+                                                           ', '.join(args))
+        ])
+
+    if isinstance(field, (RepeatField, MapField)):
+        if 'min_length' in options:
+            check('len({}) < {!r}'.format(value, options.min_length),
+                  'Expected at least {} items, got {}', repr(options.min_length), 'len({})'.format(value))
+        if 'max_length' in options:
+            check('len({}) > {!r}'.format(value, options.max_length),
+                  'Expected at most {} items, got {}', repr(options.max_length), 'len({})'.format(value))
+        return lines
+
+    # option values are passed to the message template as arguments, as they may contain braces
+    if 'min' in options:
+        check('{} < {!r}'.format(value, options.min),
+              '{} is less than the minimum of {}', value, repr(options.min))
+    if 'max' in options:
+        check('{} > {!r}'.format(value, options.max),
+              '{} is greater than the maximum of {}', value, repr(options.max))
+    if 'min_length' in options:
+        check('len({}) < {!r}'.format(value, options.min_length),
+              '{!r} is shorter than the minimum length of {}', value, repr(options.min_length))
+    if 'max_length' in options:
+        check('len({}) > {!r}'.format(value, options.max_length),
+              '{!r} is longer than the maximum length of {}', value, repr(options.max_length))
+    if 'pattern' in options:
+        pattern = re.compile(options.pattern)
+        check('{}.search({}) is None'.format(reference(namespace, pattern, 'pattern'), value),
+              '{!r} does not match {!r}', value, reference(namespace, pattern.pattern, 'pattern_source'))
+    if 'choices' in options:
+        choices = list(options.choices)
+        check('{} not in {}'.format(value, reference(namespace, frozenset(choices), 'choices')),
+              '{!r} is not one of {!r}', value, reference(namespace, choices, 'choices_list'))
+    return lines
+
+
+NestedValidators = Callable[[Type[Message]], Optional[Callable[[Message], None]]]
+
+
+def _validator_source(field: FieldDescriptor,
+                      value: str,
+                      namespace: Dict[str, Any],
+                      nested: NestedValidators = None) -> List[str]:
+    lines = constraint_source(field, value, namespace)
+
+    if isinstance(field, (RepeatField, MapField)):
+        items_field = field.items if isinstance(field, RepeatField) else field.values
+        index, item = value + '_index', value + '_item'
+        item_lines = _validator_source(items_field, item, namespace, nested)
+        if not item_lines:
+            return lines
+
+        items = 'enumerate({})' if isinstance(field, RepeatField) else '{}.items()'
+        lines += [
+            'for {}, {} in {}:'.format(index, item, items.format(value)),
+            '    try:',
+            *indent(item_lines, 2),
+            '    except ValidationError as e:',
+            '        raise e.prefix(str({}))'.format(index)
+        ]
+    elif nested is not None and isinstance(field, Field) and issubclass(field.type, Message):
+        validator = nested(field.type)
+        if validator is not None:
+            lines.append('{}({})'.format(reference(namespace, validator, 'validate'), value))
+    return lines
+
+
+def compile_validator(fmt: Type[Message],
+                      fields_: Iterable[FieldDescriptor] = None,
+                      nested: NestedValidators = None) -> Optional[Callable[[Message], None]]:
+    """
+    Compiles a function that checks the constraints of the fields of a message, raising a :class:`ValidationError`
+    with all errors found. Values that are yet to be decoded are skipped.
+
+    :param fields_: the fields to check; defaults to all fields of `fmt`
+    :param nested: returns the validator for a nested message type, or ``None`` if it needs no validation; by
+                   default, nested messages are not validated
+    :return: the function, or ``None`` if none of the fields have constraints
+    """
+    if fields_ is None:
+        fields_ = fields(fmt)
+
+    namespace = {
+        'NOT_SET': NOT_SET,
+        'LazyValue': LazyValue,
+        'ValidationError': ValidationError
+    }
+    sources = [(field, _validator_source(field, 'value', namespace, nested)) for field in fields_]
+    sources = [(field, source) for field, source in sources if source or is_required(field)]
+    if not sources:
+        return None
+
+    lines = ['def validate(message):',
+             '    errors = None']
+
+    for field, source in sources:
+        required = is_required(field)
+        lines += indent([
+            'value = message.{}'.format(field.slot),
+            'if value is NOT_SET:',
+            '    ' + (required_source(field, 'errors') if required else 'pass'),
+            'elif type(value) is not LazyValue:',
+            '    try:',
+            *indent(source or ['pass'], 2),
+            '    except ValidationError as e:',
+            '        e.prefix({!r})'.format(field.name),
+            '        errors = (errors or []) + (e.errors or [e])'
+        ])
+
+    lines += ['    if errors:',
+              '        raise ValidationError.collect(errors)']
+    return compile_function('validate', lines, namespace)
+
+
+def _no_constraints(message: Message) -> None:
+    pass
+
+
+def _nested_validator(fmt: Type[Message]) -> Callable[[Message], None]:
+    # resolved when called, as nested message types may refer to themselves
+    return validate
+
+
+def validate(message: Message) -> None:
+    """
+    Checks the constraints on the fields of `message`, including those of nested messages.
+
+    :raises ValidationError: listing every constraint that is violated
+    """
+    meta = type(message).__meta__
+    if meta.validator is None:
+        meta.validator = compile_validator(type(message), nested=_nested_validator) or _no_constraints
+    meta.validator(message)